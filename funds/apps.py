@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FundsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'funds'
+
+    def ready(self):
+        # Compilar las plantillas de notificación al arrancar (valida campos una sola vez)
+        from . import notification_templates  # noqa: F401
@@ -0,0 +1,43 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+
+from .models import Fund, ClientFundSubscription
+from . import cache
+from .renderers import dumps
+from .roundtrips import round_trip_budget
+from .services import ClientService
+
+
+def _run(func, *args):
+    # boto3 es bloqueante: cada lectura va a un hilo del executor para poder lanzarlas en paralelo
+    return sync_to_async(func, thread_sensitive=False)(*args)
+
+
+def _json_response(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type='application/json')
+
+
+@round_trip_budget(4)
+async def get_client_balance(request, client_id):
+    """Versión async de views.get_client_balance: si el resumen no está en cache, balance y
+    suscripciones en paralelo y luego todos los fondos suscritos en una sola lectura en lote"""
+    if request.method not in ('GET', 'HEAD'):
+        return _json_response({'detail': f'Método "{request.method}" no permitido.'}, status=405)
+    try:
+        summary, generation = await _run(cache.lookup, 'balance', client_id)
+        if summary is None:
+            balance, subscriptions = await asyncio.gather(
+                _run(ClientService.get_or_create_balance, client_id),
+                _run(ClientFundSubscription.get_by_client_id, client_id)
+            )
+            funds = await _run(Fund.get_by_ids, [subscription.fund_id for subscription in subscriptions])
+            summary = ClientService.build_balance_summary(balance, subscriptions, funds)
+            await _run(cache.store, 'balance', client_id, summary, generation)
+        return _json_response(summary)
+    except Exception as e:
+        return _json_response({
+            'success': False,
+            'message': f'Error al obtener balance: {str(e)}'
+        }, status=500)
@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+NAMESPACES = ('funds', 'fund', 'client', 'balance')
+STATS_FLUSH_EVERY = 100
+STATS_FLUSH_SECONDS = 10.0
+
+
+def _cache():
+    return caches[getattr(settings, 'READ_CACHE_ALIAS', 'shared')]
+
+
+def _enabled():
+    return getattr(settings, 'READ_CACHE_ENABLED', True)
+
+
+def make_key(namespace, key=None):
+    # El prefijo y la versión del esquema los agrega Django (KEY_PREFIX / VERSION del alias)
+    return f'read:{namespace}' if key is None else f'read:{namespace}:{key}'
+
+
+class _Stats:
+    """Contadores por proceso que se vuelcan cada cierto tiempo al cache compartido para sumar todos los workers"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = defaultdict(int)
+        self._pending = defaultdict(int)
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+
+    def record(self, namespace, outcome):
+        with self._lock:
+            self._local[(namespace, outcome)] += 1
+            self._pending[(namespace, outcome)] += 1
+            self._pending_count += 1
+            due = (self._pending_count >= STATS_FLUSH_EVERY
+                   or time.monotonic() - self._last_flush >= STATS_FLUSH_SECONDS)
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(int)
+            self._pending_count = 0
+            self._last_flush = time.monotonic()
+        cache = _cache()
+        for (namespace, outcome), count in pending.items():
+            key = f'stats:{namespace}:{outcome}'
+            try:
+                if not cache.add(key, count, timeout=None):
+                    cache.incr(key, count)
+            except Exception as exc:  # pragma: no cover
+                logger.warning('Could not flush read cache stats: %s', exc)
+
+    def local(self):
+        with self._lock:
+            return dict(self._local)
+
+
+_stats = _Stats()
+
+
+def _generation_key(namespace, key=None):
+    return f'gen:{namespace}' if key is None else f'gen:{namespace}:{key}'
+
+
+def _generation_timeout(namespace):
+    # Más larga que la del valor: si vence antes, el valor guardado con ella solo se descarta antes de tiempo
+    return 2 * settings.READ_CACHE_TIMEOUTS.get(namespace, 300)
+
+
+def lookup(namespace, key=None):
+    """(valor o None, generación actual de la clave) en una sola ida al cache. Cada valor se guarda con la
+    generación vigente cuando empezó su lectura de DynamoDB y solo es válido mientras siga siéndolo."""
+    if not _enabled():
+        return None, None
+    data_key, generation_key = make_key(namespace, key), _generation_key(namespace, key)
+    cache = _cache()
+    found = cache.get_many([data_key, generation_key])
+    generation, entry = found.get(generation_key), found.get(data_key)
+    if generation is not None and entry is not None and entry[0] == generation:
+        _stats.record(namespace, 'hits')
+        return entry[1], generation
+    _stats.record(namespace, 'misses')
+    if generation is None:
+        candidate = uuid.uuid4().hex
+        cache.add(generation_key, candidate, _generation_timeout(namespace))
+        generation = cache.get(generation_key) or candidate
+    return None, generation
+
+
+def get(namespace, key=None):
+    """Valor en cache o None (None nunca se guarda, así que no hay ambigüedad)"""
+    return lookup(namespace, key)[0]
+
+
+def cached(namespace, key, loader):
+    """Leer del cache compartido o cargar con loader() y guardar con la generación leída antes de cargar"""
+    value, generation = lookup(namespace, key)
+    if value is None:
+        value = loader()
+        if value is not None:
+            store(namespace, key, value, generation)
+    return value
+
+
+def store(namespace, key, value, generation=None):
+    """Guardar `value`. Con `generation` (la de lookup, antes de leer DynamoDB): si entre medio hubo una
+    escritura, invalidate ya cambió la generación y este valor viejo queda guardado sin que nadie lo lea.
+    Sin ella es la escritura directa (write-through) del valor recién guardado en DynamoDB."""
+    if not _enabled():
+        return
+    cache = _cache()
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.set(_generation_key(namespace, key), generation, _generation_timeout(namespace))
+    cache.set(make_key(namespace, key), (generation, value), settings.READ_CACHE_TIMEOUTS.get(namespace, 300))
+
+
+def invalidate(namespace, *keys):
+    """Generación nueva para las claves: los valores guardados antes, o por lecturas que empezaron antes,
+    dejan de ser válidos aunque se escriban después"""
+    if _enabled():
+        _cache().set_many({_generation_key(namespace, key): uuid.uuid4().hex for key in keys or (None,)},
+                          _generation_timeout(namespace))
+
+
+def metrics():
+    """Aciertos/fallos por namespace: los de este proceso y los agregados de todos los workers"""
+    _stats.flush()
+    local = _stats.local()
+    shared = _cache().get_many([f'stats:{ns}:{outcome}' for ns in NAMESPACES for outcome in ('hits', 'misses')])
+    result = {}
+    for namespace in NAMESPACES:
+        entry = {}
+        for scope, source in (('process', lambda outcome: local.get((namespace, outcome), 0)),
+                              ('all_workers', lambda outcome: shared.get(f'stats:{namespace}:{outcome}', 0))):
+            hits, misses = source('hits'), source('misses')
+            total = hits + misses
+            entry[scope] = {'hits': hits, 'misses': misses, 'hit_ratio': hits / total if total else None}
+        result[namespace] = entry
+    return result
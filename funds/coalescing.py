@@ -0,0 +1,203 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from . import metrics
+from .notification_templates import RenderedNotification, render_digest
+from .sms import SMS_MAX_LENGTH
+
+logger = logging.getLogger(__name__)
+
+CHANNELS = ('email', 'sms')
+
+
+def parse_windows(entries: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """Convertir ['sms=60', 'email.deposit=30'] en {'sms': {'default': 60}, 'email': {'deposit': 30}}"""
+    windows = {channel: {'default': 0.0} for channel in CHANNELS}
+    for entry in entries:
+        entry = entry.strip()
+        if not entry:
+            continue
+        key, _, value = entry.partition('=')
+        channel, _, event = key.strip().partition('.')
+        try:
+            seconds = float(value)
+        except ValueError:
+            logger.warning('Invalid notification coalescing window: %s', entry)
+            continue
+        windows.setdefault(channel, {'default': 0.0})[event or 'default'] = seconds
+    return windows
+
+
+class PendingBatch:
+    def __init__(self, recipient, deadline):
+        self.recipient = recipient
+        self.deadline = deadline
+        self.entries: List[RenderedNotification] = []
+        self.sms_length = 0
+
+    def add(self, notification: RenderedNotification) -> None:
+        self.entries.append(notification)
+        # Largo del SMS de render_digest: los cuerpos unidos con '\n'
+        self.sms_length += len(notification.sms or '') + (1 if len(self.entries) > 1 else 0)
+
+    def fits_sms(self, notification: RenderedNotification) -> bool:
+        return not self.entries or self.sms_length + 1 + len(notification.sms or '') <= SMS_MAX_LENGTH
+
+
+class NotificationCoalescer:
+    """Agrupa las notificaciones de un cliente por canal dentro de una ventana y las envía como resumen.
+
+    Los lotes pendientes viven en memoria del proceso: con varios workers cada uno agrupa lo que atiende, así que
+    las notificaciones de un cliente en una misma ventana pueden salir en hasta un resumen por worker. Lo
+    pendiente se envía al terminar el worker (worker_exit en gunicorn.conf.py, atexit como respaldo); si el
+    proceso muere sin apagado ordenado (SIGKILL, timeout del worker) se pierde.
+    """
+
+    def __init__(self, sender: Callable[[str, str, RenderedNotification], Tuple[bool, str]],
+                 windows: Dict[str, Dict[str, float]]):
+        self.sender = sender
+        self.windows = windows
+        self._pending: Dict[Tuple[str, str], PendingBatch] = {}
+        # Lotes cerrados antes de su ventana (el resumen SMS ya no admitía otra entrada), para el hilo de envío
+        self._ready: List[Tuple[str, PendingBatch]] = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._stats = defaultdict(lambda: defaultdict(int))
+
+    def window(self, channel: str, event: Optional[str]) -> float:
+        per_channel = self.windows.get(channel, {})
+        return per_channel.get(event, per_channel.get('default', 0.0))
+
+    def submit(self, channel: str, client_id: str, recipient: str,
+               notification: RenderedNotification) -> Optional[Tuple[bool, str]]:
+        """Encolar una notificación; si la ventana es 0 se envía de inmediato y se devuelve el resultado"""
+        event = notification.event
+        window = self.window(channel, event)
+        with self._cond:
+            self._stats[channel]['received'] += 1
+            self._stats[channel][f'received_{event or "other"}'] += 1
+            if window > 0:
+                deadline = time.monotonic() + window
+                batch = self._pending.get((channel, client_id))
+                if batch is not None and channel == 'sms' and not batch.fits_sms(notification):
+                    # Un resumen de más de SMS_MAX_LENGTH lo rechaza Twilio entero: se envía lo acumulado
+                    # y esta notificación abre una ventana nueva
+                    self._ready.append((channel, self._pending.pop((channel, client_id))))
+                    self._stats[channel]['flushed_full'] += 1
+                    metrics.record_coalesced_flushed_full(channel)
+                    batch = None
+                if batch is None:
+                    batch = self._pending[(channel, client_id)] = PendingBatch(recipient, deadline)
+                else:
+                    batch.recipient = recipient
+                    batch.deadline = min(batch.deadline, deadline)
+                batch.add(notification)
+                self._ensure_thread()
+                self._cond.notify()
+                return None
+        return self._deliver(channel, recipient, [notification])
+
+    def _deliver(self, channel: str, recipient: str, entries) -> Tuple[bool, str]:
+        result = self.sender(channel, recipient, render_digest(entries))
+        with self._cond:
+            stats = self._stats[channel]
+            stats['sent'] += 1
+            stats['saved'] += len(entries) - 1
+            if len(entries) > 1:
+                stats['digests'] += 1
+            if not result[0]:
+                stats['failed'] += 1
+        metrics.record_coalesced(channel, len(entries))
+        return result
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='notification-coalescer', daemon=True)
+            self._thread.start()
+
+    def _take_due(self, force: bool = False):
+        now = time.monotonic()
+        ready, self._ready = self._ready, []
+        due = [key for key, batch in self._pending.items() if force or batch.deadline <= now]
+        return ready + [(key[0], self._pending.pop(key)) for key in due]
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._pending and not self._ready:
+                    self._cond.wait()
+                due = self._take_due()
+                if not due:
+                    next_deadline = min(batch.deadline for batch in self._pending.values())
+                    self._cond.wait(max(next_deadline - time.monotonic(), 0))
+                    continue
+            for channel, batch in due:
+                try:
+                    self._deliver(channel, batch.recipient, batch.entries)
+                except Exception as exc:  # pragma: no cover
+                    logger.exception('Error delivering coalesced notification: %s', exc)
+
+    def flush(self) -> int:
+        """Enviar ya todo lo pendiente (apagado del worker, pruebas de carga)"""
+        with self._cond:
+            due = self._take_due(force=True)
+        for channel, batch in due:
+            self._deliver(channel, batch.recipient, batch.entries)
+        return len(due)
+
+    def metrics(self) -> Dict[str, Dict[str, int]]:
+        with self._cond:
+            metrics = {channel: dict(stats) for channel, stats in self._stats.items()}
+            for channel, batch in [(key[0], batch) for key, batch in self._pending.items()] + self._ready:
+                channel_metrics = metrics.setdefault(channel, {})
+                channel_metrics['pending'] = channel_metrics.get('pending', 0) + len(batch.entries)
+        return metrics
+
+
+_coalescer = None
+_lock = threading.Lock()
+
+
+def get_coalescer(sender) -> NotificationCoalescer:
+    global _coalescer
+    if _coalescer is None:
+        with _lock:
+            if _coalescer is None:
+                windows = parse_windows(getattr(settings, 'NOTIFICATION_COALESCE_WINDOWS', []))
+                _coalescer = NotificationCoalescer(sender, windows)
+                atexit.register(_coalescer.flush)
+    return _coalescer
+
+
+def flush_pending() -> int:
+    """Enviar lo pendiente del coalescer de este proceso, si existe (apagado del worker); no lo crea"""
+    coalescer = _coalescer
+    return coalescer.flush() if coalescer is not None else 0
+
+
+def reset_coalescer() -> None:
+    global _coalescer
+    with _lock:
+        coalescer, _coalescer = _coalescer, None
+    if coalescer is not None:
+        coalescer.flush()
+
+
+def _reset_after_fork() -> None:
+    # Lo pendiente en el master lo envía el master; el worker no debe volver a enviarlo al salir
+    global _coalescer, _lock
+    if _coalescer is not None:
+        atexit.unregister(_coalescer.flush)
+    _coalescer = None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
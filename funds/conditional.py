@@ -0,0 +1,139 @@
+import calendar
+import hashlib
+import uuid
+from datetime import datetime
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .fieldsets import FieldsetError, requested_fields
+from .renderers import dumps
+
+KEY_PREFIX = 'conditional:'
+TIMESTAMP_FIELDS = ('updated_at', 'created_at')
+
+
+def _cache():
+    return caches[getattr(settings, 'CONDITIONAL_GET_CACHE', 'default')]
+
+
+def compute_etag(data) -> str:
+    """ETag fuerte a partir de la representación serializada"""
+    return '"%s"' % hashlib.sha1(dumps(data).encode()).hexdigest()
+
+
+def _parse_timestamp(value):
+    try:
+        return calendar.timegm(datetime.fromisoformat(value).utctimetuple())
+    except (TypeError, ValueError):
+        return None
+
+
+def latest_timestamp(data):
+    """Mayor updated_at/created_at de la respuesta (fechas ISO en UTC), como epoch"""
+    latest = None
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            for field in TIMESTAMP_FIELDS:
+                timestamp = _parse_timestamp(value.get(field))
+                if timestamp is not None and (latest is None or timestamp > latest):
+                    latest = timestamp
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return latest
+
+
+def _timeout():
+    return getattr(settings, 'CONDITIONAL_GET_TIMEOUT', 60)
+
+
+def variant_key(key, fields=None):
+    """Clave de una representación del recurso: cada selección de ?fields= (ya validada) tiene su propio ETag"""
+    return f'{key}|{",".join(sorted(fields))}' if fields else key
+
+
+def get_version(key, variant):
+    """(versión guardada de la representación o None, generación actual del recurso) en una sola lectura.
+    Una versión solo vale mientras la generación del recurso sea la misma con la que se guardó."""
+    cache = _cache()
+    generation_key = f'{KEY_PREFIX}gen:{key}'
+    found = cache.get_many([generation_key, KEY_PREFIX + variant])
+    generation, version = found.get(generation_key), found.get(KEY_PREFIX + variant)
+    if generation is None:
+        candidate = uuid.uuid4().hex
+        cache.add(generation_key, candidate, 2 * _timeout())
+        return None, cache.get(generation_key) or candidate
+    if version is None or version.get('generation') != generation:
+        return None, generation
+    return version, generation
+
+
+def set_version(variant, generation, etag, last_modified):
+    _cache().set(
+        KEY_PREFIX + variant,
+        {'generation': generation, 'etag': etag, 'last_modified': last_modified},
+        _timeout()
+    )
+
+
+def invalidate(*keys):
+    """Olvidar las versiones conocidas de los recursos, con todas sus selecciones de campos (llamar en cada
+    escritura): cada recurso pasa a una generación nueva"""
+    _cache().set_many({f'{KEY_PREFIX}gen:{key}': uuid.uuid4().hex for key in keys}, 2 * _timeout())
+
+
+def _set_headers(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_get(key_template, encoder=None):
+    """Soportar If-None-Match / If-Modified-Since en una vista GET.
+
+    key_template se formatea con los kwargs de la URL ('fund:{fund_id}'); con encoder, cada ?fields= tiene su
+    versión, con los campos validados igual que en la vista (un ?fields= inválido no se versiona: la vista
+    responde 400).
+    Si la versión de la representación está en cache y coincide con la del cliente se responde 304 sin
+    consultar DynamoDB; si no, se ejecuta la vista, se calcula el ETag del cuerpo y se guarda la versión con
+    la generación leída antes de ejecutarla (una escritura entre medio la deja sin efecto).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+
+            key = key_template.format(**kwargs)
+            try:
+                fields = requested_fields(request, encoder) if encoder is not None else None
+            except FieldsetError:
+                return view(request, *args, **kwargs)
+            variant = variant_key(key, fields)
+            cached, generation = get_version(key, variant)
+            if cached:
+                not_modified = get_conditional_response(
+                    request, etag=cached['etag'], last_modified=cached['last_modified']
+                )
+                if not_modified is not None:
+                    return _set_headers(not_modified, cached['etag'], cached['last_modified'])
+
+            response = view(request, *args, **kwargs)
+            if response.status_code != 200 or getattr(response, 'data', None) is None:
+                return response
+
+            etag = compute_etag(response.data)
+            last_modified = latest_timestamp(response.data)
+            set_version(variant, generation, etag, last_modified)
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
+            return _set_headers(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -1,18 +1,169 @@
-import boto3
+import contextvars
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from django.conf import settings
-from botocore.exceptions import ClientError
 import logging
+from . import metrics, profiling, roundtrips, slowlog
 
 logger = logging.getLogger(__name__)
 
+BATCH_GET_LIMIT = 100
+
+_local = threading.local()
+_session_lock = threading.Lock()
+
+class ClientError(Exception):
+    """Se reemplaza por botocore.exceptions.ClientError al crear el primer recurso"""
+
+def _load_boto3():
+    """boto3/botocore (~90 ms de import) se cargan con el primer recurso, no al importar el módulo. Ninguna llamada
+    a DynamoDB puede fallar antes, así que los `except ClientError` ven siempre la clase de botocore."""
+    global ClientError
+    import boto3
+    from botocore.exceptions import ClientError
+    return boto3
+
+def _get_resource():
+    """Recurso boto3 por hilo (los resources no son thread-safe); se recrea si cambia la configuración"""
+    config_key = (
+        settings.AWS_ACCESS_KEY_ID,
+        settings.AWS_SECRET_ACCESS_KEY,
+        settings.AWS_REGION,
+        getattr(settings, 'DYNAMODB_ENDPOINT_URL', '')
+    )
+    cached = getattr(_local, 'resource', None)
+    if cached is None or cached[0] != config_key:
+        boto3 = _load_boto3()
+        # La sesión por defecto de boto3 no admite crear recursos desde varios hilos a la vez
+        with _session_lock:
+            resource = boto3.resource(
+                'dynamodb',
+                aws_access_key_id=config_key[0],
+                aws_secret_access_key=config_key[1],
+                region_name=config_key[2],
+                endpoint_url=config_key[3] or None
+            )
+        if metrics.enabled() or profiling.enabled() or roundtrips.enabled() or slowlog.threshold_ms('dynamodb'):
+            _instrument(resource.meta.client)
+        cached = _local.resource = (config_key, resource)
+    return cached[1]
+
+CAPACITY_OPERATIONS = frozenset((
+    'GetItem', 'PutItem', 'UpdateItem', 'DeleteItem', 'Query', 'Scan', 'BatchGetItem', 'BatchWriteItem'
+))
+
+def _capture_params(params, model, context, **kwargs):
+    context['metrics_params'] = params
+    # Capacidad consumida en la respuesta, para el log de operaciones lentas
+    if getattr(settings, 'DYNAMODB_RETURN_CONSUMED_CAPACITY', False) and model.name in CAPACITY_OPERATIONS:
+        params.setdefault('ReturnConsumedCapacity', 'TOTAL')
+
+def _before_call(model, context, **kwargs):
+    context['metrics_start'] = time.perf_counter()
+
+def _after_call(model, parsed, context, **kwargs):
+    start = context.get('metrics_start')
+    if start is not None:
+        seconds = time.perf_counter() - start
+        params = context.get('metrics_params')
+        key = _describe_key(params)
+        metrics.record_dynamodb_call(model.name, seconds)
+        profiling.record_span('dynamodb', model.name, seconds, key)
+        roundtrips.record_round_trip(model.name, key)
+        slowlog.log_slow(
+            'dynamodb', model.name, seconds,
+            table=(params or {}).get('TableName'),
+            key=key,
+            items=_item_count(parsed),
+            consumed_capacity=parsed.get('ConsumedCapacity'),
+            retries=parsed.get('ResponseMetadata', {}).get('RetryAttempts') or None,
+            error=parsed.get('Error', {}).get('Code')
+        )
+
+def _item_count(parsed):
+    if 'Count' in parsed:
+        return parsed['Count']
+    if 'Item' in parsed:
+        return 1
+    if 'Responses' in parsed:
+        return sum(len(items) for items in parsed['Responses'].values())
+    return None
+
+def _describe_key(params):
+    """Llave o valores de la condición de la llamada, para identificarla en perfiles y logs"""
+    if not params:
+        return None
+    if 'Key' in params:
+        return params['Key']
+    if 'Item' in params:
+        return {name: params['Item'].get(name) for name in KEY_ATTRIBUTES}
+    if 'ExpressionAttributeValues' in params:
+        values = dict(params['ExpressionAttributeValues'])
+        if 'ExclusiveStartKey' in params:
+            values['ExclusiveStartKey'] = params['ExclusiveStartKey']
+        return values
+    if 'RequestItems' in params:
+        return {table: len(request.get('Keys', request) if isinstance(request, dict) else request)
+                for table, request in params['RequestItems'].items()}
+    return None
+
+def _instrument(client):
+    """Medir cada llamada a la API (GetItem, Query, BatchGetItem...) con los eventos de botocore"""
+    client.meta.events.register('provide-client-params.dynamodb', _capture_params)
+    client.meta.events.register('before-call.dynamodb', _before_call)
+    client.meta.events.register('after-call.dynamodb', _after_call)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def get_read_executor():
+    """Pool compartido para lecturas en paralelo; sus hilos conservan su recurso boto3 entre peticiones"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'DYNAMODB_READ_WORKERS', 8),
+                    thread_name_prefix='dynamodb-read'
+                )
+    return _executor
+
+def map_in_context(func, iterable):
+    """executor.map en el pool de lectura conservando las variables de contexto de la petición
+    (métricas, perfilado y conteo de idas y vueltas ven también las llamadas hechas en el pool)"""
+    items = list(iterable)
+    contexts = [contextvars.copy_context() for _ in items]
+    return get_read_executor().map(lambda context, item: context.run(func, item), contexts, items)
+
+def _reset_after_fork():
+    """En el hijo de un fork (gunicorn con preload_app) los recursos boto3 y sus conexiones, los hilos del pool
+    y los locks son copias de los del master: se descartan y cada worker crea los suyos"""
+    global _local, _session_lock, _executor, _executor_lock
+    _local = threading.local()
+    _session_lock = threading.Lock()
+    _executor = None
+    _executor_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+KEY_ATTRIBUTES = ('pk', 'sk')
+
+def projection_kwargs(attributes):
+    """ProjectionExpression con alias (#p0, #p1...) para no chocar con palabras reservadas como name o type.
+    Siempre incluye pk y sk."""
+    names = KEY_ATTRIBUTES + tuple(name for name in attributes if name not in KEY_ATTRIBUTES)
+    return {
+        'ProjectionExpression': ', '.join(f'#p{i}' for i in range(len(names))),
+        'ExpressionAttributeNames': {f'#p{i}': name for i, name in enumerate(names)}
+    }
+
 class DynamoDBClient:
     def __init__(self):
-        self.dynamodb = boto3.resource(
-            'dynamodb',
-            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-            region_name=settings.AWS_REGION
-        )
+        self.dynamodb = _get_resource()
         self.table_name = settings.DYNAMODB_TABLE_NAME
         self.table = self.dynamodb.Table(self.table_name)
     
@@ -59,51 +210,206 @@ class DynamoDBClient:
             logger.error(f"Error al insertar item: {e}")
             raise e
     
-    def get_item(self, pk, sk):
-        """Obtener un item específico"""
+    def get_item(self, pk, sk, projection=None):
+        """Obtener un item específico (solo los atributos de `projection` si se indica)"""
+        kwargs = projection_kwargs(projection) if projection else {}
         try:
             response = self.table.get_item(
                 Key={
                     'pk': pk,
                     'sk': sk
-                }
+                },
+                **kwargs
             )
             return response.get('Item')
         except ClientError as e:
             logger.error(f"Error al obtener item: {e}")
             raise e
     
-    def query(self, pk, sk_prefix=None):
+    def batch_get_items(self, keys, projection=None, parallel=False):
+        """Leer varios items por llave con BatchGetItem (lotes de 100, reintenta UnprocessedKeys).
+        Con parallel=True los lotes se leen a la vez en el pool de lectura."""
+        chunks, extra = self._batch_get_chunks(keys, projection)
+        if parallel and len(chunks) > 1:
+            pages = map_in_context(lambda chunk: DynamoDBClient()._batch_get_chunk(chunk, extra), chunks)
+        else:
+            pages = (self._batch_get_chunk(chunk, extra) for chunk in chunks)
+        return [item for page in pages for item in page]
+
+    def start_batch_get(self, keys, projection=None):
+        """Encolar ya todos los lotes de BatchGetItem en el pool de lectura (por delante de lo que se encole
+        después) y devolver una función que espera los lotes y devuelve sus items"""
+        chunks, extra = self._batch_get_chunks(keys, projection)
+        pages = map_in_context(lambda chunk: DynamoDBClient()._batch_get_chunk(chunk, extra), chunks)
+        return lambda: [item for page in pages for item in page]
+
+    @staticmethod
+    def _batch_get_chunks(keys, projection):
+        unique_keys = list({(key['pk'], key['sk']): key for key in keys}.values())
+        extra = projection_kwargs(projection) if projection else {}
+        chunks = [unique_keys[start:start + BATCH_GET_LIMIT] for start in range(0, len(unique_keys), BATCH_GET_LIMIT)]
+        return chunks, extra
+    
+    def _batch_get_chunk(self, keys, extra):
+        items = []
+        request = {self.table_name: {'Keys': keys, **extra}}
+        attempt = 0
+        while request:
+            try:
+                response = self.dynamodb.batch_get_item(RequestItems=request)
+            except ClientError as e:
+                logger.error(f"Error al leer items en lote: {e}")
+                raise e
+            items.extend(response.get('Responses', {}).get(self.table_name, []))
+            request = response.get('UnprocessedKeys')
+            if request:
+                time.sleep(min(0.05 * 2 ** attempt, 1))
+                attempt += 1
+        return items
+    
+    def query(self, pk, sk_prefix=None, projection=None):
         """Consultar items por partition key"""
+        return [item for page in self.query_pages(pk, sk_prefix, projection=projection) for item in page]
+    
+    def query_pages(self, pk, sk_prefix=None, page_size=None, projection=None):
+        """Consultar por partition key página a página (sigue LastEvaluatedKey)"""
+        kwargs = projection_kwargs(projection) if projection else {}
+        if sk_prefix:
+            kwargs['KeyConditionExpression'] = 'pk = :pk AND begins_with(sk, :sk_prefix)'
+            kwargs['ExpressionAttributeValues'] = {
+                ':pk': pk,
+                ':sk_prefix': sk_prefix
+            }
+        else:
+            kwargs['KeyConditionExpression'] = 'pk = :pk'
+            kwargs['ExpressionAttributeValues'] = {
+                ':pk': pk
+            }
+        return self._paginate(self.table.query, kwargs, page_size, 'consultar items')
+    
+    def query_page(self, pk, sk_prefix=None, limit=10, start_key=None, projection=None):
+        """Una sola consulta acotada a `limit` items; devuelve (items, last_evaluated_key)"""
+        kwargs = projection_kwargs(projection) if projection else {}
+        kwargs['Limit'] = limit
+        if start_key:
+            kwargs['ExclusiveStartKey'] = start_key
+        if sk_prefix:
+            kwargs['KeyConditionExpression'] = 'pk = :pk AND begins_with(sk, :sk_prefix)'
+            kwargs['ExpressionAttributeValues'] = {':pk': pk, ':sk_prefix': sk_prefix}
+        else:
+            kwargs['KeyConditionExpression'] = 'pk = :pk'
+            kwargs['ExpressionAttributeValues'] = {':pk': pk}
         try:
-            if sk_prefix:
-                response = self.table.query(
-                    KeyConditionExpression='pk = :pk AND begins_with(sk, :sk_prefix)',
-                    ExpressionAttributeValues={
-                        ':pk': pk,
-                        ':sk_prefix': sk_prefix
-                    }
-                )
-            else:
-                response = self.table.query(
-                    KeyConditionExpression='pk = :pk',
-                    ExpressionAttributeValues={
-                        ':pk': pk
-                    }
-                )
-            return response.get('Items', [])
+            response = self.table.query(**kwargs)
+            return response.get('Items', []), response.get('LastEvaluatedKey')
         except ClientError as e:
             logger.error(f"Error al consultar items: {e}")
             raise e
     
-    def scan(self):
+    def scan_page(self, limit=10, start_key=None, filter_expression=None, expression_values=None, max_rounds=10,
+                  projection=None):
+        """Escaneo acotado: cada llamada lee `limit` items de la tabla (antes del filtro) hasta juntar `limit`
+        coincidencias o agotar `max_rounds` llamadas; devuelve (items, last_key). Si el filtro deja pasar pocos
+        items la página puede venir corta, o vacía, con last_key para seguir. Si junta de más, la página se corta
+        en `limit` y last_key es la llave del último item devuelto (el scan sigue justo después)."""
+        items = []
+        for _ in range(max_rounds):
+            kwargs = projection_kwargs(projection) if projection else {}
+            kwargs['Limit'] = limit
+            if start_key:
+                kwargs['ExclusiveStartKey'] = start_key
+            if filter_expression:
+                kwargs['FilterExpression'] = filter_expression
+                kwargs['ExpressionAttributeValues'] = expression_values
+            try:
+                response = self.table.scan(**kwargs)
+            except ClientError as e:
+                logger.error(f"Error al escanear tabla: {e}")
+                raise e
+            items.extend(response.get('Items', []))
+            start_key = response.get('LastEvaluatedKey')
+            if not start_key or len(items) >= limit:
+                break
+        if len(items) > limit:
+            items = items[:limit]
+            start_key = {name: items[-1][name] for name in KEY_ATTRIBUTES}
+        return items, start_key
+    
+    def scan(self, projection=None):
         """Escanear toda la tabla"""
+        return [item for page in self.scan_pages(projection=projection) for item in page]
+    
+    def scan_pages(self, page_size=None, projection=None):
+        """Escanear la tabla página a página (sigue LastEvaluatedKey)"""
+        kwargs = projection_kwargs(projection) if projection else {}
+        return self._paginate(self.table.scan, kwargs, page_size, 'escanear tabla')
+    
+    def parallel_scan_pages(self, segments=4, page_size=None, projection=None, filter_expression=None,
+                            expression_values=None):
+        """Scan paralelo (Segment/TotalSegments): un hilo por segmento y las páginas entregadas según llegan, sin
+        orden. La cola acotada frena a los hilos si el consumidor es más lento, así en memoria hay como mucho unas
+        2 páginas por segmento. Cerrar el generador antes de terminar detiene los segmentos."""
+        pages = queue.Queue(maxsize=segments * 2)
+        stop = threading.Event()
+        done = object()
+
+        def put(entry):
+            while not stop.is_set():
+                try:
+                    pages.put(entry, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def scan_segment(segment):
+            kwargs = projection_kwargs(projection) if projection else {}
+            kwargs.update(Segment=segment, TotalSegments=segments)
+            if filter_expression:
+                kwargs['FilterExpression'] = filter_expression
+                kwargs['ExpressionAttributeValues'] = expression_values
+            try:
+                # Cada hilo usa su propio recurso boto3
+                client = DynamoDBClient()
+                for page in client._paginate(client.table.scan, kwargs, page_size, f'escanear segmento {segment}'):
+                    if page and not put(page):
+                        return
+            except Exception as exc:
+                put(exc)
+                return
+            put(done)
+
+        executor = ThreadPoolExecutor(max_workers=segments, thread_name_prefix='dynamodb-scan')
         try:
-            response = self.table.scan()
-            return response.get('Items', [])
-        except ClientError as e:
-            logger.error(f"Error al escanear tabla: {e}")
-            raise e
+            for segment in range(segments):
+                executor.submit(contextvars.copy_context().run, scan_segment, segment)
+            remaining = segments
+            while remaining:
+                entry = pages.get()
+                if entry is done:
+                    remaining -= 1
+                elif isinstance(entry, Exception):
+                    raise entry
+                else:
+                    yield entry
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+    
+    def _paginate(self, operation, kwargs, page_size, action):
+        if page_size:
+            kwargs['Limit'] = page_size
+        while True:
+            try:
+                response = operation(**kwargs)
+            except ClientError as e:
+                logger.error(f"Error al {action}: {e}")
+                raise e
+            yield response.get('Items', [])
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            kwargs['ExclusiveStartKey'] = last_key
     
     def update_item(self, pk, sk, update_expression, expression_values):
         """Actualizar un item"""
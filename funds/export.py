@@ -0,0 +1,225 @@
+import csv
+import hmac
+import importlib.util
+import io
+import logging
+import re
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+
+from .dynamo_client import DynamoDBClient
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ('csv', 'parquet')
+FIELDS = ('transaction_id', 'client_id', 'fund_id', 'amount', 'transaction_type', 'status', 'created_at')
+CONTENT_TYPES = {'csv': 'text/csv; charset=utf-8', 'parquet': 'application/vnd.apache.parquet'}
+_VALID_TYPE = re.compile(r'^[A-Za-z_]{1,64}$')
+TOKEN_HEADER = 'HTTP_X_EXPORT_TOKEN'
+
+
+class ExportError(ValueError):
+    pass
+
+
+def parquet_available():
+    """pyarrow instalado (dependencia opcional); se importa recién al exportar en parquet"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def http_enabled():
+    return bool(settings.EXPORT_TOKEN)
+
+
+def token_matches(request):
+    """Header X-Export-Token igual a EXPORT_TOKEN (en bytes: compare_digest sobre str no ASCII lanza TypeError)"""
+    token = request.META.get(TOKEN_HEADER, '')
+    return bool(token) and hmac.compare_digest(token.encode('latin-1', 'replace'), settings.EXPORT_TOKEN.encode())
+
+
+def _parse_date(value, name):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ExportError(f'{name} debe ser una fecha YYYY-MM-DD: {value}')
+
+
+def build_filter(date_from=None, date_to=None, transaction_type=None):
+    """FilterExpression del scan: solo items TRANSACTION#, con created_at en [date_from, date_to] (fechas
+    inclusivas; created_at es ISO 8601, se compara como texto) y del tipo indicado"""
+    conditions = ['begins_with(sk, :sk_prefix)']
+    values = {':sk_prefix': 'TRANSACTION#'}
+    start = _parse_date(date_from, 'from') if date_from else None
+    end = _parse_date(date_to, 'to') if date_to else None
+    if start and end and start > end:
+        raise ExportError('from no puede ser posterior a to')
+    if start:
+        conditions.append('created_at >= :date_from')
+        values[':date_from'] = start.isoformat()
+    if end:
+        conditions.append('created_at < :date_until')
+        values[':date_until'] = (end + timedelta(days=1)).isoformat()
+    if transaction_type:
+        if not _VALID_TYPE.match(transaction_type):
+            raise ExportError(f'Tipo de transacción inválido: {transaction_type}')
+        conditions.append('transaction_type = :transaction_type')
+        values[':transaction_type'] = transaction_type
+    return ' AND '.join(conditions), values
+
+
+class ExportStats:
+    """Items y páginas exportados y velocidad, actualizados mientras avanza el export"""
+
+    def __init__(self):
+        self.items = 0
+        self.pages = 0
+        self.start = time.perf_counter()
+        self.elapsed = None
+
+    def finish(self):
+        self.elapsed = time.perf_counter() - self.start
+
+    @property
+    def items_per_second(self):
+        seconds = self.elapsed if self.elapsed is not None else time.perf_counter() - self.start
+        return self.items / seconds if seconds else 0.0
+
+    def as_dict(self):
+        return {'items': self.items, 'pages': self.pages, 'seconds': round(self.elapsed or 0.0, 3),
+                'items_per_second': round(self.items_per_second, 1)}
+
+
+def iter_transaction_pages(filters, segments=None, page_size=None, stats=None):
+    """Páginas de items de transacción de toda la tabla leídas con un scan paralelo; `filters` es el resultado
+    de build_filter()"""
+    filter_expression, expression_values = filters
+    pages = DynamoDBClient().parallel_scan_pages(
+        segments=segments or settings.EXPORT_SCAN_SEGMENTS,
+        page_size=page_size or settings.EXPORT_PAGE_SIZE,
+        projection=FIELDS,
+        filter_expression=filter_expression,
+        expression_values=expression_values,
+    )
+    for page in pages:
+        if stats is not None:
+            stats.items += len(page)
+            stats.pages += 1
+        yield page
+
+
+def iter_csv(pages, chunk_size=None):
+    """Encabezado y una línea por transacción, en bloques de ~chunk_size bytes"""
+    chunk_size = chunk_size or settings.STREAM_CHUNK_SIZE
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(FIELDS)
+    for page in pages:
+        writer.writerows([item.get(field) for field in FIELDS] for item in page)
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+class _StreamSink(io.RawIOBase):
+    """Archivo de solo escritura que acumula lo que escribe ParquetWriter hasta que se lo retira con drain()"""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _parquet_schema(pyarrow):
+    return pyarrow.schema([
+        ('transaction_id', pyarrow.string()),
+        ('client_id', pyarrow.string()),
+        ('fund_id', pyarrow.string()),
+        ('amount', pyarrow.decimal128(18, 2)),
+        ('transaction_type', pyarrow.string()),
+        ('status', pyarrow.string()),
+        ('created_at', pyarrow.timestamp('us', tz='UTC')),
+    ])
+
+
+def _row_group(pyarrow, columns, schema):
+    arrays = []
+    for field in schema:
+        values = columns[field.name]
+        if field.name == 'created_at':
+            # ISO 8601 sin zona (datetime.utcnow().isoformat())
+            arrays.append(pyarrow.compute.cast(pyarrow.array(values, pyarrow.string()), pyarrow.timestamp('us'))
+                          .cast(field.type))
+        else:
+            arrays.append(pyarrow.array(values, field.type))
+    return pyarrow.Table.from_arrays(arrays, schema=schema)
+
+
+def iter_parquet(pages, row_group_size=None):
+    """Parquet por row groups de `row_group_size` filas: en memoria solo las columnas del grupo en curso, y los
+    bytes de cada grupo se entregan apenas se escriben (el footer va al final)"""
+    import pyarrow
+    import pyarrow.compute
+    import pyarrow.parquet
+
+    row_group_size = row_group_size or settings.EXPORT_ROW_GROUP_SIZE
+    schema = _parquet_schema(pyarrow)
+    sink = _StreamSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd')
+    columns = {field: [] for field in FIELDS}
+    try:
+        for page in pages:
+            for item in page:
+                for field in FIELDS:
+                    columns[field].append(item.get(field))
+            while len(columns['transaction_id']) >= row_group_size:
+                group = {field: values[:row_group_size] for field, values in columns.items()}
+                columns = {field: values[row_group_size:] for field, values in columns.items()}
+                writer.write_table(_row_group(pyarrow, group, schema))
+                yield sink.drain()
+        if columns['transaction_id']:
+            writer.write_table(_row_group(pyarrow, columns, schema))
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+def export_transactions(output_format, filters=None, segments=None, page_size=None, row_group_size=None,
+                        stats=None):
+    """Iterador de bytes del export en `output_format` (csv o parquet) de las transacciones que cumplen `filters`
+    (de build_filter; todas si no se indica). Valida antes de leer nada; `stats` se completa al terminar."""
+    if output_format not in EXPORT_FORMATS:
+        raise ExportError(f'Formato de export inválido: {output_format}. Use csv o parquet')
+    if output_format == 'parquet' and not parquet_available():
+        raise ExportError('El formato parquet requiere pyarrow (pip install pyarrow)')
+    stats = stats if stats is not None else ExportStats()
+    pages = iter_transaction_pages(filters or build_filter(), segments, page_size, stats)
+    chunks = iter_csv(pages) if output_format == 'csv' else iter_parquet(pages, row_group_size)
+    return _finish(output_format, chunks, stats)
+
+
+def _finish(output_format, chunks, stats):
+    for chunk in chunks:
+        if chunk:
+            yield chunk
+    stats.finish()
+    logger.info('Exported %d transactions (%s) in %.1fs: %.0f items/s',
+                stats.items, output_format, stats.elapsed, stats.items_per_second)
@@ -0,0 +1,22 @@
+class FieldsetError(ValueError):
+    pass
+
+
+def requested_fields(request, encoder, query_param='fields'):
+    """Leer ?fields=a,b,c y validarlo contra los campos del encoder; None si no se pidió.
+    Acepta el Request de DRF o el HttpRequest de Django (los decoradores que envuelven a api_view)"""
+    raw = getattr(request, 'query_params', request.GET).get(query_param)
+    if not raw:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in encoder.field_names]
+    if unknown:
+        raise FieldsetError(
+            f'Campos inválidos en {query_param}: {", ".join(unknown)}. '
+            f'Disponibles: {", ".join(encoder.field_names)}'
+        )
+    return fields or None
+
+
+def select_encoder(encoder, fields):
+    return encoder.only(fields) if fields else encoder
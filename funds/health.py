@@ -0,0 +1,211 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+OK, FAILED, TIMEOUT, SKIPPED = 'ok', 'failed', 'timeout', 'skipped'
+
+
+_probe_client = None
+_probe_client_lock = threading.Lock()
+_probe_sms_sender = None
+_worker_probe = None
+
+
+def _get_probe_client():
+    """Cliente DynamoDB propio de la sonda, con timeouts de HEALTH_PROBE_TIMEOUT y sin reintentos: contra un
+    endpoint que no responde el hilo se libera enseguida en vez de quedar en los 60 s y reintentos de botocore"""
+    global _probe_client
+    if _probe_client is None:
+        with _probe_client_lock:
+            if _probe_client is None:
+                from botocore.config import Config
+
+                from .dynamo_client import _load_boto3
+
+                timeout = settings.HEALTH_PROBE_TIMEOUT
+                _probe_client = _load_boto3().session.Session().client(
+                    'dynamodb',
+                    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                    region_name=settings.AWS_REGION,
+                    endpoint_url=getattr(settings, 'DYNAMODB_ENDPOINT_URL', '') or None,
+                    config=Config(connect_timeout=timeout, read_timeout=timeout, retries={'max_attempts': 1}),
+                )
+    return _probe_client
+
+
+def _check_worker_resource(table_name, timeout):
+    """DescribeTable con el recurso boto3 de un hilo del pool de lectura: la sesión, las credenciales y las
+    conexiones que usan las peticiones del worker. Ese recurso tiene los timeouts por defecto de botocore, así
+    que se espera a lo sumo `timeout` y, si una comprobación anterior sigue colgada, no se encola otra (el pool
+    no se llena de sondas)."""
+    global _worker_probe
+    from .dynamo_client import DynamoDBClient, get_read_executor
+
+    def describe():
+        return DynamoDBClient().dynamodb.meta.client.describe_table(TableName=table_name)['Table']['TableStatus']
+
+    if _worker_probe is None or _worker_probe.done():
+        _worker_probe = get_read_executor().submit(describe)
+    try:
+        return _worker_probe.result(timeout=timeout)
+    except FutureTimeout:
+        raise RuntimeError(f'worker DynamoDB connection did not answer in {timeout}s')
+
+
+def probe_dynamodb():
+    """DescribeTable (no consume capacidad de lectura) primero con un cliente aislado de timeouts cortos, que
+    distingue DynamoDB caído, y después con el recurso de los hilos del worker, que detecta conexiones o
+    credenciales rotas solo en este proceso"""
+    table_name = settings.DYNAMODB_TABLE_NAME
+    table = _get_probe_client().describe_table(TableName=table_name)['Table']
+    if table['TableStatus'] != 'ACTIVE':
+        raise RuntimeError(f"table {table_name} is {table['TableStatus']}")
+    _check_worker_resource(table_name, settings.HEALTH_PROBE_TIMEOUT)
+    return table['TableStatus']
+
+
+def probe_smtp():
+    """Conexión, EHLO y QUIT contra EMAIL_HOST; sin login para no gastar el límite de autenticaciones"""
+    if not settings.NOTIFICATIONS_ENABLED or not settings.EMAIL_HOST_USER:
+        return None
+    import smtplib
+
+    with smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT, timeout=settings.HEALTH_PROBE_TIMEOUT) as server:
+        code, _ = server.ehlo()
+    return f'EHLO {code}'
+
+
+def _get_probe_sms_sender():
+    """Cliente Twilio propio de la sonda con timeout HEALTH_PROBE_TIMEOUT (el del proceso usa TWILIO_TIMEOUT):
+    si Twilio no responde, el hilo del pool de sondas se libera antes del siguiente refresco"""
+    global _probe_sms_sender
+    if _probe_sms_sender is None:
+        with _probe_client_lock:
+            if _probe_sms_sender is None:
+                from .sms import SMSSender
+
+                _probe_sms_sender = SMSSender(
+                    settings.TWILIO_ACCOUNT_SID,
+                    settings.TWILIO_AUTH_TOKEN,
+                    settings.TWILIO_FROM_NUMBER,
+                    base_url=getattr(settings, 'TWILIO_API_BASE_URL', ''),
+                    pool_size=1,
+                    timeout=settings.HEALTH_PROBE_TIMEOUT,
+                )
+    return _probe_sms_sender
+
+
+def probe_twilio():
+    """GET de la cuenta: valida red, TLS y credenciales sin enviar nada"""
+    if not settings.NOTIFICATIONS_ENABLED or not settings.TWILIO_ACCOUNT_SID or not settings.TWILIO_AUTH_TOKEN:
+        return None
+    account = _get_probe_sms_sender().client.api.accounts(settings.TWILIO_ACCOUNT_SID).fetch()
+    return account.status
+
+
+PROBES = {
+    'dynamodb': probe_dynamodb,
+    'smtp': probe_smtp,
+    'twilio': probe_twilio,
+}
+
+
+def _timed(probe):
+    start = time.perf_counter()
+    try:
+        detail = probe()
+    except Exception as exc:
+        return {'status': FAILED, 'latency_ms': round((time.perf_counter() - start) * 1000, 3),
+                'detail': f'{type(exc).__name__}: {exc}'}
+    return {'status': SKIPPED if detail is None else OK,
+            'latency_ms': round((time.perf_counter() - start) * 1000, 3), 'detail': detail}
+
+
+class HealthChecker:
+    """Sondas en paralelo con el resultado cacheado HEALTH_CACHE_SECONDS en el proceso: con muchos balanceadores
+    consultando, cada worker sondea como mucho una vez por intervalo"""
+
+    def __init__(self, probes):
+        self.probes = probes
+        self._executor = None
+        self._refresh_lock = threading.Lock()
+        self._result = None
+        self._expires = 0.0
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=len(self.probes), thread_name_prefix='health-probe')
+        return self._executor
+
+    def run_probes(self):
+        """Todas las sondas en el pool, a la vez, con un mismo plazo; una sonda que no termina en
+        HEALTH_PROBE_TIMEOUT queda como timeout (sigue corriendo, el resultado se descarta)"""
+        timeout = settings.HEALTH_PROBE_TIMEOUT
+        futures = {name: self._get_executor().submit(_timed, probe) for name, probe in self.probes.items()}
+        deadline = time.monotonic() + timeout
+        checks = {}
+        for name, future in futures.items():
+            try:
+                checks[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except FutureTimeout:
+                checks[name] = {'status': TIMEOUT, 'latency_ms': timeout * 1000, 'detail': None}
+        return {name: checks[name] for name in self.probes}
+
+    def check(self):
+        """(resultado, edad en segundos): solo una petición a la vez refresca el cache vencido, las demás
+        esperan y reciben ese mismo resultado"""
+        if time.monotonic() >= self._expires:
+            with self._refresh_lock:
+                if time.monotonic() >= self._expires:
+                    checks = self.run_probes()
+                    self._result = (checks, time.monotonic())
+                    self._expires = time.monotonic() + settings.HEALTH_CACHE_SECONDS
+                    failed = [name for name, check in checks.items() if check['status'] in (FAILED, TIMEOUT)]
+                    if failed:
+                        logger.warning('Health probes failing: %s', {name: checks[name] for name in failed})
+        checks, checked_at = self._result
+        return checks, time.monotonic() - checked_at
+
+
+def summarize(checks):
+    """unhealthy si falla una dependencia de HEALTH_CRITICAL, degraded si falla otra, healthy si no"""
+    failed = {name for name, check in checks.items() if check['status'] in (FAILED, TIMEOUT)}
+    if failed & set(settings.HEALTH_CRITICAL):
+        return 'unhealthy'
+    return 'degraded' if failed else 'healthy'
+
+
+_checker = None
+_lock = threading.Lock()
+
+
+def get_health_checker():
+    global _checker
+    if _checker is None:
+        with _lock:
+            if _checker is None:
+                _checker = HealthChecker(PROBES)
+    return _checker
+
+
+def _reset_after_fork():
+    # Cada worker sondea con sus propias conexiones; el resultado cacheado del master no vale para él
+    global _checker, _lock, _probe_client, _probe_client_lock, _probe_sms_sender, _worker_probe
+    _checker = None
+    _lock = threading.Lock()
+    _probe_client = None
+    _probe_client_lock = threading.Lock()
+    _probe_sms_sender = None
+    _worker_probe = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
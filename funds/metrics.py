@@ -0,0 +1,255 @@
+import atexit
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Segundos; cubren desde un GetItem local hasta un envío SMTP lento
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+
+_request_stats = contextvars.ContextVar('funds_request_stats', default=None)
+
+
+class RequestStats:
+    """Llamadas a DynamoDB hechas durante la petición en curso"""
+    __slots__ = ('dynamodb_calls', 'dynamodb_seconds')
+
+    def __init__(self):
+        self.dynamodb_calls = 0
+        self.dynamodb_seconds = 0.0
+
+
+def start_request():
+    stats = RequestStats()
+    return stats, _request_stats.set(stats)
+
+
+def finish_request(token):
+    _request_stats.reset(token)
+
+
+def current_request():
+    return _request_stats.get()
+
+
+class Registry:
+    """Contadores e histogramas en memoria del proceso.
+
+    Con METRICS_DIR cada proceso vuelca su estado a <METRICS_DIR>/<pid>.json cada METRICS_FLUSH_SECONDS,
+    y /metrics/ suma los archivos de todos los workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._help = {}
+        self._label_names = {}
+        self._buckets = {}
+        self._counters = {}
+        self._histograms = {}
+        self._last_flush = time.monotonic()
+
+    def describe(self, name, kind, help_text, label_names, buckets=None):
+        self._help[name] = (kind, help_text)
+        self._label_names[name] = tuple(label_names)
+        if buckets is not None:
+            self._buckets[name] = tuple(buckets)
+
+    def inc(self, name, labels, amount=1):
+        key = (name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        self._maybe_flush()
+
+    def observe(self, name, labels, value):
+        buckets = self._buckets.get(name, DEFAULT_BUCKETS)
+        index = bisect.bisect_left(buckets, value)
+        key = (name, labels)
+        with self._lock:
+            entry = self._histograms.get(key)
+            if entry is None:
+                entry = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+        self._maybe_flush()
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(labels), list(counts), total, count]
+                               for (name, labels), (counts, total, count) in self._histograms.items()],
+            }
+
+    def _maybe_flush(self):
+        if not settings.METRICS_DIR or time.monotonic() - self._last_flush < settings.METRICS_FLUSH_SECONDS:
+            return
+        self._last_flush = time.monotonic()
+        self.flush()
+
+    def flush(self):
+        directory = settings.METRICS_DIR
+        if not directory:
+            return
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        try:
+            os.makedirs(directory, exist_ok=True)
+            with open(path + '.tmp', 'w') as handle:
+                json.dump(self.snapshot(), handle)
+            os.replace(path + '.tmp', path)
+        except OSError as exc:  # pragma: no cover
+            logger.warning('Could not write metrics snapshot %s: %s', path, exc)
+
+    def collect(self):
+        """Snapshots de todos los workers (o solo de este proceso sin METRICS_DIR) sumados"""
+        snapshots = [self.snapshot()]
+        directory = settings.METRICS_DIR
+        if directory and os.path.isdir(directory):
+            own = f'{os.getpid()}.json'
+            for filename in os.listdir(directory):
+                if not filename.endswith('.json') or filename == own:
+                    continue
+                try:
+                    with open(os.path.join(directory, filename)) as handle:
+                        snapshots.append(json.load(handle))
+                except (OSError, ValueError):
+                    continue
+        counters, histograms = {}, {}
+        for snapshot in snapshots:
+            for name, labels, value in snapshot['counters']:
+                key = (name, tuple(labels))
+                counters[key] = counters.get(key, 0) + value
+            for name, labels, counts, total, count in snapshot['histograms']:
+                key = (name, tuple(labels))
+                entry = histograms.setdefault(key, [[0] * len(counts), 0.0, 0])
+                entry[0] = [a + b for a, b in zip(entry[0], counts)]
+                entry[1] += total
+                entry[2] += count
+        return counters, histograms
+
+    def render(self):
+        """Formato de texto de Prometheus (version 0.0.4)"""
+        counters, histograms = self.collect()
+        lines = []
+        for name, (kind, help_text) in self._help.items():
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            if kind == 'counter':
+                for (metric, labels), value in sorted(counters.items()):
+                    if metric == name:
+                        lines.append(f'{name}{_labels(self._label_names[name], labels)} {value}')
+                continue
+            buckets = self._buckets.get(name, DEFAULT_BUCKETS)
+            for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                names = self._label_names[name]
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{_labels(names, labels, le=_number(bound))} {cumulative}')
+                lines.append(f'{name}_bucket{_labels(names, labels, le="+Inf")} {count}')
+                lines.append(f'{name}_sum{_labels(names, labels)} {total}')
+                lines.append(f'{name}_count{_labels(names, labels)} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _labels(names, values, le=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
+
+
+def _define(name, kind, help_text, label_names, buckets=None):
+    registry.describe(name, kind, help_text, label_names, buckets)
+    return name
+
+
+HTTP_REQUESTS = _define('funds_http_requests_total', 'counter',
+                        'Peticiones HTTP por vista, método y código de estado', ('view', 'method', 'status'))
+HTTP_DURATION = _define('funds_http_request_duration_seconds', 'histogram',
+                        'Duración de las peticiones HTTP por vista', ('view', 'method'))
+DYNAMODB_CALLS = _define('funds_dynamodb_calls_total', 'counter',
+                         'Llamadas a la API de DynamoDB por operación', ('operation',))
+DYNAMODB_DURATION = _define('funds_dynamodb_call_duration_seconds', 'histogram',
+                            'Duración de cada llamada a DynamoDB (incluye reintentos)', ('operation',))
+DYNAMODB_PER_REQUEST = _define('funds_dynamodb_calls_per_request', 'histogram',
+                               'Llamadas a DynamoDB hechas en el hilo de cada petición', ('view',), COUNT_BUCKETS)
+DYNAMODB_SECONDS_PER_REQUEST = _define('funds_dynamodb_seconds_per_request', 'histogram',
+                                       'Tiempo en DynamoDB por petición', ('view',))
+NOTIFICATION_DURATION = _define('funds_notification_send_duration_seconds', 'histogram',
+                                'Duración de cada envío de notificación por canal y resultado',
+                                ('channel', 'outcome'))
+COALESCED_SAVED = _define('funds_notifications_coalesced_saved_total', 'counter',
+                          'Envíos ahorrados al agrupar notificaciones en resúmenes, por canal', ('channel',))
+COALESCED_DIGESTS = _define('funds_notifications_coalesced_digests_total', 'counter',
+                            'Resúmenes enviados (envíos con más de una notificación), por canal', ('channel',))
+COALESCED_FLUSHED_FULL = _define('funds_notifications_coalesced_flushed_full_total', 'counter',
+                                 'Resúmenes enviados antes de su ventana por llegar al largo máximo de un SMS',
+                                 ('channel',))
+
+
+def enabled():
+    return settings.METRICS_ENABLED
+
+
+def record_dynamodb_call(operation, seconds):
+    registry.inc(DYNAMODB_CALLS, (operation,))
+    registry.observe(DYNAMODB_DURATION, (operation,), seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.dynamodb_calls += 1
+        stats.dynamodb_seconds += seconds
+
+
+def record_request(view, method, status, seconds, stats):
+    registry.inc(HTTP_REQUESTS, (view, method, str(status)))
+    registry.observe(HTTP_DURATION, (view, method), seconds)
+    registry.observe(DYNAMODB_PER_REQUEST, (view,), stats.dynamodb_calls)
+    registry.observe(DYNAMODB_SECONDS_PER_REQUEST, (view,), stats.dynamodb_seconds)
+
+
+def record_notification(channel, ok, seconds):
+    registry.observe(NOTIFICATION_DURATION, (channel, 'success' if ok else 'failure'), seconds)
+
+
+def record_coalesced(channel, entries):
+    """Un envío del coalescer con `entries` notificaciones"""
+    if entries > 1:
+        registry.inc(COALESCED_SAVED, (channel,), entries - 1)
+        registry.inc(COALESCED_DIGESTS, (channel,))
+
+
+def record_coalesced_flushed_full(channel):
+    registry.inc(COALESCED_FLUSHED_FULL, (channel,))
+
+
+# Tras un fork (gunicorn --preload) el hijo no debe heredar ni reportar los contadores del padre
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry.reset)
+atexit.register(registry.flush)
@@ -0,0 +1,243 @@
+import logging
+import re
+import time
+import zlib
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+from . import metrics, profiling, slowlog
+
+logger = logging.getLogger(__name__)
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/')
+_ACCEPT_ENCODING_RE = re.compile(r'\s*([a-z*]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*', re.IGNORECASE)
+
+
+def accepted_encodings(header):
+    """{'gzip': 1.0, 'br': 0.8, ...} a partir de Accept-Encoding (q=0 significa no aceptado)"""
+    encodings = {}
+    for part in header.split(','):
+        match = _ACCEPT_ENCODING_RE.fullmatch(part)
+        if not match:
+            continue
+        try:
+            quality = float(match.group(2)) if match.group(2) is not None else 1.0
+        except ValueError:
+            continue
+        encodings[match.group(1).lower()] = quality
+    return encodings
+
+
+def choose_encoding(header, available):
+    """Elegir la codificación aceptada con mayor q; a igual q gana el orden de `available`"""
+    encodings = accepted_encodings(header)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = encodings.get(encoding, encodings.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _GzipStream:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data):
+        # Z_SYNC_FLUSH: cada bloque del streaming sale al cliente sin esperar al siguiente
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Comprime respuestas JSON con brotli o gzip según Accept-Encoding.
+
+    Las respuestas normales solo se comprimen desde COMPRESSION_MIN_SIZE bytes y si el resultado es
+    menor; las de streaming (?stream=) se comprimen bloque a bloque sin acumular el cuerpo.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'COMPRESSION_ENABLED', True):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.gzip_level = getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+        self.available = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def compress(self, encoding, content):
+        if encoding == 'br':
+            return brotli.compress(content, quality=self.brotli_quality)
+        return zlib.compress(content, self.gzip_level, wbits=zlib.MAX_WBITS | 16)
+
+    def stream(self, encoding):
+        return _BrotliStream(self.brotli_quality) if encoding == 'br' else _GzipStream(self.gzip_level)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), self.available)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if getattr(response, 'is_async', False):
+                response.streaming_content = self._compress_async(encoding, response.streaming_content)
+            else:
+                response.streaming_content = self._compress_sync(encoding, response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            compressed = self.compress(encoding, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # El cuerpo cambia de bytes: el ETag pasa a ser débil (mismo criterio que GZipMiddleware)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compress_sync(self, encoding, chunks):
+        stream = self.stream(encoding)
+        for chunk in chunks:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+
+    async def _compress_async(self, encoding, chunks):
+        stream = self.stream(encoding)
+        async for chunk in chunks:
+            data = stream.compress(chunk)
+            if data:
+                yield data
+        yield stream.finish()
+
+
+class RequestIdMiddleware(MiddlewareMixin):
+    """Id de correlación por petición: el X-Request-ID entrante (del proxy o del cliente) o uno nuevo.
+    Se devuelve en la respuesta y aparece en el log de operaciones lentas y en los perfiles."""
+
+    def process_request(self, request):
+        request.request_id = slowlog.request_id_from(request.META.get('HTTP_X_REQUEST_ID'))
+        request._request_id_token = slowlog.set_request_id(request.request_id)
+
+    def process_response(self, request, response):
+        request_id = getattr(request, 'request_id', None)
+        if request_id is None:
+            return response
+        response.headers[slowlog.REQUEST_ID_HEADER] = request_id
+        try:
+            slowlog.reset_request_id(request._request_id_token)
+        except ValueError:
+            # Bajo ASGI process_request corre en otro contexto; la variable ya no está activa aquí
+            pass
+        return response
+
+
+class MetricsMiddleware(MiddlewareMixin):
+    """Latencia y código de estado por vista, y llamadas a DynamoDB hechas en cada petición.
+
+    Va primero en MIDDLEWARE para medir también al resto de middleware.
+    """
+
+    def __init__(self, get_response):
+        if not metrics.enabled():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_request(self, request):
+        request._metrics_start = time.perf_counter()
+        request._metrics_stats, request._metrics_token = metrics.start_request()
+
+    def process_response(self, request, response):
+        start = getattr(request, '_metrics_start', None)
+        if start is None:
+            return response
+        match = getattr(request, 'resolver_match', None)
+        view = match.url_name or match.view_name if match else 'unmatched'
+        metrics.record_request(view, request.method, response.status_code, time.perf_counter() - start,
+                               request._metrics_stats)
+        try:
+            metrics.finish_request(request._metrics_token)
+        except ValueError:
+            # Bajo ASGI process_request corre en otro contexto; la variable ya no está activa aquí
+            pass
+        return response
+
+
+class ProfilingMiddleware(MiddlewareMixin):
+    """Perfilado por petición a pedido (header X-Profile-Token = PROFILING_TOKEN) o por muestreo
+    (PROFILING_SAMPLE_RATE). Las peticiones no perfiladas no pagan nada más que el sorteo."""
+
+    def __init__(self, get_response):
+        if not profiling.enabled():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.is_async = iscoroutinefunction(get_response)
+
+    def process_request(self, request):
+        trigger = profiling.should_profile(request)
+        if trigger is None:
+            return
+        # Bajo ASGI la vista no corre en este hilo: solo spans, sin cProfile
+        profile = profiling.RequestProfile(trigger, use_cprofile=not self.is_async)
+        request._profile = profile
+        profile.begin()
+
+    def process_template_response(self, request, response):
+        profile = getattr(request, '_profile', None)
+        if profile is not None:
+            render = response.render
+
+            def timed_render():
+                start = time.perf_counter()
+                try:
+                    return render()
+                finally:
+                    profile.add_span('render', type(response).__name__, time.perf_counter() - start)
+            response.render = timed_render
+        return response
+
+    def process_response(self, request, response):
+        profile = getattr(request, '_profile', None)
+        if profile is None:
+            return response
+        profile.end()
+        path = profile.write(request, response.status_code)
+        if profile.trigger == 'header':
+            response.headers[profiling.SUMMARY_HEADER] = profile.summary()
+        logger.info('Profiled %s %s: %s%s', request.method, request.path, profile.summary(),
+                    f' ({path})' if path else '')
+        return response
@@ -1,5 +1,18 @@
 from datetime import datetime
 from .dynamo_client import DynamoDBClient
+from . import conditional
+
+def from_projection(cls, item, fields):
+    """Instancia parcial con solo los atributos proyectados (?fields=); los ausentes quedan en None"""
+    obj = cls.__new__(cls)
+    obj.__dict__.update(dict.fromkeys(fields))
+    obj.__dict__.update((name, item[name]) for name in fields if name in item)
+    return obj
+
+def _builder(cls, fields):
+    if fields:
+        return lambda item: from_projection(cls, item, fields)
+    return cls.from_dynamo_item
 
 class Fund:
     def __init__(self, fund_id, name, type, min_amount, max_amount, risk_level, description=None, created_at=None):
@@ -42,24 +55,40 @@ class Fund:
     @staticmethod
     def save(fund):
         client = DynamoDBClient()
-        return client.put_item(fund.to_dynamo_item())
+        response = client.put_item(fund.to_dynamo_item())
+        conditional.invalidate('funds', f'fund:{fund.fund_id}')
+        return response
     
     @staticmethod
-    def get_by_id(fund_id):
+    def get_by_id(fund_id, fields=None):
         client = DynamoDBClient()
-        item = client.get_item(f'FUND#{fund_id}', f'FUND#{fund_id}')
+        item = client.get_item(f'FUND#{fund_id}', f'FUND#{fund_id}', projection=fields)
         if item:
-            return Fund.from_dynamo_item(item)
+            return _builder(Fund, fields)(item)
         return None
     
     @staticmethod
-    def get_all():
+    def get_by_ids(fund_ids, fields=None):
+        """Varios fondos en una sola lectura en lote; devuelve {fund_id: Fund}"""
+        if not fund_ids:
+            return {}
         client = DynamoDBClient()
-        items = client.scan()
+        items = client.batch_get_items(
+            [{'pk': f'FUND#{fund_id}', 'sk': f'FUND#{fund_id}'} for fund_id in fund_ids],
+            projection=fields
+        )
+        build = _builder(Fund, fields)
+        return {item['pk'][len('FUND#'):]: build(item) for item in items}
+    
+    @staticmethod
+    def get_all(fields=None):
+        client = DynamoDBClient()
+        items = client.scan(projection=fields)
+        build = _builder(Fund, fields)
         funds = []
         for item in items:
             if item['pk'].startswith('FUND#'):
-                funds.append(Fund.from_dynamo_item(item))
+                funds.append(build(item))
         return funds
 
 class ClientBalance:
@@ -151,6 +180,23 @@ class Transaction:
             if item['sk'].startswith('TRANSACTION#'):
                 transactions.append(Transaction.from_dynamo_item(item))
         return transactions
+    
+    @staticmethod
+    def get_page_by_client_id(client_id, limit, start_key=None, fields=None):
+        """Una página de transacciones del cliente; devuelve (transacciones, last_key)"""
+        client = DynamoDBClient()
+        items, last_key = client.query_page(f'CLIENT#{client_id}', 'TRANSACTION#', limit, start_key, projection=fields)
+        build = _builder(Transaction, fields)
+        return [build(item) for item in items], last_key
+    
+    @staticmethod
+    def iter_by_client_id(client_id, page_size=None, fields=None):
+        """Iterar transacciones del cliente leyendo DynamoDB página a página"""
+        client = DynamoDBClient()
+        build = _builder(Transaction, fields)
+        for page in client.query_pages(f'CLIENT#{client_id}', 'TRANSACTION#', page_size, projection=fields):
+            for item in page:
+                yield build(item)
 
 class ClientFundSubscription:
     def __init__(self, client_id, fund_id, amount, subscription_date=None):
@@ -193,6 +239,14 @@ class ClientFundSubscription:
                 subscriptions.append(ClientFundSubscription.from_dynamo_item(item))
         return subscriptions
     
+    @staticmethod
+    def get_page_by_client_id(client_id, limit, start_key=None, fields=None):
+        """Una página de suscripciones del cliente; devuelve (suscripciones, last_key)"""
+        client = DynamoDBClient()
+        items, last_key = client.query_page(f'CLIENT#{client_id}', 'SUBSCRIPTION#', limit, start_key, projection=fields)
+        build = _builder(ClientFundSubscription, fields)
+        return [build(item) for item in items], last_key
+    
     @staticmethod
     def get_by_client_and_fund(client_id, fund_id):
         client = DynamoDBClient()
@@ -246,14 +300,15 @@ class Client:
         """Guardar cliente en DynamoDB"""
         dynamo_client = DynamoDBClient()
         dynamo_client.put_item(client.to_dynamo_item())
+        conditional.invalidate(f'client:{client.client_id}')
     
     @staticmethod
-    def get_by_id(client_id):
+    def get_by_id(client_id, fields=None):
         """Obtener cliente por ID"""
         client = DynamoDBClient()
-        item = client.get_item(f'CLIENT#{client_id}', f'CLIENT#{client_id}')
+        item = client.get_item(f'CLIENT#{client_id}', f'CLIENT#{client_id}', projection=fields)
         if item:
-            return Client.from_dynamo_item(item)
+            return _builder(Client, fields)(item)
         return None
     
     @staticmethod
@@ -267,8 +322,34 @@ class Client:
                 clients.append(Client.from_dynamo_item(item))
         return clients
     
+    @staticmethod
+    def get_page(limit, start_key=None, fields=None):
+        """Una página de clientes (escaneo acotado); devuelve (clientes, last_key)"""
+        client = DynamoDBClient()
+        items, last_key = client.scan_page(
+            limit,
+            start_key,
+            filter_expression='begins_with(pk, :prefix) AND begins_with(sk, :prefix)',
+            expression_values={':prefix': 'CLIENT#'},
+            projection=fields
+        )
+        build = _builder(Client, fields)
+        return [build(item) for item in items], last_key
+    
+    @staticmethod
+    def iter_all(page_size=None, fields=None):
+        """Iterar todos los clientes escaneando la tabla página a página"""
+        client = DynamoDBClient()
+        build = _builder(Client, fields)
+        for page in client.scan_pages(page_size, projection=fields):
+            for item in page:
+                if item['pk'].startswith('CLIENT#') and item['sk'].startswith('CLIENT#'):
+                    yield build(item)
+    
     @staticmethod
     def delete(client_id):
         """Eliminar cliente"""
         client = DynamoDBClient()
-        return client.delete_item(f'CLIENT#{client_id}', f'CLIENT#{client_id}')
+        response = client.delete_item(f'CLIENT#{client_id}', f'CLIENT#{client_id}')
+        conditional.invalidate(f'client:{client_id}')
+        return response
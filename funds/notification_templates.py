@@ -0,0 +1,177 @@
+import base64
+import html
+import uuid
+from functools import lru_cache
+from string import Formatter
+from typing import Dict, Iterable, List, Optional
+
+from django.core.exceptions import ImproperlyConfigured
+from email.header import Header
+
+
+class CompiledTemplate:
+    """Plantilla str.format analizada una sola vez (campos validados al arrancar)"""
+
+    def __init__(self, source: str, escape_html: bool = False):
+        self.source = source
+        self.escape_html = escape_html
+        self.fields = tuple(
+            field for _, field, _, _ in Formatter().parse(source) if field is not None
+        )
+        if any(not field or not field.isidentifier() for field in self.fields):
+            raise ImproperlyConfigured(f'Plantilla con campos inválidos: {source!r}')
+
+    def render(self, context: Dict) -> str:
+        if self.escape_html:
+            context = {field: html.escape(str(context[field])) for field in self.fields}
+        return self.source.format_map(context)
+
+
+class RenderedNotification:
+    __slots__ = ('event', 'subject', 'text', 'html', 'sms')
+
+    def __init__(self, event, subject, text, html=None, sms=None):
+        self.event = event
+        self.subject = subject
+        self.text = text
+        self.html = html
+        self.sms = sms if sms is not None else text
+
+
+class NotificationTemplate:
+    def __init__(self, event, subject, text, html, sms):
+        self.event = event
+        self.subject = CompiledTemplate(subject)
+        self.text = CompiledTemplate(text)
+        self.html = CompiledTemplate(html, escape_html=True)
+        self.sms = CompiledTemplate(sms)
+        self.fields = frozenset(self.subject.fields + self.text.fields + self.html.fields + self.sms.fields)
+
+    def render(self, context: Dict, channel: Optional[str] = None) -> RenderedNotification:
+        """Renderizar la notificación; con channel='sms' o 'email' solo se generan esas variantes"""
+        missing = self.fields.difference(context)
+        if missing:
+            raise KeyError(f'Faltan campos para la plantilla {self.event}: {", ".join(sorted(missing))}')
+        if channel == 'sms':
+            return RenderedNotification(self.event, self.subject.render(context), None, sms=self.sms.render(context))
+        text = self.text.render(context)
+        return RenderedNotification(
+            self.event,
+            self.subject.render(context),
+            text,
+            html=self.html.render(context),
+            sms=self.sms.render(context) if channel is None else text,
+        )
+
+    def render_many(self, contexts: Iterable[Dict], channel: Optional[str] = None) -> List[RenderedNotification]:
+        return [self.render(context, channel) for context in contexts]
+
+
+HTML_LAYOUT = '<html><body style="font-family: Arial, sans-serif">{content}</body></html>'
+
+# Un template por cada evento notificado desde services.py
+TEMPLATES = {
+    template.event: template for template in (
+        NotificationTemplate(
+            event='create',
+            subject='Bienvenido: cuenta creada',
+            text='Hola {nombre}, tu cliente {client_id} fue creado con saldo inicial de {initial_balance}.',
+            html=('<p>Hola <strong>{nombre}</strong>,</p>'
+                  '<p>Tu cliente <strong>{client_id}</strong> fue creado con saldo inicial de '
+                  '<strong>{initial_balance}</strong>.</p>'),
+            sms='Bienvenido {nombre}: cliente {client_id} creado. Saldo inicial {initial_balance}.',
+        ),
+        NotificationTemplate(
+            event='deposit',
+            subject='Depósito recibido',
+            text='Se acreditaron {amount} a tu cuenta. Nuevo saldo: {new_balance}.',
+            html='<p>Se acreditaron <strong>{amount}</strong> a tu cuenta.</p><p>Nuevo saldo: {new_balance}.</p>',
+            sms='Deposito de {amount} recibido. Saldo: {new_balance}.',
+        ),
+        NotificationTemplate(
+            event='subscription',
+            subject='Suscripción realizada',
+            text=('Te suscribiste al fondo {fund_name} (ID {fund_id}) por {amount}. '
+                  'Saldo disponible: {new_balance}.'),
+            html=('<p>Te suscribiste al fondo <strong>{fund_name}</strong> (ID {fund_id}) por '
+                  '<strong>{amount}</strong>.</p><p>Saldo disponible: {new_balance}.</p>'),
+            sms='Suscripcion a {fund_name} por {amount}. Saldo: {new_balance}.',
+        ),
+        NotificationTemplate(
+            event='cancellation',
+            subject='Suscripción cancelada',
+            text=('Cancelaste el fondo {fund_name} (ID {fund_id}). '
+                  'Se devolvieron {amount}. Nuevo saldo: {new_balance}.'),
+            html=('<p>Cancelaste el fondo <strong>{fund_name}</strong> (ID {fund_id}).</p>'
+                  '<p>Se devolvieron <strong>{amount}</strong>. Nuevo saldo: {new_balance}.</p>'),
+            sms='Cancelaste {fund_name}. Devuelto {amount}. Saldo: {new_balance}.',
+        ),
+    )
+}
+
+
+def render(event: str, context: Dict, channel: Optional[str] = None) -> RenderedNotification:
+    return TEMPLATES[event].render(context, channel)
+
+
+def render_many(event: str, contexts: Iterable[Dict], channel: Optional[str] = None) -> List[RenderedNotification]:
+    return TEMPLATES[event].render_many(contexts, channel)
+
+
+def render_digest(notifications: List[RenderedNotification]) -> RenderedNotification:
+    """Unir varias notificaciones ya renderizadas en un solo resumen"""
+    if len(notifications) == 1:
+        return notifications[0]
+    subject = f'Resumen: {len(notifications)} notificaciones'
+    text = '\n'.join(f'- {item.subject}: {item.text or item.sms}' for item in notifications)
+    items = ''.join(
+        f'<li><strong>{html.escape(item.subject)}</strong>{item.html or html.escape(item.text or item.sms)}</li>'
+        for item in notifications
+    )
+    return RenderedNotification(
+        'digest',
+        subject,
+        text,
+        html=f'<p>{subject}</p><ul>{items}</ul>',
+        sms='\n'.join(item.sms for item in notifications),
+    )
+
+
+@lru_cache(maxsize=256)
+def _encode_header(value: str) -> str:
+    if value.isascii():
+        return value
+    return Header(value, 'utf-8').encode()
+
+
+def _encode_part(content_type: str, body: str) -> str:
+    payload = base64.encodebytes(body.encode('utf-8')).decode('ascii')
+    return (
+        f'Content-Type: {content_type}; charset="utf-8"\n'
+        'MIME-Version: 1.0\n'
+        'Content-Transfer-Encoding: base64\n\n'
+        f'{payload}'
+    )
+
+
+def encode_email(from_header: str, to_email: str, subject: str, text: str, html_body: Optional[str] = None) -> str:
+    """Generar el mensaje MIME directamente (sin pasar por MIMEText/Generator por cada envío)"""
+    headers = (
+        f'Subject: {_encode_header(subject)}\n'
+        f'From: {from_header}\n'
+        f'To: {to_email}\n'
+    )
+    if html_body is None:
+        return headers + _encode_part('text/plain', text)
+
+    boundary = f'===============funds{uuid.uuid4().hex}=='
+    return (
+        f'Content-Type: multipart/alternative; boundary="{boundary}"\n'
+        'MIME-Version: 1.0\n'
+        f'{headers}\n'
+        f'--{boundary}\n'
+        f'{_encode_part("text/plain", text)}'
+        f'--{boundary}\n'
+        f'{_encode_part("text/html", HTML_LAYOUT.format(content=html_body))}'
+        f'--{boundary}--\n'
+    )
@@ -1,24 +1,36 @@
 import logging
-import smtplib
-from email.mime.text import MIMEText
+import time
 from email.utils import formataddr
-from typing import Tuple
-from twilio.rest import Client
+from typing import List, Optional, Tuple
 from django.conf import settings
 
-try:
-    from twilio.rest import Client as TwilioClient
-except Exception:  # pragma: no cover
-    TwilioClient = None
-
 from .models import Client as ClientModel
+from .smtp_pool import get_smtp_pool
+from .coalescing import get_coalescer
+from . import notification_templates as templates
+from . import metrics, profiling
+from . import sms
 
 logger = logging.getLogger(__name__)
 
 
 class NotificationService:
     @staticmethod
-    def send_email(to_email: str, subject: str, body: str) -> Tuple[bool, str]:
+    def _email_settings_error():
+        if not settings.NOTIFICATIONS_ENABLED:
+            return 'Notifications disabled'
+        if not settings.EMAIL_HOST_USER or not settings.EMAIL_HOST_PASSWORD:
+            return 'Email settings are not configured'
+        return None
+
+    @staticmethod
+    def _build_email(to_email: str, subject: str, body: str, html: Optional[str] = None) -> Tuple[str, str]:
+        sender_email = settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER
+        raw = templates.encode_email(formataddr(('Funds App', sender_email)), to_email, subject, body, html)
+        return sender_email, raw
+
+    @staticmethod
+    def send_email(to_email: str, subject: str, body: str, html: Optional[str] = None) -> Tuple[bool, str]:
         if not settings.NOTIFICATIONS_ENABLED:
             return False, 'Notifications disabled'
 
@@ -29,77 +41,131 @@ class NotificationService:
             return False, 'Email settings are not configured'
 
         try:
-            msg = MIMEText(body, 'plain', 'utf-8')
-            sender_email = settings.DEFAULT_FROM_EMAIL or settings.EMAIL_HOST_USER
-            msg['Subject'] = subject
-            msg['From'] = formataddr(('Funds App', sender_email))
-            msg['To'] = to_email
+            sender_email, raw = NotificationService._build_email(to_email, subject, body, html)
+
+            if getattr(settings, 'EMAIL_POOL_ENABLED', False):
+                return get_smtp_pool().send_messages([(sender_email, [to_email], raw)])[0]
+
+            import smtplib
 
             with smtplib.SMTP(settings.EMAIL_HOST, settings.EMAIL_PORT) as server:
                 server.ehlo()
                 if getattr(settings, 'EMAIL_USE_TLS', True):
                     server.starttls()
                 server.login(settings.EMAIL_HOST_USER, settings.EMAIL_HOST_PASSWORD)
-                server.sendmail(sender_email, [to_email], msg.as_string())
+                server.sendmail(sender_email, [to_email], raw)
             return True, 'Email sent'
         except Exception as exc:  # pragma: no cover
             logger.exception('Error sending email: %s', exc)
             return False, str(exc)
 
     @staticmethod
-    def send_sms(to_phone: str, body: str) -> Tuple[bool, str]:
-        if not settings.NOTIFICATIONS_ENABLED:
-            return False, 'Notifications disabled'
+    def send_bulk_email(messages: List[Tuple]) -> List[Tuple[bool, str]]:
+        """Enviar varios correos (to, subject, body[, html]) reutilizando sesiones del pool SMTP"""
+        error = NotificationService._email_settings_error()
+        if error:
+            return [(False, error)] * len(messages)
+
+        results: List[Tuple[bool, str]] = [(False, 'Missing recipient email')] * len(messages)
+        batch, positions = [], []
+        for index, (to_email, subject, body, *html) in enumerate(messages):
+            if not to_email:
+                continue
+            sender_email, raw = NotificationService._build_email(to_email, subject, body, *html)
+            batch.append((sender_email, [to_email], raw))
+            positions.append(index)
 
-        if not to_phone:
-            return False, 'Missing recipient phone'
+        try:
+            for index, result in zip(positions, get_smtp_pool().send_messages(batch)):
+                results[index] = result
+        except Exception as exc:  # pragma: no cover
+            logger.exception('Error sending bulk email: %s', exc)
+            for index in positions:
+                results[index] = (False, str(exc))
+        return results
 
+    @staticmethod
+    def _sms_settings_error():
+        if not settings.NOTIFICATIONS_ENABLED:
+            return 'Notifications disabled'
         if not settings.TWILIO_ACCOUNT_SID or not settings.TWILIO_AUTH_TOKEN or not settings.TWILIO_FROM_NUMBER:
-            return False, 'Twilio settings are not configured'
+            return 'Twilio settings are not configured'
+        if not sms.twilio_available():
+            return 'Twilio client not available'
+        return None
 
-        if TwilioClient is None:
-            return False, 'Twilio client not available'
+    @staticmethod
+    def send_sms(to_phone: str, body: str) -> Tuple[bool, str]:
+        """Enviar un SMS respetando SMS_RATE_PER_SECOND (el limitador del dispatcher compartido del proceso)"""
+        error = NotificationService._sms_settings_error()
+        if error:
+            return False, error
+
+        if not to_phone:
+            return False, 'Missing recipient phone'
 
         try:
-            # client = TwilioClient(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-            # message = client.messages.create(
-            #     body=body,
-            #     from_=settings.TWILIO_FROM_NUMBER,
-            #     to=to_phone,
-            # )
-
-            client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-            message = client.messages.create(
-              from_=settings.TWILIO_FROM_NUMBER,
-              body=body,
-              to=to_phone
-            )
-            return True, message.sid
+            return sms.get_sms_dispatcher().send_one(to_phone, body)
         except Exception as exc:  # pragma: no cover
             logger.exception('Error sending SMS: %s', exc)
             return False, str(exc)
 
     @staticmethod
-    def notify_client(client_id: str, subject: str, message: str) -> None:
+    def send_bulk_sms(messages: List[Tuple[str, str]]) -> List[Tuple[str, bool, str]]:
+        """Enviar varios SMS (to, body) en paralelo, limitados por SMS_RATE_PER_SECOND"""
+        error = NotificationService._sms_settings_error()
+        if error:
+            return [(to_phone, False, error) for to_phone, _ in messages]
+
+        try:
+            return sms.get_sms_dispatcher().dispatch(messages)
+        except Exception as exc:  # pragma: no cover
+            logger.exception('Error sending bulk SMS: %s', exc)
+            return [(to_phone, False, str(exc)) for to_phone, _ in messages]
+
+    @staticmethod
+    def deliver(channel: str, recipient: str, notification: templates.RenderedNotification) -> Tuple[bool, str]:
+        start = time.perf_counter()
+        if channel == 'email':
+            ok, detail = NotificationService.send_email(
+                recipient, notification.subject, notification.text, notification.html
+            )
+        else:
+            ok, detail = NotificationService.send_sms(recipient, notification.sms)
+        seconds = time.perf_counter() - start
+        metrics.record_notification(channel, ok, seconds)
+        profiling.record_span('notification', channel, seconds, {'ok': ok})
+        return ok, detail
+
+    @staticmethod
+    def coalescing_metrics():
+        return get_coalescer(NotificationService.deliver).metrics()
+
+    @staticmethod
+    def notify_client(client_id: str, subject: str = None, message: str = None,
+                      event: str = None, context: dict = None, client: Optional[ClientModel] = None) -> None:
+        """client: el perfil ya leído por el servicio, para no volver a pedirlo a DynamoDB"""
         try:
-            client = ClientModel.get_by_id(client_id)
+            if client is None:
+                client = ClientModel.get_by_id(client_id)
             if not client:
                 logger.warning('Client %s not found to notify', client_id)
                 return
 
-            print(client)
-            print(client.email)
-            print(client.phone)
-            print(message)
-            print(subject)
+            if context is not None and event in templates.TEMPLATES:
+                notification = templates.render(event, context)
+            else:
+                notification = templates.RenderedNotification(event, subject, message)
+
+            logger.debug('Notifying client %s (%s) email=%s phone=%s', client_id, notification.subject,
+                         client.email, client.phone)
 
+            coalescer = get_coalescer(NotificationService.deliver)
             if getattr(client, 'email', None):
-                status, info = NotificationService.send_email(client.email, subject, message)
-                print(status, info)
+                result = coalescer.submit('email', client_id, client.email, notification)
+                logger.debug('Email to %s: %s', client_id, result or 'queued for digest')
             if getattr(client, 'phone', None):
-                status, info = NotificationService.send_sms(client.phone, message)
-                print(status, info)
+                result = coalescer.submit('sms', client_id, client.phone, notification)
+                logger.debug('SMS to %s: %s', client_id, result or 'queued for digest')
         except Exception as exc:  # pragma: no cover
             logger.exception('Error in notify_client: %s', exc)
-
-
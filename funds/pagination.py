@@ -0,0 +1,74 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from rest_framework.pagination import BasePagination
+
+
+class PaginationError(ValueError):
+    pass
+
+
+def encode_cursor(last_key, scope=None):
+    """Codificar el LastEvaluatedKey de DynamoDB como cursor opaco; `scope` lo ata a un listado cuyas llaves
+    no se pueden validar por prefijo (un scan filtrado puede terminar en cualquier item de la tabla)"""
+    if not last_key:
+        return None
+    key = {'pk': last_key['pk'], 'sk': last_key['sk']}
+    if scope:
+        key['s'] = scope
+    raw = json.dumps(key, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, pk_prefix=None, sk_prefix=None, scope=None):
+    """Decodificar un cursor y validar que pertenezca a la consulta (mismo pk / prefijo de sk / scope)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise PaginationError('Cursor inválido')
+    if (not isinstance(key, dict) or set(key) - {'s'} != {'pk', 'sk'}
+            or not all(isinstance(v, str) for v in key.values())):
+        raise PaginationError('Cursor inválido')
+    if ((pk_prefix and not key['pk'].startswith(pk_prefix)) or (sk_prefix and not key['sk'].startswith(sk_prefix))
+            or key.pop('s', None) != scope):
+        raise PaginationError('El cursor no corresponde a esta consulta')
+    return key
+
+
+class DynamoCursorPagination(BasePagination):
+    """Paginación por cursor opaco sobre DynamoDB: ?limit=N&cursor=<next_cursor>. Las vistas la instancian y
+    llaman a get_limit/get_start_key/get_page_info; no implementa paginate_queryset para las vistas genéricas."""
+    limit_query_param = 'limit'
+    cursor_query_param = 'cursor'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'PAGINATION_DEFAULT_LIMIT', 10)
+        self.max_page_size = getattr(settings, 'PAGINATION_MAX_LIMIT', 100)
+
+    def get_limit(self, request):
+        raw = request.query_params.get(self.limit_query_param)
+        if raw is None:
+            return self.page_size
+        try:
+            limit = int(raw)
+        except ValueError:
+            raise PaginationError(f'El parámetro {self.limit_query_param} debe ser un entero')
+        if limit < 1:
+            raise PaginationError(f'El parámetro {self.limit_query_param} debe ser mayor a 0')
+        return min(limit, self.max_page_size)
+
+    def get_start_key(self, request, pk_prefix=None, sk_prefix=None, scope=None):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        return decode_cursor(cursor, pk_prefix, sk_prefix, scope)
+
+    def get_page_info(self, limit, items, last_key, scope=None):
+        return {
+            'count': len(items),
+            'limit': limit,
+            'next_cursor': encode_cursor(last_key, scope),
+        }
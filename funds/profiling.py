@@ -0,0 +1,143 @@
+import contextvars
+import cProfile
+import hmac
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+TOKEN_HEADER = 'HTTP_X_PROFILE_TOKEN'
+SUMMARY_HEADER = 'X-Profile-Summary'
+TOP_FUNCTIONS = 25
+
+_current = contextvars.ContextVar('funds_profile', default=None)
+# cProfile solo admite un perfilador activo por proceso en Python 3.12+; uno a la vez y el resto solo spans
+_cprofile_lock = threading.Lock()
+
+
+def enabled():
+    return bool(settings.PROFILING_TOKEN) or settings.PROFILING_SAMPLE_RATE > 0
+
+
+def should_profile(request):
+    """True si la petición trae el token correcto (header X-Profile-Token) o cae en el muestreo"""
+    token = request.META.get(TOKEN_HEADER)
+    # En bytes: compare_digest sobre str con caracteres no ASCII lanza TypeError (un header así daría 500)
+    if token and settings.PROFILING_TOKEN and hmac.compare_digest(token.encode('latin-1', 'replace'),
+                                                                  settings.PROFILING_TOKEN.encode()):
+        return 'header'
+    if settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE:
+        return 'sample'
+    return None
+
+
+class RequestProfile:
+    """Spans (DynamoDB, notificaciones, render) y cProfile opcional de una petición"""
+
+    def __init__(self, trigger, use_cprofile=True):
+        self.id = uuid.uuid4().hex[:12]
+        self.trigger = trigger
+        self.spans = []
+        self.start = time.perf_counter()
+        self.elapsed = None
+        self.profiler = None
+        if use_cprofile and _cprofile_lock.acquire(blocking=False):
+            self.profiler = cProfile.Profile()
+
+    def begin(self):
+        self.token = _current.set(self)
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def end(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            _cprofile_lock.release()
+        self.elapsed = time.perf_counter() - self.start
+        try:
+            _current.reset(self.token)
+        except ValueError:
+            # Bajo ASGI begin() corre en otro contexto; la variable ya no está activa aquí
+            pass
+
+    def add_span(self, kind, name, seconds, detail=None):
+        self.spans.append({
+            'kind': kind,
+            'name': name,
+            'offset_ms': round((time.perf_counter() - seconds - self.start) * 1000, 3),
+            'duration_ms': round(seconds * 1000, 3),
+            'detail': detail,
+        })
+
+    def breakdown(self):
+        """{kind: (llamadas, ms)}"""
+        totals = defaultdict(lambda: [0, 0.0])
+        for span in self.spans:
+            totals[span['kind']][0] += 1
+            totals[span['kind']][1] += span['duration_ms']
+        return dict(totals)
+
+    def summary(self):
+        parts = [f'id={self.id}', f'total={self.elapsed * 1000:.1f}ms']
+        for kind, (count, ms) in sorted(self.breakdown().items()):
+            parts.append(f'{kind}={count}x{ms:.1f}ms')
+        return '; '.join(parts)
+
+    def top_functions(self):
+        if self.profiler is None:
+            return []
+        stats = pstats.Stats(self.profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, calls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({'function': f'{filename}:{line}({function})', 'calls': calls,
+                         'tottime_ms': round(tottime * 1000, 3), 'cumtime_ms': round(cumtime * 1000, 3)})
+        rows.sort(key=lambda row: row['cumtime_ms'], reverse=True)
+        return rows[:TOP_FUNCTIONS]
+
+    def write(self, request, status_code):
+        """<PROFILING_DIR>/<id>.json con spans y funciones más costosas, y <id>.prof para pstats/snakeviz"""
+        directory = settings.PROFILING_DIR
+        if not directory:
+            return None
+        match = getattr(request, 'resolver_match', None)
+        base = os.path.join(directory, f'{time.strftime("%Y%m%dT%H%M%S")}-{self.id}')
+        try:
+            os.makedirs(directory, exist_ok=True)
+            if self.profiler is not None:
+                self.profiler.dump_stats(base + '.prof')
+            with open(base + '.json', 'w') as handle:
+                json.dump({
+                    'id': self.id,
+                    'request_id': getattr(request, 'request_id', None),
+                    'trigger': self.trigger,
+                    'method': request.method,
+                    'path': request.get_full_path(),
+                    'view': match.url_name if match else None,
+                    'status': status_code,
+                    'total_ms': round(self.elapsed * 1000, 3),
+                    'breakdown': {kind: {'calls': count, 'ms': round(ms, 3)}
+                                  for kind, (count, ms) in self.breakdown().items()},
+                    'spans': self.spans,
+                    'top_functions': self.top_functions(),
+                }, handle, indent=2, default=str)
+        except OSError as exc:  # pragma: no cover
+            logger.warning('Could not write profile %s: %s', base, exc)
+            return None
+        return base + '.json'
+
+
+def record_span(kind, name, seconds, detail=None):
+    """Agregar un span a la petición perfilada en curso (no hace nada si no hay ninguna)"""
+    profile = _current.get()
+    if profile is not None:
+        profile.add_span(kind, name, seconds, detail)
@@ -0,0 +1,32 @@
+import decimal
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_fallback_encoder = JSONEncoder()
+
+
+def _default(obj):
+    # Mismo resultado que el encoder de DRF para Decimal, sin pasar por su cadena de isinstance
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    return _fallback_encoder.default(obj)
+
+
+def dumps(data) -> str:
+    return json.dumps(data, default=_default, ensure_ascii=False, allow_nan=False, separators=(',', ':'))
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer compacto con manejo directo de Decimal; pensado para los listados grandes"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        ret = dumps(data)
+        if '\u2028' in ret or '\u2029' in ret:
+            ret = ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+        return ret.encode()
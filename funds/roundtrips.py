@@ -0,0 +1,144 @@
+import contextvars
+import functools
+import logging
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Lecturas de un solo item/partición: repetidas con la misma forma de llave son un N+1
+SINGLE_READS = frozenset(('GetItem', 'Query'))
+
+_current = contextvars.ContextVar('funds_round_trips', default=None)
+
+
+class RoundTripBudgetExceeded(RuntimeError):
+    pass
+
+
+def enabled():
+    return settings.ROUND_TRIP_MODE != 'off'
+
+
+def _key_identity(key):
+    return tuple(sorted((name, str(value)) for name, value in (key or {}).items()))
+
+
+def _key_shape(key):
+    """'FUND#1' -> 'FUND#': la entidad sin el id, para reconocer la misma lectura en un bucle"""
+    return tuple(sorted((name, str(value).partition('#')[0] + '#' if '#' in str(value) else '*')
+                        for name, value in (key or {}).items()))
+
+
+class RoundTripTracker:
+    """Idas y vueltas a DynamoDB dentro de un alcance (operación de servicio, vista o bloque de test)"""
+
+    def __init__(self, name, budget=None, parent=None):
+        self.name = name
+        self.budget = budget
+        self.parent = parent
+        self.thread = threading.get_ident()
+        self.calls = []
+
+    @property
+    def count(self):
+        return len(self.calls)
+
+    def record(self, operation, key):
+        thread = threading.get_ident()
+        tracker = self
+        while tracker is not None:
+            tracker.calls.append((operation, key, thread != tracker.thread))
+            tracker = tracker.parent
+
+    def _single_reads(self, sequential_only=False):
+        # Las páginas siguientes de una misma Query (ExclusiveStartKey) no son lecturas repetidas
+        return [(operation, key) for operation, key, parallel in self.calls
+                if operation in SINGLE_READS and key and 'ExclusiveStartKey' not in key
+                and not (sequential_only and parallel)]
+
+    def repeated_reads(self):
+        """Lecturas de la misma llave más de una vez: [(operación, llave, veces)]"""
+        counts = Counter((operation, _key_identity(key)) for operation, key in self._single_reads())
+        return [(operation, dict(key), times) for (operation, key), times in counts.items() if times > 1]
+
+    def n_plus_one(self):
+        """Lecturas individuales en serie con la misma forma de llave repetidas ROUND_TRIP_N_PLUS_ONE veces o más.
+        Las hechas desde el pool de lectura (en paralelo) cuentan para el presupuesto pero no como N+1."""
+        counts = Counter((operation, _key_shape(key)) for operation, key in self._single_reads(sequential_only=True))
+        threshold = settings.ROUND_TRIP_N_PLUS_ONE
+        return [(operation, dict(shape), times) for (operation, shape), times in counts.items() if times >= threshold]
+
+    def issues(self):
+        issues = []
+        if self.budget is not None and self.count > self.budget:
+            issues.append(f'{self.count} idas y vueltas a DynamoDB (presupuesto {self.budget})')
+        for operation, key, times in self.repeated_reads():
+            issues.append(f'{operation} repetido {times} veces para {key}')
+        for operation, shape, times in self.n_plus_one():
+            issues.append(f'posible N+1: {times} {operation} con llave {shape}; usar una lectura en lote')
+        return issues
+
+    def check(self):
+        issues = self.issues()
+        if not issues:
+            return
+        message = f'{self.name}: ' + '; '.join(issues)
+        if settings.ROUND_TRIP_MODE == 'raise':
+            raise RoundTripBudgetExceeded(message)
+        logger.warning(message)
+
+
+@contextmanager
+def track_round_trips(name='block', budget=None, check=False):
+    """Contar las llamadas a DynamoDB del bloque. En tests:
+
+        with track_round_trips() as tracker:
+            client.get('/api/clients/C1/balance/')
+        assert tracker.count <= 3 and not tracker.issues()
+    """
+    tracker = RoundTripTracker(name, budget, _current.get())
+    token = _current.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current.reset(token)
+    if check:
+        tracker.check()
+
+
+def round_trip_budget(budget):
+    """Declarar cuántas llamadas a DynamoDB puede hacer la función; al exceder se registra un warning
+    (ROUND_TRIP_MODE=log) o se lanza RoundTripBudgetExceeded (ROUND_TRIP_MODE=raise)"""
+    def decorator(func):
+        name = func.__qualname__
+
+        if iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not enabled():
+                    return await func(*args, **kwargs)
+                with track_round_trips(name, budget, check=True):
+                    return await func(*args, **kwargs)
+            async_wrapper.round_trip_budget = budget
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            with track_round_trips(name, budget, check=True):
+                return func(*args, **kwargs)
+        wrapper.round_trip_budget = budget
+        return wrapper
+    return decorator
+
+
+def record_round_trip(operation, key):
+    tracker = _current.get()
+    if tracker is not None:
+        tracker.record(operation, key)
@@ -1,4 +1,8 @@
+from decimal import Decimal
+
+from django.conf import settings
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 from .models import Fund, ClientBalance, Transaction, ClientFundSubscription, Client
 
 class FundSerializer(serializers.Serializer):
@@ -76,3 +80,85 @@ class ClientCreateSerializer(serializers.Serializer):
     ciudad = serializers.CharField(max_length=100)
     email = serializers.EmailField(required=False, allow_null=True, allow_blank=True)
     phone = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+
+class ClientBatchRequestSerializer(serializers.Serializer):
+    client_ids = serializers.ListField(child=serializers.CharField(max_length=50), allow_empty=False)
+    
+    def validate_client_ids(self, value):
+        max_clients = settings.BATCH_READ_MAX_CLIENTS
+        if len(value) > max_clients:
+            raise serializers.ValidationError(f'Máximo {max_clients} clientes por petición')
+        return value
+
+
+def _decimal_converter(field):
+    places = field.decimal_places
+    coerce_to_string = getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or places is None or field.localize:
+        return field.to_representation
+    spec = f'.{places}f'
+
+    def convert(value):
+        if not isinstance(value, Decimal):
+            value = Decimal(str(value).strip())
+        return format(value, spec)
+    return convert
+
+
+def _field_converter(field):
+    if isinstance(field, serializers.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, serializers.CharField):
+        return str
+    return field.to_representation
+
+
+class ModelEncoder:
+    """Codificador de solo lectura precompilado a partir de un Serializer.
+
+    Evita el to_representation por campo y por objeto de DRF; produce la misma salida
+    (los DecimalField se formatean con sus decimales, None se mantiene como None).
+    """
+
+    def __init__(self, serializer_class, fields=None):
+        self.serializer_class = serializer_class
+        declared = serializer_class().fields
+        names = list(declared) if fields is None else [name for name in declared if name in fields]
+        self.field_names = tuple(names)
+        self._plan = tuple((name, _field_converter(declared[name])) for name in names)
+        self._subsets = {}
+
+    def only(self, fields):
+        """Encoder limitado a `fields` (en el orden declarado); se reutiliza por combinación de campos"""
+        key = frozenset(fields)
+        encoder = self._subsets.get(key)
+        if encoder is None:
+            encoder = self._subsets[key] = ModelEncoder(self.serializer_class, key)
+        return encoder
+
+    def encode(self, obj):
+        data = {}
+        for name, convert in self._plan:
+            value = getattr(obj, name)
+            data[name] = None if value is None else convert(value)
+        return data
+
+    def encode_item(self, item):
+        """Codificar directamente un item de DynamoDB (dict); omite los atributos ausentes"""
+        data = {}
+        for name, convert in self._plan:
+            if name in item:
+                value = item[name]
+                data[name] = None if value is None else convert(value)
+        return data
+
+    def encode_many(self, objs):
+        encode = self.encode
+        return [encode(obj) for obj in objs]
+
+
+FUND_ENCODER = ModelEncoder(FundSerializer)
+CLIENT_BALANCE_ENCODER = ModelEncoder(ClientBalanceSerializer)
+TRANSACTION_ENCODER = ModelEncoder(TransactionSerializer)
+CLIENT_FUND_SUBSCRIPTION_ENCODER = ModelEncoder(ClientFundSubscriptionSerializer)
+CLIENT_ENCODER = ModelEncoder(ClientSerializer)
@@ -2,7 +2,10 @@ import uuid
 from decimal import Decimal
 from .models import Fund, ClientBalance, Transaction, ClientFundSubscription, Client
 from .notifications import NotificationService
-from .dynamo_client import DynamoDBClient
+from .serializers import CLIENT_BALANCE_ENCODER
+from .dynamo_client import DynamoDBClient, map_in_context
+from . import cache
+from .roundtrips import round_trip_budget
 
 class FundService:
     @staticmethod
@@ -59,11 +62,29 @@ class FundService:
         for fund_data in default_funds:
             fund = Fund(**fund_data)
             Fund.save(fund)
+            cache.store('fund', fund.fund_id, fund)
+        cache.invalidate('funds')
         
         return len(default_funds)
 
+    @staticmethod
+    def get_catalog(fields=None):
+        """Catálogo de fondos (cache compartido, cambia muy poco). Con `fields` un fallo de cache lee solo esos
+        atributos y no guarda el resultado parcial."""
+        if fields:
+            return cache.get('funds') or Fund.get_all(fields)
+        return cache.cached('funds', None, Fund.get_all)
+
+    @staticmethod
+    def get_fund(fund_id, fields=None):
+        """Fondo por id desde el cache compartido (con `fields`, igual que get_catalog)"""
+        if fields:
+            return cache.get('fund', fund_id) or Fund.get_by_id(fund_id, fields)
+        return cache.cached('fund', fund_id, lambda: Fund.get_by_id(fund_id))
+
 class ClientServiceManager:
     @staticmethod
+    @round_trip_budget(4)
     def create_client(client_id, nombre, apellidos, ciudad, email=None, phone=None):
         """Crear un nuevo cliente con saldo inicial de $500,000"""
         # Verificar que el cliente no existe
@@ -77,10 +98,12 @@ class ClientServiceManager:
         # Crear cliente
         client = Client(client_id, nombre, apellidos, ciudad, email=email, phone=phone)
         Client.save(client)
+        cache.store('client', client_id, client)
         
         # Crear balance inicial de $500,000
         initial_balance = ClientBalance(client_id, Decimal('500000'))
         ClientBalance.save(initial_balance)
+        cache.invalidate('balance', client_id)
         
         # Crear transacción inicial
         transaction_id = str(uuid.uuid4())
@@ -96,10 +119,9 @@ class ClientServiceManager:
         # Notificar creación
         NotificationService.notify_client(
             client_id,
-            subject='Bienvenido: cuenta creada',
-            message=(
-                f'Hola {nombre}, tu cliente {client_id} fue creado con saldo inicial de 500000.'
-            )
+            event='create',
+            context={'nombre': nombre, 'client_id': client_id, 'initial_balance': initial_balance.balance},
+            client=client
         )
 
         return {
@@ -111,9 +133,13 @@ class ClientServiceManager:
         }
     
     @staticmethod
-    def get_client(client_id):
-        """Obtener información de un cliente"""
-        client = Client.get_by_id(client_id)
+    def get_client(client_id, fields=None):
+        """Obtener información de un cliente desde el cache compartido; con `fields` un fallo de cache lee solo
+        esos atributos (ProjectionExpression) y no guarda el perfil parcial"""
+        if fields:
+            client = cache.get('client', client_id) or Client.get_by_id(client_id, fields)
+        else:
+            client = cache.cached('client', client_id, lambda: Client.get_by_id(client_id))
         if not client:
             return {
                 'success': False,
@@ -134,6 +160,57 @@ class ClientServiceManager:
             'clients': clients,
             'total_clients': len(clients)
         }
+    
+    @staticmethod
+    def get_clients_page(limit, start_key=None, fields=None):
+        """Obtener una página de clientes a partir de start_key"""
+        clients, last_key = Client.get_page(limit, start_key, fields)
+        return {
+            'success': True,
+            'clients': clients,
+            'last_key': last_key
+        }
+
+    @staticmethod
+    def get_clients_batch(client_ids):
+        """Perfil, balance y resumen de suscripciones de varios clientes.
+
+        Perfiles y balances salen de BatchGetItem (lotes en paralelo), las suscripciones de una consulta
+        por cliente en el pool de lectura y los fondos de una sola lectura compartida.
+        """
+        client_ids = list(dict.fromkeys(client_ids))
+        keys = []
+        for client_id in client_ids:
+            keys.append({'pk': f'CLIENT#{client_id}', 'sk': f'CLIENT#{client_id}'})
+            keys.append({'pk': f'CLIENT#{client_id}', 'sk': 'BALANCE'})
+        # Los lotes de BatchGetItem entran primero al pool y las consultas de suscripciones detrás de ellos,
+        # así los lotes no esperan a que terminen todas las consultas
+        collect_batches = DynamoDBClient().start_batch_get(keys)
+        subscriptions_results = map_in_context(ClientFundSubscription.get_by_client_id, client_ids)
+        profiles, balances = {}, {}
+        for item in collect_batches():
+            if item['sk'] == 'BALANCE':
+                balances[item['client_id']] = ClientBalance.from_dynamo_item(item)
+            else:
+                profiles[item['client_id']] = Client.from_dynamo_item(item)
+        subscriptions_by_client = dict(zip(client_ids, subscriptions_results))
+        
+        fund_ids = {s.fund_id for subscriptions in subscriptions_by_client.values() for s in subscriptions}
+        funds = Fund.get_by_ids(sorted(fund_ids))
+        
+        return {
+            'success': True,
+            'clients': [
+                {
+                    'client': profiles[client_id],
+                    'balance': balances.get(client_id),
+                    'subscriptions': subscriptions_by_client[client_id]
+                }
+                for client_id in client_ids if client_id in profiles
+            ],
+            'funds': funds,
+            'not_found': [client_id for client_id in client_ids if client_id not in profiles]
+        }
 
 class ClientService:
     @staticmethod
@@ -143,6 +220,7 @@ class ClientService:
         if not balance:
             balance = ClientBalance(client_id, initial_balance)
             ClientBalance.save(balance)
+            cache.invalidate('balance', client_id)
         return balance
     
     @staticmethod
@@ -150,9 +228,43 @@ class ClientService:
         """Actualizar balance del cliente"""
         balance = ClientBalance(client_id, new_balance)
         ClientBalance.save(balance)
+        # Suscripciones y cancelaciones siempre terminan aquí: se invalida después de la última escritura
+        cache.invalidate('balance', client_id)
         return balance
+
+    @staticmethod
+    def build_balance_summary(balance, subscriptions, funds):
+        """Respuesta de GET /balance/ a partir del balance, las suscripciones y {fund_id: Fund}"""
+        subscriptions_data = []
+        for subscription in subscriptions:
+            fund = funds.get(subscription.fund_id)
+            subscriptions_data.append({
+                'fund_id': subscription.fund_id,
+                'fund_name': fund.name if fund else 'Fondo no encontrado',
+                'fund_type': fund.type if fund else '',
+                'subscribed_amount': subscription.amount,
+                'subscription_date': subscription.subscription_date
+            })
+        return {
+            'success': True,
+            'balance': CLIENT_BALANCE_ENCODER.encode(balance),
+            'subscribed_funds': subscriptions_data,
+            'total_subscribed_funds': len(subscriptions_data)
+        }
+
+    @staticmethod
+    @round_trip_budget(4)
+    def get_balance_summary(client_id):
+        """Resumen de balance y fondos suscritos desde el cache compartido"""
+        def load():
+            balance = ClientService.get_or_create_balance(client_id)
+            subscriptions = ClientFundSubscription.get_by_client_id(client_id)
+            funds = Fund.get_by_ids([subscription.fund_id for subscription in subscriptions])
+            return ClientService.build_balance_summary(balance, subscriptions, funds)
+        return cache.cached('balance', client_id, load)
     
     @staticmethod
+    @round_trip_budget(5)
     def deposit(client_id, amount):
         """Realizar depósito a la cuenta del cliente"""
         # Validar que el cliente existe
@@ -193,10 +305,9 @@ class ClientService:
         # Notificar depósito
         NotificationService.notify_client(
             client_id,
-            subject='Depósito recibido',
-            message=(
-                f'Se acreditaron {amount} a tu cuenta. Nuevo saldo: {updated_balance.balance}.'
-            )
+            event='deposit',
+            context={'amount': amount, 'new_balance': updated_balance.balance},
+            client=client
         )
 
         return {
@@ -208,6 +319,7 @@ class ClientService:
 
 class SubscriptionService:
     @staticmethod
+    @round_trip_budget(7)
     def subscribe_to_fund(client_id, fund_id):
         """Suscribir cliente a un fondo (usa automáticamente el monto mínimo)"""
         # Validar que el cliente existe
@@ -288,11 +400,9 @@ class SubscriptionService:
         # Notificar suscripción
         NotificationService.notify_client(
             client_id,
-            subject='Suscripción realizada',
-            message=(
-                f'Te suscribiste al fondo {fund.name} (ID {fund.fund_id}) por {amount}. '
-                f'Saldo disponible: {new_balance}.'
-            )
+            event='subscription',
+            context={'fund_name': fund.name, 'fund_id': fund.fund_id, 'amount': amount, 'new_balance': new_balance},
+            client=client
         )
 
         return {
@@ -303,6 +413,7 @@ class SubscriptionService:
         }
     
     @staticmethod
+    @round_trip_budget(7)
     def cancel_subscription(client_id, fund_id):
         """Cancelar suscripción a un fondo"""
         # Validar que el fondo existe
@@ -337,11 +448,13 @@ class SubscriptionService:
         # Notificar cancelación
         NotificationService.notify_client(
             client_id,
-            subject='Suscripción cancelada',
-            message=(
-                f'Cancelaste el fondo {fund.name} (ID {fund.fund_id}). '
-                f'Se devolvieron {subscription.amount}. Nuevo saldo: {new_balance}.'
-            )
+            event='cancellation',
+            context={
+                'fund_name': fund.name,
+                'fund_id': fund.fund_id,
+                'amount': subscription.amount,
+                'new_balance': new_balance
+            }
         )
 
         return {
@@ -0,0 +1,77 @@
+import contextvars
+import json
+import logging
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+from django.conf import settings
+
+logger = logging.getLogger('funds.slow')
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,128}$')
+
+_request_id = contextvars.ContextVar('funds_request_id', default=None)
+
+
+def request_id_from(header_value):
+    """El X-Request-ID del cliente/proxy si es válido; si no, uno nuevo"""
+    if header_value and _VALID_REQUEST_ID.match(header_value):
+        return header_value
+    return uuid.uuid4().hex
+
+
+def set_request_id(value):
+    return _request_id.set(value)
+
+
+def reset_request_id(token):
+    _request_id.reset(token)
+
+
+def get_request_id():
+    return _request_id.get()
+
+
+def threshold_ms(kind):
+    return settings.SLOW_LOG_THRESHOLDS_MS.get(kind)
+
+
+def log_slow(kind, operation, seconds, **fields):
+    """Una línea JSON en el logger funds.slow si la operación superó el umbral de su tipo"""
+    threshold = threshold_ms(kind)
+    duration_ms = seconds * 1000
+    if threshold is None or duration_ms < threshold:
+        return
+    entry = {
+        'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+        'kind': kind,
+        'operation': operation,
+        'duration_ms': round(duration_ms, 3),
+        'threshold_ms': threshold,
+        'request_id': _request_id.get(),
+    }
+    entry.update((name, value) for name, value in fields.items() if value is not None)
+    logger.warning(json.dumps(entry, default=str, ensure_ascii=False))
+
+
+@contextmanager
+def timed(kind, operation, **fields):
+    """Medir un bloque (sesión SMTP, llamada a Twilio...) y registrarlo si fue lento; `fields` se puede
+    completar dentro del bloque con el dict devuelto"""
+    start = time.perf_counter()
+    extra = dict(fields)
+    try:
+        yield extra
+    except Exception as exc:
+        extra.setdefault('error', f'{type(exc).__name__}: {exc}')
+        raise
+    finally:
+        log_slow(kind, operation, time.perf_counter() - start, **extra)
+
+
+def mask_phone(phone):
+    return f'***{phone[-4:]}' if phone else phone
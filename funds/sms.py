@@ -0,0 +1,206 @@
+import importlib.util
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+from django.conf import settings
+
+from . import slowlog
+
+logger = logging.getLogger(__name__)
+
+TWILIO_API_HOST = 'https://api.twilio.com'
+# Límite de Twilio para el cuerpo de un SMS (concatenado)
+SMS_MAX_LENGTH = 1600
+
+
+@lru_cache(maxsize=None)
+def twilio_available() -> bool:
+    """twilio está instalado; no lo importa (twilio y requests se cargan al crear el primer SMSSender)"""
+    return importlib.util.find_spec('twilio') is not None
+
+
+def build_http_client(pool_size=10, timeout=10, base_url=''):
+    """Cliente HTTP de Twilio con keep-alive; base_url permite apuntar a un servidor local"""
+    from requests.adapters import HTTPAdapter
+    from twilio.http.http_client import TwilioHttpClient
+
+    http_client = TwilioHttpClient(pool_connections=True, timeout=timeout)
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    http_client.session.mount('https://', adapter)
+    http_client.session.mount('http://', adapter)
+
+    if base_url:
+        base_url = base_url.rstrip('/')
+        request = http_client.request
+
+        def redirected_request(method, url, *args, **kwargs):
+            if url.startswith(TWILIO_API_HOST):
+                url = base_url + url[len(TWILIO_API_HOST):]
+            return request(method, url, *args, **kwargs)
+
+        http_client.request = redirected_request
+    return http_client
+
+
+class SMSSender:
+    """Cliente Twilio de larga vida que reutiliza las conexiones HTTP entre mensajes"""
+
+    def __init__(self, account_sid, auth_token, from_number, base_url='', pool_size=10, timeout=10):
+        from twilio.rest import Client as TwilioClient
+
+        self.from_number = from_number
+        self.client = TwilioClient(
+            account_sid,
+            auth_token,
+            http_client=build_http_client(pool_size=pool_size, timeout=timeout, base_url=base_url),
+        )
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            account_sid=settings.TWILIO_ACCOUNT_SID,
+            auth_token=settings.TWILIO_AUTH_TOKEN,
+            from_number=settings.TWILIO_FROM_NUMBER,
+            base_url=getattr(settings, 'TWILIO_API_BASE_URL', ''),
+            pool_size=max(getattr(settings, 'SMS_DISPATCH_WORKERS', 4), 1),
+            timeout=getattr(settings, 'TWILIO_TIMEOUT', 10),
+        )
+
+    def send(self, to_phone: str, body: str) -> Tuple[bool, str]:
+        try:
+            with slowlog.timed('twilio', 'messages.create', to=slowlog.mask_phone(to_phone), chars=len(body)):
+                message = self.client.messages.create(
+                    from_=self.from_number,
+                    body=body,
+                    to=to_phone
+                )
+            return True, message.sid
+        except Exception as exc:  # pragma: no cover
+            logger.exception('Error sending SMS: %s', exc)
+            return False, str(exc)
+
+
+class RateLimiter:
+    """Token bucket: como máximo `rate` adquisiciones por segundo (ráfagas de hasta `burst`)"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class SMSDispatcher:
+    """Envío concurrente de SMS limitado por mensajes/segundo y agrupado por destinatario"""
+
+    def __init__(self, sender: SMSSender, max_workers=4, rate_per_second=10.0, burst=1, coalesce=True):
+        self.sender = sender
+        self.coalesce = coalesce
+        self.limiter = RateLimiter(rate_per_second, burst)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='sms-dispatch')
+
+    @classmethod
+    def from_settings(cls, sender: SMSSender):
+        return cls(
+            sender,
+            max_workers=getattr(settings, 'SMS_DISPATCH_WORKERS', 4),
+            rate_per_second=getattr(settings, 'SMS_RATE_PER_SECOND', 10.0),
+            burst=getattr(settings, 'SMS_RATE_BURST', 1),
+            coalesce=getattr(settings, 'SMS_COALESCE_RECIPIENTS', True),
+        )
+
+    @staticmethod
+    def coalesce_messages(messages: Iterable[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        """Unir los mensajes de un mismo destinatario respetando el largo máximo de un SMS"""
+        grouped = OrderedDict()
+        for to_phone, body in messages:
+            chunks = grouped.setdefault(to_phone, [])
+            if chunks and len(chunks[-1]) + 1 + len(body) <= SMS_MAX_LENGTH:
+                chunks[-1] = f'{chunks[-1]}\n{body}'
+            else:
+                chunks.append(body)
+        return [(to_phone, body) for to_phone, chunks in grouped.items() for body in chunks]
+
+    def send_one(self, to_phone: str, body: str) -> Tuple[bool, str]:
+        """Un SMS en el hilo que llama, con el mismo límite de mensajes/segundo que los envíos en lote"""
+        self.limiter.acquire()
+        return self.sender.send(to_phone, body)
+
+    def _send(self, item: Tuple[str, str]) -> Tuple[str, bool, str]:
+        to_phone, body = item
+        ok, info = self.send_one(to_phone, body)
+        return to_phone, ok, info
+
+    def dispatch(self, messages: Iterable[Tuple[str, str]]) -> List[Tuple[str, bool, str]]:
+        """Enviar (to, body) en paralelo; devuelve (to, ok, info) por cada SMS realmente enviado"""
+        items = [(to_phone, body) for to_phone, body in messages if to_phone]
+        if self.coalesce:
+            items = self.coalesce_messages(items)
+        return list(self._executor.map(self._send, items))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+
+_sender = None
+_dispatcher = None
+_lock = threading.Lock()
+
+
+def get_sms_sender() -> SMSSender:
+    global _sender
+    if _sender is None:
+        with _lock:
+            if _sender is None:
+                _sender = SMSSender.from_settings()
+    return _sender
+
+
+def get_sms_dispatcher() -> SMSDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        sender = get_sms_sender()
+        with _lock:
+            if _dispatcher is None:
+                _dispatcher = SMSDispatcher.from_settings(sender)
+    return _dispatcher
+
+
+def reset_sms_clients() -> None:
+    global _sender, _dispatcher
+    with _lock:
+        dispatcher, _sender, _dispatcher = _dispatcher, None, None
+    if dispatcher is not None:
+        dispatcher.shutdown()
+
+
+def _reset_after_fork() -> None:
+    # Los hilos del dispatcher no sobreviven al fork: cada worker crea su cliente y su pool
+    global _sender, _dispatcher, _lock
+    _sender, _dispatcher = None, None
+    _lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
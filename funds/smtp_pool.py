@@ -0,0 +1,199 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from . import slowlog
+
+logger = logging.getLogger(__name__)
+
+
+def is_connection_error(exc) -> bool:
+    """Errores que invalidan la sesión SMTP: se descarta la conexión y se reintenta.
+    SMTPException hereda de OSError: de smtplib solo cuentan los errores de conexión."""
+    import smtplib
+
+    if isinstance(exc, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    return isinstance(exc, OSError) and not isinstance(exc, smtplib.SMTPException)
+
+
+class PooledSMTPConnection:
+    def __init__(self, server):
+        self.server = server
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.sent = 0
+
+    def close(self):
+        try:
+            self.server.quit()
+        except Exception:  # pragma: no cover
+            try:
+                self.server.close()
+            except Exception:
+                pass
+
+
+class SMTPConnectionPool:
+    """Pool de sesiones SMTP autenticadas (EHLO + STARTTLS + LOGIN) reutilizables"""
+
+    def __init__(self, host, port, username, password, use_tls=True, max_size=4,
+                 max_idle_seconds=60, max_messages_per_connection=100, timeout=30):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self.max_messages_per_connection = max_messages_per_connection
+        self.timeout = timeout
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.connections_opened = 0
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            host=settings.EMAIL_HOST,
+            port=settings.EMAIL_PORT,
+            username=settings.EMAIL_HOST_USER,
+            password=settings.EMAIL_HOST_PASSWORD,
+            use_tls=getattr(settings, 'EMAIL_USE_TLS', True),
+            max_size=getattr(settings, 'EMAIL_POOL_SIZE', 4),
+            max_idle_seconds=getattr(settings, 'EMAIL_POOL_MAX_IDLE', 60),
+            max_messages_per_connection=getattr(settings, 'EMAIL_POOL_MAX_MESSAGES', 100),
+            timeout=getattr(settings, 'EMAIL_TIMEOUT', 30),
+        )
+
+    def _connect(self) -> PooledSMTPConnection:
+        # smtplib (y ssl) se importan al abrir la primera sesión, no al cargar el módulo
+        import smtplib
+
+        with slowlog.timed('smtp', 'connect', host=self.host, tls=self.use_tls):
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            try:
+                server.ehlo()
+                if self.use_tls:
+                    server.starttls()
+                    server.ehlo()
+                if self.username:
+                    server.login(self.username, self.password)
+            except Exception:
+                server.close()
+                raise
+        self.connections_opened += 1
+        return PooledSMTPConnection(server)
+
+    def _is_reusable(self, conn: PooledSMTPConnection) -> bool:
+        if conn.sent >= self.max_messages_per_connection:
+            return False
+        return time.monotonic() - conn.last_used < self.max_idle_seconds
+
+    def acquire(self) -> PooledSMTPConnection:
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+                if conn is None:
+                    return self._connect()
+                if self._is_reusable(conn):
+                    return conn
+                conn.close()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn: Optional[PooledSMTPConnection], discard: bool = False) -> None:
+        try:
+            if conn is None:
+                return
+            if discard or not self._is_reusable(conn):
+                conn.close()
+                return
+            conn.last_used = time.monotonic()
+            with self._lock:
+                self._idle.append(conn)
+        finally:
+            self._slots.release()
+
+    def send_messages(self, messages: Iterable[Tuple[str, List[str], str]]) -> List[Tuple[bool, str]]:
+        """Enviar varios mensajes (from, [to], raw) por la misma sesión, reconectando si se cae"""
+        results = []
+        conn = self.acquire()
+        try:
+            for sender, recipients, raw in messages:
+                retried = False
+                while True:
+                    try:
+                        if conn is None:
+                            conn = self._connect()
+                        elif conn.sent >= self.max_messages_per_connection:
+                            conn.close()
+                            conn = self._connect()
+                        with slowlog.timed('smtp', 'sendmail', host=self.host, recipients=len(recipients),
+                                           bytes=len(raw), session_messages=conn.sent):
+                            conn.server.sendmail(sender, recipients, raw)
+                        conn.sent += 1
+                        results.append((True, 'Email sent'))
+                        break
+                    except Exception as exc:
+                        broken = is_connection_error(exc)
+                        if broken and conn is not None:
+                            conn.close()
+                            conn = None
+                        if broken and not retried:
+                            retried = True
+                            continue
+                        if broken:
+                            logger.warning('SMTP send failed after reconnect: %s', exc)
+                        results.append((False, str(exc)))
+                        break
+        finally:
+            self.release(conn, discard=conn is None)
+        return results
+
+    def close_all(self) -> None:
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            conn.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPConnectionPool.from_settings()
+    return _pool
+
+
+def reset_smtp_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close_all()
+
+
+def _reset_after_fork() -> None:
+    # Las sesiones SMTP abiertas en el master no se comparten con los workers
+    global _pool, _pool_lock
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,83 @@
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import StreamingHttpResponse
+
+from .renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+STREAM_FORMATS = ('json', 'ndjson')
+
+
+def _chunked(lines, chunk_size):
+    """Agrupar fragmentos pequeños en bloques de ~chunk_size bytes antes de enviarlos"""
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= chunk_size:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def iter_json_array(key, objects, encoder):
+    """Emitir {"<key>": [...], "count": n, "success": true} elemento a elemento"""
+    yield '{' + json.dumps(key) + ':['
+    count = 0
+    try:
+        for obj in objects:
+            yield (',' if count else '') + dumps(encoder.encode(obj))
+            count += 1
+    except Exception as exc:  # pragma: no cover
+        # El status 200 ya se envió: se cierra el JSON indicando el error
+        logger.exception('Error streaming %s: %s', key, exc)
+        yield '],"count":%d,"success":false,"message":%s}' % (count, json.dumps(str(exc)))
+        return
+    yield '],"count":%d,"success":true}' % count
+
+
+def iter_ndjson(objects, encoder):
+    """Emitir un objeto JSON por línea"""
+    try:
+        for obj in objects:
+            yield dumps(encoder.encode(obj)) + '\n'
+    except Exception as exc:  # pragma: no cover
+        logger.exception('Error streaming ndjson: %s', exc)
+        yield dumps({'success': False, 'message': str(exc)}) + '\n'
+
+
+async def _aiter_blocks(blocks):
+    """Bajo ASGI Django 4.2 convierte un iterador sync de StreamingHttpResponse en lista antes de enviarlo;
+    pidiendo cada bloque en un hilo la memoria sigue acotada"""
+    next_block = sync_to_async(next, thread_sensitive=False)
+    end = object()
+    try:
+        while True:
+            block = await next_block(blocks, end)
+            if block is end:
+                return
+            yield block
+    finally:
+        close = getattr(blocks, 'close', None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=False)()
+
+
+def stream_blocks(blocks, content_type):
+    """StreamingHttpResponse de un iterador de bytes, sin acumularlo en memoria con WSGI ni con ASGI"""
+    if settings.ASYNC_VIEWS:
+        blocks = _aiter_blocks(iter(blocks))
+    return StreamingHttpResponse(blocks, content_type=content_type)
+
+
+def streaming_response(stream_format, key, objects, encoder):
+    """StreamingHttpResponse con memoria constante: objects debe ser un iterador paginado"""
+    chunk_size = getattr(settings, 'STREAM_CHUNK_SIZE', 64 * 1024)
+    if stream_format == 'ndjson':
+        return stream_blocks(_chunked(iter_ndjson(objects, encoder), chunk_size), 'application/x-ndjson')
+    return stream_blocks(_chunked(iter_json_array(key, objects, encoder), chunk_size), 'application/json')
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase, override_settings
+from moto import mock_aws
+
+from funds.dynamo_client import DynamoDBClient
+from funds.models import Client
+from funds.roundtrips import RoundTripBudgetExceeded, round_trip_budget, track_round_trips
+from funds.services import ClientService, ClientServiceManager, FundService, SubscriptionService
+
+
+@round_trip_budget(1)
+def _clients_one_by_one(client_ids):
+    """N+1 a propósito: una lectura por cliente en lugar de un BatchGetItem"""
+    return [Client.get_by_id(client_id) for client_id in client_ids]
+
+
+@override_settings(
+    ROUND_TRIP_MODE='raise', READ_CACHE_ENABLED=False, NOTIFICATIONS_ENABLED=False,
+    AWS_ACCESS_KEY_ID='test', AWS_SECRET_ACCESS_KEY='test', AWS_REGION='us-east-1', DYNAMODB_ENDPOINT_URL='', SLOW_LOG_THRESHOLDS_MS={},
+)
+class RoundTripBudgetTests(SimpleTestCase):
+    """Los servicios con @round_trip_budget contra moto, sin cache de lectura (cada llamada llega a DynamoDB)"""
+
+    def setUp(self):
+        self.aws = mock_aws()
+        self.aws.start()
+        self.addCleanup(self.aws.stop)
+        DynamoDBClient().create_table_if_not_exists()
+        FundService.initialize_default_funds()
+
+    def test_client_lifecycle_within_budget(self):
+        result = ClientServiceManager.create_client('RT1', 'Nombre', 'Apellidos', 'Bogotá')
+        self.assertTrue(result['success'])
+
+        result = ClientService.deposit('RT1', Decimal('100000'))
+        self.assertTrue(result['success'])
+        self.assertEqual(result['new_balance'], Decimal('600000'))
+
+        result = SubscriptionService.subscribe_to_fund('RT1', '1')
+        self.assertTrue(result['success'], result.get('message'))
+        self.assertEqual(ClientService.get_balance_summary('RT1')['total_subscribed_funds'], 1)
+
+        result = SubscriptionService.cancel_subscription('RT1', '1')
+        self.assertTrue(result['success'], result.get('message'))
+        self.assertEqual(ClientService.get_balance_summary('RT1')['total_subscribed_funds'], 0)
+
+    def test_rejected_operations_within_budget(self):
+        self.assertFalse(ClientService.deposit('MISSING', Decimal('1'))['success'])
+        self.assertFalse(SubscriptionService.subscribe_to_fund('MISSING', '1')['success'])
+        ClientServiceManager.create_client('RT2', 'Nombre', 'Apellidos', 'Bogotá')
+        self.assertFalse(ClientServiceManager.create_client('RT2', 'Nombre', 'Apellidos', 'Bogotá')['success'])
+        self.assertFalse(SubscriptionService.cancel_subscription('RT2', '1')['success'])
+
+    def test_n_plus_one_raises(self):
+        for client_id in ('RT3', 'RT4', 'RT5'):
+            ClientServiceManager.create_client(client_id, 'Nombre', 'Apellidos', 'Bogotá')
+
+        with track_round_trips() as tracker, self.assertRaises(RoundTripBudgetExceeded) as raised:
+            _clients_one_by_one(['RT3', 'RT4', 'RT5'])
+        self.assertEqual(tracker.count, 3)
+        self.assertIn('posible N+1', str(raised.exception))
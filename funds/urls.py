@@ -1,9 +1,15 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
+
+# Bajo ASGI (ASYNC_VIEWS=True) las vistas compuestas usan su versión async
+get_client_balance = async_views.get_client_balance if settings.ASYNC_VIEWS else views.get_client_balance
 
 urlpatterns = [
     # Health check
     path('health/', views.health_check, name='health_check'),
+    path('health/deep/', views.health_check_deep, name='health_check_deep'),
+    path('cache/metrics/', views.cache_metrics, name='cache_metrics'),
     
     # Fondos
     path('funds/', views.list_funds, name='list_funds'),
@@ -12,10 +18,12 @@ urlpatterns = [
     # Clientes
     path('clients/', views.list_clients, name='list_clients'),
     path('clients/create/', views.create_client, name='create_client'),
+    path('clients/batch/', views.get_clients_batch, name='get_clients_batch'),
     path('clients/<str:client_id>/', views.get_client, name='get_client'),
-    path('clients/<str:client_id>/balance/', views.get_client_balance, name='get_client_balance'),
+    path('clients/<str:client_id>/balance/', get_client_balance, name='get_client_balance'),
     path('clients/<str:client_id>/subscriptions/', views.get_client_subscriptions, name='get_client_subscriptions'),
     path('clients/<str:client_id>/transactions/', views.get_client_transactions, name='get_client_transactions'),
+    path('transactions/export/', views.export_transactions, name='export_transactions'),
     path('deposit/', views.deposit, name='deposit'),
     
     # Suscripciones
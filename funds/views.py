@@ -1,17 +1,43 @@
-from rest_framework.decorators import api_view
+from django.conf import settings
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, renderer_classes
 from rest_framework.response import Response
 from rest_framework import status
 from .serializers import (
-    FundSerializer, ClientBalanceSerializer, TransactionSerializer,
-    ClientFundSubscriptionSerializer, SubscriptionRequestSerializer,
+    ClientBalanceSerializer, TransactionSerializer, SubscriptionRequestSerializer,
     CancellationRequestSerializer, SubscriptionResponseSerializer,
     CancellationResponseSerializer, DepositRequestSerializer,
-    ClientSerializer, ClientCreateSerializer
+    ClientSerializer, ClientCreateSerializer, ClientBatchRequestSerializer,
+    FUND_ENCODER, CLIENT_BALANCE_ENCODER, TRANSACTION_ENCODER, CLIENT_FUND_SUBSCRIPTION_ENCODER, CLIENT_ENCODER
 )
-from .models import Fund, ClientBalance, Transaction, ClientFundSubscription, Client
+from .renderers import FastJSONRenderer
+from .streaming import STREAM_FORMATS, stream_blocks, streaming_response
+from .pagination import DynamoCursorPagination, PaginationError
+from .conditional import conditional_get
+from .fieldsets import FieldsetError, requested_fields, select_encoder
+from .models import ClientBalance, Transaction, ClientFundSubscription, Client
+from . import cache, export, health, metrics
 from .services import FundService, ClientService, SubscriptionService, ClientServiceManager
 from .dynamo_client import DynamoDBClient
 
+def _stream_if_requested(request, key, iterate, encoder):
+    """Si viene ?stream=json|ndjson, responder en streaming leyendo DynamoDB por páginas"""
+    stream_format = request.query_params.get('stream')
+    if not stream_format:
+        return None
+    if stream_format not in STREAM_FORMATS:
+        return Response({
+            'success': False,
+            'message': f'Formato de streaming inválido: {stream_format}. Use json o ndjson'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    return streaming_response(stream_format, key, iterate(settings.STREAM_PAGE_SIZE), encoder)
+
+def _bad_request(exc):
+    return Response({
+        'success': False,
+        'message': str(exc)
+    }, status=status.HTTP_400_BAD_REQUEST)
+
 @api_view(['GET'])
 def health_check(request):
     """Health check endpoint"""
@@ -20,15 +46,47 @@ def health_check(request):
         'message': 'API funcionando correctamente'
     })
 
+@api_view(['GET'])
+def health_check_deep(request):
+    """Health check profundo: latencia y estado de DynamoDB, SMTP y Twilio (sondas cacheadas unos segundos);
+    503 si falla una dependencia crítica"""
+    checks, age = health.get_health_checker().check()
+    overall = health.summarize(checks)
+    return Response({
+        'status': overall,
+        'checks': checks,
+        'age_seconds': round(age, 3)
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE if overall == 'unhealthy' else status.HTTP_200_OK)
+
+@api_view(['GET'])
+def cache_metrics(request):
+    """Aciertos y fallos del cache compartido de lecturas por namespace"""
+    return Response({
+        'success': True,
+        'enabled': settings.READ_CACHE_ENABLED,
+        'namespaces': cache.metrics()
+    })
+
+def prometheus_metrics(request):
+    """Métricas de todos los workers en formato de texto de Prometheus"""
+    if not metrics.enabled():
+        return HttpResponse(status=404)
+    return HttpResponse(metrics.registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@conditional_get('funds', FUND_ENCODER)
 @api_view(['GET'])
 def list_funds(request):
-    """Listar todos los fondos disponibles"""
+    """Listar todos los fondos disponibles (?fields= para limitar los campos)"""
     try:
-        funds = Fund.get_all()
-        serializer = FundSerializer(funds, many=True)
+        try:
+            fields = requested_fields(request, FUND_ENCODER)
+        except FieldsetError as e:
+            return _bad_request(e)
+        
+        funds = FundService.get_catalog(fields)
         return Response({
             'success': True,
-            'funds': serializer.data
+            'funds': select_encoder(FUND_ENCODER, fields).encode_many(funds)
         })
     except Exception as e:
         return Response({
@@ -36,16 +94,21 @@ def list_funds(request):
             'message': f'Error al obtener fondos: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@conditional_get('fund:{fund_id}', FUND_ENCODER)
 @api_view(['GET'])
 def get_fund(request, fund_id):
-    """Obtener un fondo específico"""
+    """Obtener un fondo específico (?fields= para limitar los campos)"""
     try:
-        fund = Fund.get_by_id(fund_id)
+        try:
+            fields = requested_fields(request, FUND_ENCODER)
+        except FieldsetError as e:
+            return _bad_request(e)
+        
+        fund = FundService.get_fund(fund_id, fields)
         if fund:
-            serializer = FundSerializer(fund)
             return Response({
                 'success': True,
-                'fund': serializer.data
+                'fund': select_encoder(FUND_ENCODER, fields).encode(fund)
             })
         else:
             return Response({
@@ -62,36 +125,58 @@ def get_fund(request, fund_id):
 def get_client_balance(request, client_id):
     """Obtener balance de un cliente junto con sus fondos suscritos"""
     try:
-        # Obtener balance del cliente
-        balance = ClientService.get_or_create_balance(client_id)
-        balance_serializer = ClientBalanceSerializer(balance)
-        
-        # Obtener suscripciones del cliente
-        subscriptions = ClientFundSubscription.get_by_client_id(client_id)
-        subscriptions_data = []
+        return Response(ClientService.get_balance_summary(client_id))
+    except Exception as e:
+        return Response({
+            'success': False,
+            'message': f'Error al obtener balance: {str(e)}'
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(['POST'])
+@renderer_classes([FastJSONRenderer])
+def get_clients_batch(request):
+    """Perfil, balance y fondos suscritos de varios clientes en una sola petición"""
+    try:
+        serializer = ClientBatchRequestSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                'success': False,
+                'message': 'Datos inválidos',
+                'errors': serializer.errors
+            }, status=status.HTTP_400_BAD_REQUEST)
         
-        for subscription in subscriptions:
-            # Obtener información detallada del fondo
-            fund = Fund.get_by_id(subscription.fund_id)
-            subscription_info = {
-                'fund_id': subscription.fund_id,
-                'fund_name': fund.name if fund else 'Fondo no encontrado',
-                'fund_type': fund.type if fund else '',
-                'subscribed_amount': subscription.amount,
-                'subscription_date': subscription.subscription_date
-            }
-            subscriptions_data.append(subscription_info)
+        result = ClientServiceManager.get_clients_batch(serializer.validated_data['client_ids'])
+        funds = result['funds']
+        clients_data = []
+        for entry in result['clients']:
+            subscriptions_data = []
+            for subscription in entry['subscriptions']:
+                fund = funds.get(subscription.fund_id)
+                subscriptions_data.append({
+                    'fund_id': subscription.fund_id,
+                    'fund_name': fund.name if fund else 'Fondo no encontrado',
+                    'fund_type': fund.type if fund else '',
+                    'subscribed_amount': subscription.amount,
+                    'subscription_date': subscription.subscription_date
+                })
+            balance = entry['balance']
+            clients_data.append({
+                'client': CLIENT_ENCODER.encode(entry['client']),
+                'balance': CLIENT_BALANCE_ENCODER.encode(balance) if balance else None,
+                'subscribed_funds': subscriptions_data,
+                'total_subscribed_funds': len(subscriptions_data)
+            })
         
         return Response({
             'success': True,
-            'balance': balance_serializer.data,
-            'subscribed_funds': subscriptions_data,
-            'total_subscribed_funds': len(subscriptions_data)
+            'clients': clients_data,
+            'total_clients': len(clients_data),
+            'not_found': result['not_found']
         })
     except Exception as e:
         return Response({
             'success': False,
-            'message': f'Error al obtener balance: {str(e)}'
+            'message': f'Error al obtener clientes: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['POST'])
@@ -153,14 +238,23 @@ def cancel_subscription(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
 def get_client_subscriptions(request, client_id):
-    """Obtener suscripciones de un cliente"""
+    """Obtener suscripciones de un cliente (paginado con ?limit=&cursor=, campos con ?fields=)"""
     try:
-        subscriptions = ClientFundSubscription.get_by_client_id(client_id)
-        serializer = ClientFundSubscriptionSerializer(subscriptions, many=True)
+        paginator = DynamoCursorPagination()
+        try:
+            fields = requested_fields(request, CLIENT_FUND_SUBSCRIPTION_ENCODER)
+            limit = paginator.get_limit(request)
+            start_key = paginator.get_start_key(request, f'CLIENT#{client_id}', 'SUBSCRIPTION#')
+        except (FieldsetError, PaginationError) as e:
+            return _bad_request(e)
+        
+        subscriptions, last_key = ClientFundSubscription.get_page_by_client_id(client_id, limit, start_key, fields)
         return Response({
             'success': True,
-            'subscriptions': serializer.data
+            'subscriptions': select_encoder(CLIENT_FUND_SUBSCRIPTION_ENCODER, fields).encode_many(subscriptions),
+            **paginator.get_page_info(limit, subscriptions, last_key)
         })
     except Exception as e:
         return Response({
@@ -169,14 +263,36 @@ def get_client_subscriptions(request, client_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
 def get_client_transactions(request, client_id):
-    """Obtener transacciones de un cliente"""
+    """Obtener transacciones de un cliente (paginado con ?limit=&cursor=, campos con ?fields=)"""
     try:
-        transactions = Transaction.get_by_client_id(client_id)
-        serializer = TransactionSerializer(transactions, many=True)
+        try:
+            fields = requested_fields(request, TRANSACTION_ENCODER)
+        except FieldsetError as e:
+            return _bad_request(e)
+        encoder = select_encoder(TRANSACTION_ENCODER, fields)
+        
+        streamed = _stream_if_requested(
+            request, 'transactions',
+            lambda page_size: Transaction.iter_by_client_id(client_id, page_size, fields),
+            encoder
+        )
+        if streamed is not None:
+            return streamed
+        
+        paginator = DynamoCursorPagination()
+        try:
+            limit = paginator.get_limit(request)
+            start_key = paginator.get_start_key(request, f'CLIENT#{client_id}', 'TRANSACTION#')
+        except PaginationError as e:
+            return _bad_request(e)
+        
+        transactions, last_key = Transaction.get_page_by_client_id(client_id, limit, start_key, fields)
         return Response({
             'success': True,
-            'transactions': serializer.data
+            'transactions': encoder.encode_many(transactions),
+            **paginator.get_page_info(limit, transactions, last_key)
         })
     except Exception as e:
         return Response({
@@ -184,6 +300,34 @@ def get_client_transactions(request, client_id):
             'message': f'Error al obtener transacciones: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+def export_transactions(request):
+    """Todas las transacciones en streaming (?output=csv|parquet, ?from=&to=YYYY-MM-DD, ?type=), leídas con un
+    scan paralelo y con memoria acotada. Solo con EXPORT_TOKEN definido y el header X-Export-Token"""
+    if not export.http_enabled():
+        return Response({
+            'success': False,
+            'message': 'El export por HTTP está deshabilitado; use manage.py export_transactions'
+        }, status=status.HTTP_404_NOT_FOUND)
+    if not export.token_matches(request):
+        return Response({
+            'success': False,
+            'message': 'X-Export-Token inválido'
+        }, status=status.HTTP_403_FORBIDDEN)
+    output_format = request.query_params.get('output', 'csv')
+    try:
+        filters = export.build_filter(
+            request.query_params.get('from'),
+            request.query_params.get('to'),
+            request.query_params.get('type')
+        )
+        blocks = export.export_transactions(output_format, filters)
+    except export.ExportError as e:
+        return _bad_request(e)
+    response = stream_blocks(blocks, export.CONTENT_TYPES[output_format])
+    response['Content-Disposition'] = f'attachment; filename="transactions.{output_format}"'
+    return response
+
 @api_view(['POST'])
 def initialize_system(request):
     """Inicializar el sistema con fondos por defecto"""
@@ -293,17 +437,22 @@ def create_client(request):
             'message': f'Error al crear cliente: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@conditional_get('client:{client_id}', CLIENT_ENCODER)
 @api_view(['GET'])
 def get_client(request, client_id):
-    """Obtener información de un cliente específico"""
+    """Obtener información de un cliente específico (?fields= para limitar los campos)"""
     try:
-        result = ClientServiceManager.get_client(client_id)
+        try:
+            fields = requested_fields(request, CLIENT_ENCODER)
+        except FieldsetError as e:
+            return _bad_request(e)
+        
+        result = ClientServiceManager.get_client(client_id, fields)
         
         if result['success']:
-            client_serializer = ClientSerializer(result['client'])
             return Response({
                 'success': True,
-                'client': client_serializer.data
+                'client': select_encoder(CLIENT_ENCODER, fields).encode(result['client'])
             })
         else:
             return Response({
@@ -318,17 +467,39 @@ def get_client(request, client_id):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 @api_view(['GET'])
+@renderer_classes([FastJSONRenderer])
 def list_clients(request):
-    """Listar todos los clientes"""
+    """Listar clientes (paginado con ?limit=&cursor=, campos con ?fields=)"""
     try:
-        result = ClientServiceManager.get_all_clients()
+        try:
+            fields = requested_fields(request, CLIENT_ENCODER)
+        except FieldsetError as e:
+            return _bad_request(e)
+        encoder = select_encoder(CLIENT_ENCODER, fields)
+        
+        streamed = _stream_if_requested(
+            request, 'clients',
+            lambda page_size: Client.iter_all(page_size, fields),
+            encoder
+        )
+        if streamed is not None:
+            return streamed
+        
+        paginator = DynamoCursorPagination()
+        try:
+            limit = paginator.get_limit(request)
+            # El scan filtrado puede cortar en cualquier item de la tabla: el cursor se valida por scope
+            start_key = paginator.get_start_key(request, scope='clients')
+        except PaginationError as e:
+            return _bad_request(e)
+        
+        result = ClientServiceManager.get_clients_page(limit, start_key, fields)
         
         if result['success']:
-            clients_serializer = ClientSerializer(result['clients'], many=True)
             return Response({
                 'success': True,
-                'clients': clients_serializer.data,
-                'total_clients': result['total_clients']
+                'clients': encoder.encode_many(result['clients']),
+                **paginator.get_page_info(limit, result['clients'], result['last_key'], scope='clients')
             })
         else:
             return Response({
@@ -0,0 +1,72 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Máximo que un worker espera a que todos los hilos de un pool estén listos para calentarlos
+POOL_BARRIER_TIMEOUT = 10
+
+
+def preload():
+    """En el master antes del fork (gunicorn con preload_app): URLconf, vistas, serializers y el modelo de servicio
+    de DynamoDB de botocore quedan cargados y los workers los heredan (copy-on-write). No abre conexiones."""
+    from django.urls import get_resolver
+    from .dynamo_client import DynamoDBClient
+
+    start = time.perf_counter()
+    get_resolver().url_patterns
+    DynamoDBClient()
+    return {'preload_ms': round((time.perf_counter() - start) * 1000, 3)}
+
+
+def _ping_dynamodb():
+    """DescribeTable con el recurso del hilo actual: crea el cliente y abre su conexión (TCP/TLS)"""
+    from .dynamo_client import DynamoDBClient
+
+    dynamo = DynamoDBClient()
+    dynamo.dynamodb.meta.client.describe_table(TableName=dynamo.table_name)
+
+
+def _warm_threads(executor, threads):
+    """Un ping por hilo del pool: la barrera obliga al executor a levantar `threads` hilos distintos"""
+    barrier = threading.Barrier(threads, timeout=POOL_BARRIER_TIMEOUT)
+
+    def task():
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+        _ping_dynamodb()
+
+    for future in [executor.submit(task) for _ in range(threads)]:
+        future.result()
+
+
+def warm_up(request_executor=None, request_threads=0):
+    """En cada worker antes de aceptar tráfico: conexiones a DynamoDB del hilo principal, de los hilos de petición
+    (`request_executor`, p. ej. el pool de un worker gthread) y del pool de lecturas paralelas, y el catálogo de
+    fondos en el cache. Un paso que falla se registra y no impide arrancar. Devuelve ms por paso."""
+    from .dynamo_client import get_read_executor
+    from .services import FundService
+
+    steps = [('dynamodb', _ping_dynamodb)]
+    if request_executor is not None and request_threads > 1:
+        steps.append(('request_threads', lambda: _warm_threads(request_executor, request_threads)))
+    if settings.WARMUP_READ_POOL:
+        steps.append(('read_pool', lambda: _warm_threads(get_read_executor(), settings.DYNAMODB_READ_WORKERS)))
+    steps.append(('catalog', FundService.get_catalog))
+
+    timings = {}
+    for name, step in steps:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as exc:
+            logger.warning('Warm-up step %s failed: %s', name, exc)
+            timings[name] = None
+            continue
+        timings[name] = round((time.perf_counter() - start) * 1000, 3)
+    return timings
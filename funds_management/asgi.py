@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'funds_management.settings')
+# Bajo un servidor ASGI las vistas compuestas async hacen sus lecturas en paralelo
+os.environ.setdefault('ASYNC_VIEWS', 'True')
 
 application = get_asgi_application()
@@ -1,6 +1,6 @@
 import os
 from pathlib import Path
-from decouple import config
+from decouple import config, Csv
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -27,8 +27,12 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'funds.middleware.RequestIdMiddleware',
+    'funds.middleware.MetricsMiddleware',
+    'funds.middleware.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'funds.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -102,8 +106,6 @@ REST_FRAMEWORK = {
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10,
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
@@ -112,11 +114,156 @@ REST_FRAMEWORK = {
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Perfil API: la API JSON es sin estado y no usa admin, auth, sesiones, mensajes, CSRF, plantillas
+# ni base de datos. API_PROFILE=True deja solo lo necesario para servirla (ver scripts/bench_startup.py).
+API_PROFILE = config('API_PROFILE', default=False, cast=bool)
+if API_PROFILE:
+    INSTALLED_APPS = [
+        'rest_framework',
+        'corsheaders',
+        'funds',
+    ]
+    MIDDLEWARE = [
+        'funds.middleware.RequestIdMiddleware',
+        'funds.middleware.MetricsMiddleware',
+        'funds.middleware.ProfilingMiddleware',
+        'corsheaders.middleware.CorsMiddleware',
+        'django.middleware.security.SecurityMiddleware',
+        'funds.middleware.CompressionMiddleware',
+        'django.middleware.common.CommonMiddleware',
+    ]
+    TEMPLATES = []
+    DATABASES = {}
+    AUTH_PASSWORD_VALIDATORS = []
+    USE_I18N = False
+    REST_FRAMEWORK.update({
+        'DEFAULT_AUTHENTICATION_CLASSES': [],
+        'UNAUTHENTICATED_USER': None,
+    })
+
+# Métricas en formato Prometheus en /metrics/ (latencia por vista, llamadas a DynamoDB, envíos de notificaciones).
+# Con varios workers, METRICS_DIR es un directorio compartido donde cada proceso vuelca sus contadores
+# cada METRICS_FLUSH_SECONDS; /metrics/ los suma. Vacío = solo el proceso que atiende la petición (runserver);
+# gunicorn.conf.py usa /tmp/funds-metrics si no se define.
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+METRICS_DIR = config('METRICS_DIR', default='')
+METRICS_FLUSH_SECONDS = config('METRICS_FLUSH_SECONDS', default=5.0, cast=float)
+
+# Perfilado por petición: con el header X-Profile-Token igual a PROFILING_TOKEN (responde un resumen en
+# X-Profile-Summary) o para una fracción PROFILING_SAMPLE_RATE de las peticiones. Los perfiles (cProfile + spans
+# de DynamoDB, notificaciones y render) se escriben en PROFILING_DIR si está definido. Sin token ni muestreo
+# el middleware se desactiva.
+PROFILING_TOKEN = config('PROFILING_TOKEN', default='')
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_DIR = config('PROFILING_DIR', default='')
+
+# Presupuesto de idas y vueltas a DynamoDB (@round_trip_budget en services.py): off, log (warning) o raise
+# (RoundTripBudgetExceeded, para tests). También marca lecturas repetidas de la misma llave y N+1: la misma
+# lectura individual con distinto id ROUND_TRIP_N_PLUS_ONE veces o más.
+ROUND_TRIP_MODE = config('ROUND_TRIP_MODE', default='log')
+ROUND_TRIP_N_PLUS_ONE = config('ROUND_TRIP_N_PLUS_ONE', default=3, cast=int)
+
+# Log de operaciones lentas: una línea JSON en el logger funds.slow por cada llamada a DynamoDB, sesión/envío
+# SMTP o llamada a Twilio que supere su umbral (ms; 0 registra todo, vacío desactiva ese tipo), con el
+# X-Request-ID de la petición. DYNAMODB_RETURN_CONSUMED_CAPACITY agrega la capacidad consumida a cada entrada.
+SLOW_LOG_THRESHOLDS_MS = {
+    kind: config(f'SLOW_LOG_{kind.upper()}_MS', default=default, cast=lambda value: float(value) if value != '' else None)
+    for kind, default in (('dynamodb', '100'), ('smtp', '1000'), ('twilio', '1000'))
+}
+DYNAMODB_RETURN_CONSUMED_CAPACITY = config('DYNAMODB_RETURN_CONSUMED_CAPACITY', default=True, cast=bool)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'slow': {'class': 'logging.StreamHandler', 'formatter': 'message'},
+    },
+    'loggers': {
+        'funds.slow': {'handlers': ['slow'], 'level': 'WARNING', 'propagate': False},
+    },
+}
+
+# Compresión de respuestas (brotli si está instalado, si no gzip) según Accept-Encoding.
+# Respuestas menores a COMPRESSION_MIN_SIZE bytes se envían sin comprimir; el streaming siempre se comprime.
+COMPRESSION_ENABLED = config('COMPRESSION_ENABLED', default=True, cast=bool)
+COMPRESSION_MIN_SIZE = config('COMPRESSION_MIN_SIZE', default=1024, cast=int)
+COMPRESSION_GZIP_LEVEL = config('COMPRESSION_GZIP_LEVEL', default=6, cast=int)
+COMPRESSION_BROTLI_QUALITY = config('COMPRESSION_BROTLI_QUALITY', default=4, cast=int)
+
+# Elementos por página sin ?limit= y máximo aceptado en ?limit= (listados paginados por cursor; las vistas
+# crean DynamoCursorPagination explícitamente, no es la paginación por defecto de DRF)
+PAGINATION_DEFAULT_LIMIT = config('PAGINATION_DEFAULT_LIMIT', default=10, cast=int)
+PAGINATION_MAX_LIMIT = config('PAGINATION_MAX_LIMIT', default=100, cast=int)
+
+# Respuestas en streaming (?stream=json|ndjson): items leídos por página y bytes por bloque enviado
+STREAM_PAGE_SIZE = config('STREAM_PAGE_SIZE', default=500, cast=int)
+STREAM_CHUNK_SIZE = config('STREAM_CHUNK_SIZE', default=64 * 1024, cast=int)
+
+# Export de transacciones (GET /api/transactions/export/, manage.py export_transactions): segmentos del scan
+# paralelo, items por página de cada segmento y filas por row group de Parquet (pyarrow, opcional)
+EXPORT_SCAN_SEGMENTS = config('EXPORT_SCAN_SEGMENTS', default=4, cast=int)
+EXPORT_PAGE_SIZE = config('EXPORT_PAGE_SIZE', default=1000, cast=int)
+EXPORT_ROW_GROUP_SIZE = config('EXPORT_ROW_GROUP_SIZE', default=50000, cast=int)
+# El endpoint HTTP del export responde 404 sin EXPORT_TOKEN y exige el header X-Export-Token igual a él
+# (devuelve todas las transacciones y lanza un scan de toda la tabla); el comando de manage.py no lo usa
+EXPORT_TOKEN = config('EXPORT_TOKEN', default='')
+
+# Cache: 'default' es local al proceso; 'shared' lo ven todos los workers. En producción memcached
+# (SHARED_CACHE_BACKEND=django.core.cache.backends.memcached.PyMemcacheCache, SHARED_CACHE_LOCATION=host:11211,
+# así lo configura docker-compose.yml). Los archivos en disco son solo para desarrollo: cada set() lista el
+# directorio para decidir si purga, y el cache escribe en cada lectura fallida, en cada volcado de contadores
+# y en cada versión de GET condicional. Subir SHARED_CACHE_VERSION descarta todas las claves tras un cambio
+# de formato de los objetos guardados.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': config('SHARED_CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('SHARED_CACHE_LOCATION', default='/tmp/funds-cache'),
+        'KEY_PREFIX': 'funds',
+        'VERSION': config('SHARED_CACHE_VERSION', default=2, cast=int),
+        'OPTIONS': {'MAX_ENTRIES': config('SHARED_CACHE_MAX_ENTRIES', default=10000, cast=int)},
+    },
+}
+
+# Cache de lecturas calientes (catálogo de fondos, perfiles, resumen de balance) con invalidación
+# desde services.py en cada escritura; segundos de vida por namespace
+READ_CACHE_ENABLED = config('READ_CACHE_ENABLED', default=True, cast=bool)
+READ_CACHE_ALIAS = 'shared'
+READ_CACHE_TIMEOUTS = {
+    'funds': config('READ_CACHE_FUNDS_TIMEOUT', default=3600, cast=int),
+    'fund': config('READ_CACHE_FUNDS_TIMEOUT', default=3600, cast=int),
+    'client': config('READ_CACHE_CLIENT_TIMEOUT', default=300, cast=int),
+    'balance': config('READ_CACHE_BALANCE_TIMEOUT', default=30, cast=int),
+}
+
+# GET condicional (ETag / Last-Modified) en /funds/, /funds/<id>/ y /clients/<id>/.
+# En el cache compartido para que las escrituras invaliden en todos los workers.
+CONDITIONAL_GET_CACHE = config('CONDITIONAL_GET_CACHE', default='shared')
+CONDITIONAL_GET_TIMEOUT = config('CONDITIONAL_GET_TIMEOUT', default=60, cast=int)
+
 # AWS DynamoDB Configuration
 AWS_ACCESS_KEY_ID = config('AWS_ACCESS_KEY_ID', default='')
 AWS_SECRET_ACCESS_KEY = config('AWS_SECRET_ACCESS_KEY', default='')
 AWS_REGION = config('AWS_REGION', default='us-east-1')
 DYNAMODB_TABLE_NAME = config('DYNAMODB_TABLE_NAME', default='funds_table')
+# Endpoint alternativo (DynamoDB Local, moto server) para desarrollo y benchmarks; vacío = AWS
+DYNAMODB_ENDPOINT_URL = config('DYNAMODB_ENDPOINT_URL', default='')
+
+# Hilos del pool de lecturas paralelas a DynamoDB y máximo de clientes por POST /api/clients/batch/
+DYNAMODB_READ_WORKERS = config('DYNAMODB_READ_WORKERS', default=8, cast=int)
+BATCH_READ_MAX_CLIENTS = config('BATCH_READ_MAX_CLIENTS', default=500, cast=int)
+
+# Vistas compuestas async (consultas a DynamoDB en paralelo). asgi.py lo activa por defecto.
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=False, cast=bool)
+
+# Calentamiento de cada worker al arrancar (gunicorn.conf.py, funds/warmup.py): con WARMUP_READ_POOL también
+# se abren las conexiones de los DYNAMODB_READ_WORKERS hilos del pool de lecturas paralelas
+WARMUP_READ_POOL = config('WARMUP_READ_POOL', default=True, cast=bool)
 
 # Notifications (Email via Gmail SMTP)
 EMAIL_HOST = config('EMAIL_HOST', default='smtp.gmail.com')
@@ -125,11 +272,38 @@ EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')  # your@gmail.com
 EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')  # App Password
 EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=True, cast=bool)
 DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default=EMAIL_HOST_USER)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=30, cast=int)
+
+# Pool de conexiones SMTP (sesiones TLS autenticadas reutilizables)
+EMAIL_POOL_ENABLED = config('EMAIL_POOL_ENABLED', default=True, cast=bool)
+EMAIL_POOL_SIZE = config('EMAIL_POOL_SIZE', default=4, cast=int)
+EMAIL_POOL_MAX_IDLE = config('EMAIL_POOL_MAX_IDLE', default=60, cast=int)  # segundos
+EMAIL_POOL_MAX_MESSAGES = config('EMAIL_POOL_MAX_MESSAGES', default=100, cast=int)  # por sesión
 
 # Notifications (SMS via Twilio)
 TWILIO_ACCOUNT_SID = config('TWILIO_ACCOUNT_SID', default='')
 TWILIO_AUTH_TOKEN = config('TWILIO_AUTH_TOKEN', default='')
 TWILIO_FROM_NUMBER = config('TWILIO_FROM_NUMBER', default='')
+TWILIO_API_BASE_URL = config('TWILIO_API_BASE_URL', default='')  # vacío = api.twilio.com
+TWILIO_TIMEOUT = config('TWILIO_TIMEOUT', default=10, cast=int)
+
+# Envío concurrente de SMS (ajustar al throughput permitido por el número emisor)
+SMS_DISPATCH_WORKERS = config('SMS_DISPATCH_WORKERS', default=4, cast=int)
+SMS_RATE_PER_SECOND = config('SMS_RATE_PER_SECOND', default=10.0, cast=float)
+SMS_RATE_BURST = config('SMS_RATE_BURST', default=1, cast=int)
+SMS_COALESCE_RECIPIENTS = config('SMS_COALESCE_RECIPIENTS', default=True, cast=bool)
 
 # Toggle to enable/disable notifications globally
 NOTIFICATIONS_ENABLED = config('NOTIFICATIONS_ENABLED', default=True, cast=bool)
+
+# Health check profundo (/api/health/deep/): sondas a DynamoDB, SMTP y Twilio en paralelo, cacheadas
+# HEALTH_CACHE_SECONDS en cada worker; HEALTH_PROBE_TIMEOUT segundos por sonda. Solo una falla en
+# HEALTH_CRITICAL responde 503 (las notificaciones son best-effort: sin ellas el estado es degraded).
+HEALTH_CACHE_SECONDS = config('HEALTH_CACHE_SECONDS', default=10.0, cast=float)
+HEALTH_PROBE_TIMEOUT = config('HEALTH_PROBE_TIMEOUT', default=2.0, cast=float)
+HEALTH_CRITICAL = config('HEALTH_CRITICAL', default='dynamodb', cast=Csv())
+
+# Ventanas (segundos) para agrupar notificaciones por cliente en un resumen; 0 = envío inmediato.
+# Formato: canal=segundos o canal.evento=segundos (eventos: create, deposit, subscription, cancellation)
+# Ej: NOTIFICATION_COALESCE_WINDOWS=sms=60,email.deposit=30,sms.create=0
+NOTIFICATION_COALESCE_WINDOWS = config('NOTIFICATION_COALESCE_WINDOWS', default='', cast=Csv())
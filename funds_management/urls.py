@@ -1,7 +1,13 @@
-from django.contrib import admin
+from django.conf import settings
 from django.urls import path, include
+from funds.views import prometheus_metrics
 
 urlpatterns = [
-    path('admin/', admin.site.urls),
     path('api/', include('funds.urls')),
+    path('metrics/', prometheus_metrics, name='metrics'),
 ]
+
+if not settings.API_PROFILE:
+    from django.contrib import admin
+
+    urlpatterns.insert(0, path('admin/', admin.site.urls))
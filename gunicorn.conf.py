@@ -0,0 +1,78 @@
+# Configuración de gunicorn para producción: gunicorn -c gunicorn.conf.py
+#
+# GUNICORN_WORKER_MODE elige el modelo de workers:
+#   gthread  (defecto) procesos con GUNICORN_THREADS hilos; las peticiones esperan a DynamoDB en paralelo
+#   sync     un hilo por proceso, como el CMD anterior del Dockerfile
+#   uvicorn  workers ASGI (funds_management.asgi, vistas compuestas async)
+#
+# Con GUNICORN_PRELOAD el master importa Django, DRF, boto3 y las vistas una vez antes del fork; cada worker
+# descarta los recursos heredados (register_at_fork en dynamo_client, smtp_pool, sms, coalescing, metrics) y, con
+# GUNICORN_WARMUP, abre sus conexiones a DynamoDB y carga el catálogo de fondos antes de aceptar tráfico.
+# Comparación de modos: python scripts/bench_server.py
+import glob
+import os
+
+# 'config' es el nombre de un ajuste de gunicorn: con ese nombre gunicorn lo leería como ruta del archivo
+from decouple import config as env_config
+
+WORKER_MODES = {
+    'sync': ('sync', 'funds_management.wsgi:application'),
+    'gthread': ('gthread', 'funds_management.wsgi:application'),
+    'uvicorn': ('uvicorn.workers.UvicornWorker', 'funds_management.asgi:application'),
+}
+
+worker_mode = env_config('GUNICORN_WORKER_MODE', default='gthread')
+if worker_mode not in WORKER_MODES:
+    raise RuntimeError(f'GUNICORN_WORKER_MODE must be one of {", ".join(WORKER_MODES)}, not {worker_mode!r}')
+worker_class, wsgi_app = WORKER_MODES[worker_mode]
+
+bind = env_config('GUNICORN_BIND', default='0.0.0.0:8000')
+workers = env_config('GUNICORN_WORKERS', default=3, cast=int)
+threads = env_config('GUNICORN_THREADS', default=8 if worker_mode == 'gthread' else 1, cast=int)
+preload_app = env_config('GUNICORN_PRELOAD', default=True, cast=bool)
+timeout = env_config('GUNICORN_TIMEOUT', default=30, cast=int)
+graceful_timeout = env_config('GUNICORN_GRACEFUL_TIMEOUT', default=30, cast=int)
+keepalive = env_config('GUNICORN_KEEPALIVE', default=5, cast=int)
+loglevel = env_config('GUNICORN_LOG_LEVEL', default='info')
+
+warmup = env_config('GUNICORN_WARMUP', default=True, cast=bool)
+# Con varios workers /metrics/ debe sumar los contadores de todos: sin METRICS_DIR cada scrape vería solo el
+# worker que lo atiende y los contadores subirían y bajarían entre scrapes (rate() de Prometheus erróneo).
+# Se define antes de cargar la aplicación, así settings.METRICS_DIR lo toma del entorno.
+metrics_dir = env_config('METRICS_DIR', default='/tmp/funds-metrics')
+os.environ['METRICS_DIR'] = metrics_dir
+
+
+def on_starting(server):
+    # Los snapshots de métricas de una ejecución anterior (pids que ya no existen) se sumarían en /metrics/
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, '*.json')):
+            os.remove(path)
+
+
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from funds import warmup as funds_warmup
+
+    server.log.info('Preloaded application: %s', funds_warmup.preload())
+
+
+def worker_exit(server, worker):
+    # Los resúmenes de notificaciones pendientes viven en memoria del worker (funds.coalescing): se envían al
+    # terminar, también al reciclarlo; el envío cuenta dentro de GUNICORN_GRACEFUL_TIMEOUT
+    from funds import coalescing
+
+    flushed = coalescing.flush_pending()
+    if flushed:
+        worker.log.info('Worker %s flushed %d pending notification digests', worker.pid, flushed)
+
+
+def post_worker_init(worker):
+    if not warmup:
+        return
+    from funds import warmup as funds_warmup
+
+    # El pool de hilos de petición de un worker gthread; los demás atienden en el hilo principal o en asyncio
+    timings = funds_warmup.warm_up(getattr(worker, 'tpool', None), worker.cfg.threads)
+    worker.log.info('Worker %s warmed up: %s', worker.pid, timings)
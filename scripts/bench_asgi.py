@@ -0,0 +1,59 @@
+"""Latency comparison of the composite balance endpoint: WSGI (gunicorn, sync view) vs ASGI (uvicorn, async view).
+
+Both servers talk to the same local DynamoDB stand-in (moto in a child process) with an
+artificial per-call latency, so the serial vs concurrent fan-out shows up in the percentiles.
+
+Usage: python scripts/bench_asgi.py [--clients 200] [--subscriptions 3] [--requests 2000]
+       [--concurrency 4] [--workers 1] [--dynamo-latency-ms 10] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+
+from bench_utils import http_load, seed_dataset, setup_django, summarize
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--subscriptions', type=int, default=3, help='funds subscribed per client (max 5)')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8, help='gthread threads per WSGI worker')
+    parser.add_argument('--dynamo-latency-ms', type=float, default=10.0)
+    parser.add_argument('--servers', default='wsgi,asgi')
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    args = parser.parse_args()
+
+    from local_servers import AppServer, LocalDynamoDB
+
+    results = []
+    with LocalDynamoDB(latency=args.dynamo_latency_ms / 1000) as dynamo:
+        os.environ.update(dynamo.environment())
+        setup_django()
+        client_ids = seed_dataset(args.clients, subscriptions=args.subscriptions, transactions=0)
+        rng = random.Random(42)
+        paths = [f'/api/clients/{rng.choice(client_ids)}/balance/' for _ in range(args.requests)]
+
+        for kind in [kind.strip() for kind in args.servers.split(',') if kind.strip()]:
+            env = {**dynamo.environment(), 'ASYNC_VIEWS': str(kind == 'asgi')}
+            with AppServer(kind, workers=args.workers, threads=args.threads, env=env) as server:
+                http_load(server.base_url, paths[:args.concurrency * 4], args.concurrency)  # warm-up
+                latencies, failures, elapsed, _ = http_load(server.base_url, paths, args.concurrency)
+            results.append({'server': kind, **summarize(latencies, elapsed, failures)})
+
+    print(f"{'server':<8}{'req/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'fail':>6}")
+    for row in results:
+        print(f"{row['server']:<8}{row['throughput']:>10.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+              f"{row['p99_ms']:>9.2f}{row['max_ms']:>9.2f}{row['failures']:>6}")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'args': vars(args), 'results': results}, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
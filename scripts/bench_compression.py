@@ -0,0 +1,107 @@
+"""Compression cost vs bytes saved for the main read endpoints (gzip levels and brotli qualities).
+
+Real response bodies are fetched from a seeded local DynamoDB (moto) through the Django test client,
+then each body is compressed the way CompressionMiddleware does it: one shot for regular responses,
+64 KiB blocks with a sync flush per block for ?stream= responses. The last column estimates the net
+time saved per response on a link of --bandwidth-mbps (transfer time saved minus compression CPU).
+
+Usage: python scripts/bench_compression.py [--clients 300] [--transactions 200] [--repeat 20]
+       [--bandwidth-mbps 10] [--json results.json]
+"""
+import argparse
+import json
+import os
+import time
+
+from bench_utils import seed_dataset, setup_django
+
+LEVELS = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 11)]
+
+
+def best_time(repeat, run):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=300)
+    parser.add_argument('--transactions', type=int, default=200, help='transactions per client')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--bandwidth-mbps', type=float, default=10.0)
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    args = parser.parse_args()
+
+    from local_servers import LocalDynamoDB
+
+    with LocalDynamoDB() as dynamo:
+        os.environ.update(dynamo.environment())
+        setup_django()
+        from django.test import Client
+        from funds.middleware import CompressionMiddleware
+
+        client_ids = seed_dataset(args.clients, subscriptions=3, transactions=args.transactions)
+        http = Client()
+        endpoints = {
+            'funds': ('/api/funds/', False),
+            'fund detail': ('/api/funds/1/', False),
+            'clients page': ('/api/clients/?limit=100', False),
+            'transactions page': (f'/api/clients/{client_ids[0]}/transactions/?limit=100', False),
+            'clients stream': ('/api/clients/?stream=ndjson', True),
+            'transactions stream': (f'/api/clients/{client_ids[0]}/transactions/?stream=json', True),
+        }
+        bodies = {}
+        for name, (path, streaming) in endpoints.items():
+            response = http.get(path)
+            chunks = list(response.streaming_content) if streaming else [response.content]
+            bodies[name] = (chunks, streaming)
+
+    middleware = CompressionMiddleware(lambda request: None)
+    bytes_per_second = args.bandwidth_mbps * 1e6 / 8
+    results = []
+    for name, (chunks, streaming) in bodies.items():
+        size = sum(len(chunk) for chunk in chunks)
+        for encoding, level in LEVELS:
+            if encoding == 'br':
+                middleware.brotli_quality = level
+            else:
+                middleware.gzip_level = level
+
+            if streaming:
+                def run():
+                    return b''.join(middleware._compress_sync(encoding, iter(chunks)))
+            else:
+                def run():
+                    return middleware.compress(encoding, chunks[0])
+            elapsed, compressed = best_time(args.repeat, run)
+            saved = size - len(compressed)
+            results.append({
+                'endpoint': name,
+                'streaming': streaming,
+                'encoding': encoding,
+                'level': level,
+                'bytes': size,
+                'compressed': len(compressed),
+                'ratio': len(compressed) / size if size else 1.0,
+                'cpu_ms': elapsed * 1000,
+                'net_saved_ms': (saved / bytes_per_second - elapsed) * 1000,
+            })
+
+    print(f"{'endpoint':<21}{'enc':<5}{'lvl':>4}{'bytes':>10}{'compr':>9}{'ratio':>7}{'cpu ms':>9}{'net ms':>9}")
+    for row in results:
+        print(f"{row['endpoint']:<21}{row['encoding']:<5}{row['level']:>4}{row['bytes']:>10}{row['compressed']:>9}"
+              f"{row['ratio']:>7.2f}{row['cpu_ms']:>9.3f}{row['net_saved_ms']:>9.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'args': vars(args), 'results': results}, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""End-to-end throughput and latency of every route in funds/urls.py against a seeded local DynamoDB.
+
+The app runs under gunicorn (or uvicorn with --server asgi) in a child process and talks to moto server
+with an artificial per-call latency. The dataset is seeded once (clients x subscriptions x transactions);
+each endpoint then gets --requests requests over --concurrency keep-alive connections. Write endpoints
+use requests that succeed on the seeded data (new client ids, funds the client is not subscribed to,
+subscriptions that exist), so their count is capped by the dataset size.
+
+Results go to stdout and, with --json, to a file that also records the git commit; --compare takes a
+previous JSON file and prints the throughput / p95 change per endpoint.
+
+Usage: python scripts/bench_endpoints.py [--clients 200] [--subscriptions 3] [--transactions 20]
+       [--requests 500] [--concurrency 4] [--server wsgi] [--dynamo-latency-ms 2]
+       [--only get_fund,get_client] [--env READ_CACHE_ENABLED=False] [--json out.json] [--compare base.json]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_utils import ROOT, http_load, seed_dataset, setup_django, summarize
+
+FUND_IDS = ['1', '2', '3', '4', '5']
+EXPORT_TOKEN = 'bench'
+
+
+def build_requests(name, client_ids, count, rng, subscriptions):
+    """Requests for the route `name` (the URL name in funds/urls.py), or None if there is no scenario."""
+    def client():
+        return rng.choice(client_ids)
+
+    # seed_dataset subscribes client i to FUND_IDS[(i + j) % 5] for j < subscriptions
+    subscribed = [(client_id, FUND_IDS[(i + j) % 5])
+                  for i, client_id in enumerate(client_ids) for j in range(subscriptions)]
+    unsubscribed = [(client_id, FUND_IDS[(i + j) % 5])
+                    for i, client_id in enumerate(client_ids) for j in range(subscriptions, 5)]
+    stamp = int(time.time())
+
+    scenarios = {
+        'health_check': lambda: ['/api/health/'] * count,
+        'health_check_deep': lambda: ['/api/health/deep/'] * count,
+        'cache_metrics': lambda: ['/api/cache/metrics/'] * count,
+        'list_funds': lambda: ['/api/funds/'] * count,
+        'get_fund': lambda: [f'/api/funds/{rng.choice(FUND_IDS)}/' for _ in range(count)],
+        'list_clients': lambda: ['/api/clients/?limit=50'] * count,
+        'create_client': lambda: [
+            ('POST', '/api/clients/create/', {'client_id': f'NEW{stamp}{i:06d}', 'nombre': 'Nombre',
+                                              'apellidos': 'Apellidos', 'ciudad': 'Cali'})
+            for i in range(count)
+        ],
+        'get_clients_batch': lambda: [
+            ('POST', '/api/clients/batch/', {'client_ids': rng.sample(client_ids, min(50, len(client_ids)))})
+            for _ in range(count)
+        ],
+        'get_client': lambda: [f'/api/clients/{client()}/' for _ in range(count)],
+        'get_client_balance': lambda: [f'/api/clients/{client()}/balance/' for _ in range(count)],
+        'get_client_subscriptions': lambda: [f'/api/clients/{client()}/subscriptions/' for _ in range(count)],
+        'get_client_transactions': lambda: [f'/api/clients/{client()}/transactions/?limit=50'
+                                            for _ in range(count)],
+        'deposit': lambda: [('POST', '/api/deposit/', {'client_id': client(), 'amount': '1000'})
+                            for _ in range(count)],
+        'subscribe_to_fund': lambda: [
+            ('POST', '/api/subscribe/', {'client_id': client_id, 'fund_id': fund_id})
+            for client_id, fund_id in rng.sample(unsubscribed, min(count, len(unsubscribed)))
+        ],
+        'cancel_subscription': lambda: [
+            ('POST', '/api/cancel/', {'client_id': client_id, 'fund_id': fund_id})
+            for client_id, fund_id in rng.sample(subscribed, min(count, len(subscribed)))
+        ],
+        'initialize_system': lambda: [('POST', '/api/initialize/', None)] * count,
+        # Each request scans the whole table: a few are enough
+        'export_transactions': lambda: ['/api/transactions/export/?type=subscription'] * min(count, 20),
+    }
+    scenario = scenarios.get(name)
+    return scenario() if scenario else None
+
+
+def route_names():
+    from funds.urls import urlpatterns
+    return [(pattern.name, str(pattern.pattern)) for pattern in urlpatterns]
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as handle:
+        baseline = {row['endpoint']: row for row in json.load(handle)['results']}
+    print(f"\ncompared with {baseline_path}")
+    print(f"{'endpoint':<26}{'req/s before':>14}{'after':>10}{'change':>9}{'p95 before':>12}{'after':>10}{'change':>9}")
+    for row in results:
+        before = baseline.get(row['endpoint'])
+        if not before:
+            continue
+        throughput = (row['throughput'] / before['throughput'] - 1) * 100 if before['throughput'] else 0.0
+        p95 = (row['p95_ms'] / before['p95_ms'] - 1) * 100 if before['p95_ms'] else 0.0
+        print(f"{row['endpoint']:<26}{before['throughput']:>14.1f}{row['throughput']:>10.1f}{throughput:>+8.1f}%"
+              f"{before['p95_ms']:>12.2f}{row['p95_ms']:>10.2f}{p95:>+8.1f}%")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--subscriptions', type=int, default=3, help='funds subscribed per client (max 4)')
+    parser.add_argument('--transactions', type=int, default=20, help='transactions per client')
+    parser.add_argument('--requests', type=int, default=500, help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8, help='gthread threads per WSGI worker')
+    parser.add_argument('--dynamo-latency-ms', type=float, default=2.0)
+    parser.add_argument('--only', help='comma-separated URL names to run (default: all)')
+    parser.add_argument('--env', action='append', default=[], metavar='KEY=VALUE',
+                        help='extra environment for the app server (repeatable)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    parser.add_argument('--compare', help='previous --json output to compare against')
+    args = parser.parse_args()
+    args.subscriptions = max(0, min(args.subscriptions, 4))
+
+    from local_servers import AppServer, LocalDynamoDB
+
+    extra_env = dict(item.split('=', 1) for item in args.env)
+    only = {name.strip() for name in args.only.split(',')} if args.only else None
+    rng = random.Random(args.seed)
+    results, skipped = [], []
+    with LocalDynamoDB(latency=args.dynamo_latency_ms / 1000) as dynamo, \
+            tempfile.TemporaryDirectory(prefix='funds-bench-cache-') as cache_dir:
+        env = {**dynamo.environment(), 'SHARED_CACHE_LOCATION': cache_dir,
+               'ASYNC_VIEWS': str(args.server == 'asgi'), 'EXPORT_TOKEN': EXPORT_TOKEN, **extra_env}
+        headers = {'X-Export-Token': env['EXPORT_TOKEN']}
+        os.environ.update(env)
+        setup_django()
+        client_ids = seed_dataset(args.clients, subscriptions=args.subscriptions, transactions=args.transactions)
+
+        with AppServer(args.server, workers=args.workers, threads=args.threads, env=env) as server:
+            for name, pattern in route_names():
+                if only and name not in only:
+                    continue
+                requests = build_requests(name, client_ids, args.requests, rng, args.subscriptions)
+                if not requests:
+                    skipped.append(name)
+                    continue
+                if all(isinstance(entry, str) for entry in requests):
+                    http_load(server.base_url, requests[:args.concurrency * 4], args.concurrency, headers)  # warm-up
+                latencies, failures, elapsed, received = http_load(server.base_url, requests, args.concurrency,
+                                                                   headers)
+                results.append({
+                    'endpoint': name,
+                    'pattern': pattern,
+                    'method': 'GET' if isinstance(requests[0], str) else requests[0][0],
+                    'bytes_per_request': received / len(requests),
+                    **summarize(latencies, elapsed, failures),
+                })
+
+    print(f"{'endpoint':<26}{'method':<7}{'n':>6}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'bytes':>9}{'fail':>6}")
+    for row in results:
+        print(f"{row['endpoint']:<26}{row['method']:<7}{row['count']:>6}{row['throughput']:>9.1f}"
+              f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+              f"{row['bytes_per_request']:>9.0f}{row['failures']:>6}")
+    if skipped:
+        print(f"no scenario for: {', '.join(skipped)}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({
+                'commit': git_commit(),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'args': vars(args),
+                'results': results,
+            }, handle, indent=2)
+    return 1 if skipped else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
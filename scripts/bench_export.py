@@ -0,0 +1,78 @@
+"""Throughput and peak memory of `manage.py export_transactions` for CSV and Parquet.
+
+Seeds a local DynamoDB stand-in (moto server in its own process) with clients x transactions and runs each
+export as a separate `manage.py export_transactions` process, so its peak RSS (from wait4) measures only the
+exporter. Run it with two dataset sizes to check that memory stays flat while the row count grows.
+
+Usage: python scripts/bench_export.py [--clients 2000] [--transactions 20] [--segments 1,4]
+       [--formats csv,parquet] [--row-group-size 50000] [--json results.json]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_utils import ROOT, seed_dataset, setup_django
+
+
+def run_export(env, output_format, segments, row_group_size, path):
+    command = [sys.executable, 'manage.py', 'export_transactions', '-o', path, '--format', output_format,
+               '--segments', str(segments), '--row-group-size', str(row_group_size)]
+    start = time.perf_counter()
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    stderr = process.stderr.read().decode(errors='replace')
+    process.stderr.close()
+    if os.waitstatus_to_exitcode(status) != 0:
+        raise RuntimeError(stderr)
+    return elapsed, usage.ru_maxrss / 1024, stderr.strip().splitlines()[-1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=2000)
+    parser.add_argument('--transactions', type=int, default=20, help='transactions per client')
+    parser.add_argument('--segments', default='1,4', help='comma-separated parallel scan segment counts')
+    parser.add_argument('--formats', default='csv,parquet')
+    parser.add_argument('--row-group-size', type=int, default=50000)
+    parser.add_argument('--dynamo-latency-ms', type=float, default=0.0)
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    args = parser.parse_args()
+
+    from local_servers import LocalDynamoDB
+
+    results = []
+    with LocalDynamoDB(latency=args.dynamo_latency_ms / 1000) as dynamo:
+        os.environ.update(dynamo.environment())
+        setup_django()
+        seed_dataset(args.clients, subscriptions=0, transactions=args.transactions)
+        env = {**os.environ, **dynamo.environment(), 'SLOW_LOG_DYNAMODB_MS': '', 'METRICS_ENABLED': 'False'}
+        workdir = tempfile.mkdtemp(prefix='funds-export-')
+        for output_format in [name.strip() for name in args.formats.split(',') if name.strip()]:
+            for segments in [int(value) for value in args.segments.split(',') if value.strip()]:
+                path = os.path.join(workdir, f'transactions-{segments}.{output_format}')
+                elapsed, max_rss_mb, summary = run_export(env, output_format, segments, args.row_group_size, path)
+                items = int(summary.split()[0])
+                results.append({
+                    'format': output_format, 'segments': segments, 'items': items, 'seconds': elapsed,
+                    'items_per_second': items / elapsed if elapsed else 0.0,
+                    'bytes': os.path.getsize(path), 'max_rss_mb': max_rss_mb,
+                })
+
+    print(f"{'format':<9}{'segments':>9}{'items':>9}{'seconds':>9}{'items/s':>10}{'MB out':>9}{'max RSS MB':>12}")
+    for row in results:
+        print(f"{row['format']:<9}{row['segments']:>9}{row['items']:>9}{row['seconds']:>9.1f}"
+              f"{row['items_per_second']:>10.0f}{row['bytes'] / 1e6:>9.2f}{row['max_rss_mb']:>12.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'args': vars(args), 'results': results}, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
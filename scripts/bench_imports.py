@@ -0,0 +1,134 @@
+"""Import-time profile (python -X importtime) of the entry points that pay the project's startup cost.
+
+Each target runs in a fresh interpreter, `--runs` times:
+
+  setup      django.setup() only (manage.py commands that skip system checks, scripts)
+  services   django.setup() + funds.services (management commands and scripts that use the services)
+  urls       django.setup() + loading the URLconf with every view (a gunicorn worker without preload_app)
+
+and reports the median wall time, the number of modules loaded, which heavy optional dependencies were
+imported (boto3/botocore, twilio, requests, smtplib, ssl) and the packages with the highest self import time.
+--json records the commit; --compare takes a previous --json output.
+
+Usage: python scripts/bench_imports.py [--runs 5] [--top 10] [--json imports.json] [--compare base.json]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+from bench_utils import ROOT
+
+TARGETS = {
+    'setup': '',
+    'services': 'import funds.services',
+    'urls': 'from django.urls import get_resolver; get_resolver().url_patterns',
+}
+HEAVY = ('boto3', 'botocore', 'twilio', 'requests', 'smtplib', 'ssl', 'rest_framework')
+
+CHILD = """
+import os, sys, time
+sys.path.insert(0, {root!r})
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'funds_management.settings')
+start = time.perf_counter()
+import django
+django.setup()
+{code}
+print('WALL_MS', (time.perf_counter() - start) * 1000)
+print('HEAVY', ','.join(name for name in {heavy!r} if name in sys.modules))
+"""
+LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def run_target(code: str) -> dict:
+    env = {**os.environ, 'DEBUG': 'False', 'NOTIFICATIONS_ENABLED': 'False'}
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD.format(root=ROOT, code=code, heavy=HEAVY)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    )
+    packages = defaultdict(int)
+    modules = 0
+    for line in process.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            modules += 1
+            packages[match.group(4).split('.')[0]] += int(match.group(1))
+    output = dict(line.split(' ', 1) for line in process.stdout.splitlines() if line.startswith(('WALL_MS', 'HEAVY')))
+    return {
+        'wall_ms': float(output['WALL_MS']),
+        'modules': modules,
+        'heavy': [name for name in output.get('HEAVY', '').strip().split(',') if name],
+        'packages_ms': {name: us / 1000 for name, us in packages.items()},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, check=True,
+                              capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as handle:
+        baseline = {row['target']: row for row in json.load(handle)['results']}
+    print(f"\ncompared with {baseline_path}")
+    print(f"{'target':<10}{'ms before':>11}{'after':>9}{'change':>9}{'modules before':>16}{'after':>7}")
+    for row in results:
+        before = baseline.get(row['target'])
+        if not before:
+            continue
+        change = (row['wall_ms'] / before['wall_ms'] - 1) * 100 if before['wall_ms'] else 0.0
+        print(f"{row['target']:<10}{before['wall_ms']:>11.1f}{row['wall_ms']:>9.1f}{change:>+8.1f}%"
+              f"{before['modules']:>16}{row['modules']:>7}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per target')
+    parser.add_argument('--top', type=int, default=10, help='packages to list per target')
+    parser.add_argument('--targets', default=','.join(TARGETS))
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    parser.add_argument('--compare', help='previous --json output to compare against')
+    args = parser.parse_args()
+
+    results = []
+    for target in [target.strip() for target in args.targets.split(',') if target.strip()]:
+        runs = [run_target(TARGETS[target]) for _ in range(args.runs)]
+        packages = defaultdict(list)
+        for run in runs:
+            for name, ms in run['packages_ms'].items():
+                packages[name].append(ms)
+        top = sorted(((name, statistics.median(values)) for name, values in packages.items()),
+                     key=lambda item: item[1], reverse=True)[:args.top]
+        results.append({
+            'target': target,
+            'wall_ms': statistics.median(run['wall_ms'] for run in runs),
+            'modules': runs[0]['modules'],
+            'heavy': runs[0]['heavy'],
+            'top_packages_ms': dict(top),
+        })
+
+    print(f"{'target':<10}{'ms':>8}{'modules':>9}  heavy dependencies loaded")
+    for row in results:
+        print(f"{row['target']:<10}{row['wall_ms']:>8.1f}{row['modules']:>9}  {', '.join(row['heavy']) or '-'}")
+    for row in results:
+        print(f"\n{row['target']}: self import time by package (ms)")
+        for name, ms in row['top_packages_ms'].items():
+            print(f"  {name:<24}{ms:>8.1f}")
+
+    if args.compare:
+        print_comparison(results, args.compare)
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'commit': git_commit(), 'args': vars(args), 'results': results}, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
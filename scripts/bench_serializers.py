@@ -0,0 +1,66 @@
+"""Serialization benchmark: DRF Serializer(many=True) + JSONRenderer vs the precompiled encoders.
+
+Usage: python scripts/bench_serializers.py [--objects 10000] [--repeat 5]
+"""
+import argparse
+import json
+import time
+import uuid
+from decimal import Decimal
+
+from bench_utils import setup_django
+
+
+def best_of(repeat, run):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, body
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--objects', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from funds.models import Client, Transaction
+    from funds.renderers import FastJSONRenderer
+    from funds.serializers import CLIENT_ENCODER, TRANSACTION_ENCODER, ClientSerializer, TransactionSerializer
+
+    transactions = [
+        Transaction(str(uuid.uuid4()), 'CL_BENCH', str(i % 5 + 1), Decimal('75000') + i, 'subscription')
+        for i in range(args.objects)
+    ]
+    clients = [
+        Client(f'CL{i:06d}', 'Nombre', 'Apellidos', 'Bogotá', email=f'c{i}@example.com', phone=None)
+        for i in range(args.objects)
+    ]
+
+    cases = (
+        ('transactions', transactions, TransactionSerializer, TRANSACTION_ENCODER),
+        ('clients', clients, ClientSerializer, CLIENT_ENCODER),
+    )
+    print(f"{'payload':<14}{'path':<22}{'seconds':>10}{'objects/s':>12}{'bytes':>10}")
+    for name, objects, serializer_class, encoder in cases:
+        drf_time, drf_body = best_of(args.repeat, lambda: JSONRenderer().render(
+            {'success': True, name: serializer_class(objects, many=True).data}
+        ))
+        fast_time, fast_body = best_of(args.repeat, lambda: FastJSONRenderer().render(
+            {'success': True, name: encoder.encode_many(objects)}
+        ))
+        if json.loads(drf_body) != json.loads(fast_body):
+            print(f'{name}: fast path output differs from DRF output')
+            return 1
+        for path, elapsed, body in (('DRF serializer', drf_time, drf_body), ('precompiled encoder', fast_time, fast_body)):
+            print(f'{name:<14}{path:<22}{elapsed:>10.4f}{len(objects) / elapsed:>12.0f}{len(body):>10}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
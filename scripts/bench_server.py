@@ -0,0 +1,93 @@
+"""Boot time, first-request latency and steady-state throughput of each gunicorn.conf.py worker mode, cold vs warm.
+
+For every worker mode (sync, gthread, uvicorn) the server is started twice against a local DynamoDB stand-in:
+
+  cold   GUNICORN_PRELOAD=False, GUNICORN_WARMUP=False (imports and connections happen on the first requests)
+  warm   GUNICORN_PRELOAD=True,  GUNICORN_WARMUP=True
+
+and measured:
+
+  boot ms        process start until /api/health/ answers (includes preload and warm-up)
+  first ms       latency of the first wave of `--concurrency` balance requests (different clients, no read cache)
+  req/s, p50/p99 steady state over `--requests` balance requests
+
+Usage: python scripts/bench_server.py [--modes sync,gthread,uvicorn] [--workers 1] [--requests 2000]
+       [--concurrency 8] [--dynamo-latency-ms 2] [--json results.json]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from bench_utils import http_load, seed_dataset, setup_django, summarize
+
+VARIANTS = {
+    'cold': {'GUNICORN_PRELOAD': 'False', 'GUNICORN_WARMUP': 'False'},
+    'warm': {'GUNICORN_PRELOAD': 'True', 'GUNICORN_WARMUP': 'True'},
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modes', default='sync,gthread,uvicorn')
+    parser.add_argument('--variants', default='cold,warm')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8, help='threads per gthread worker')
+    parser.add_argument('--clients', type=int, default=500)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--dynamo-latency-ms', type=float, default=2.0)
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    args = parser.parse_args()
+
+    from local_servers import AppServer, LocalDynamoDB
+
+    results = []
+    with LocalDynamoDB(latency=args.dynamo_latency_ms / 1000) as dynamo:
+        os.environ.update(dynamo.environment())
+        setup_django()
+        client_ids = seed_dataset(args.clients, subscriptions=3, transactions=0)
+        rng = random.Random(42)
+
+        for mode in [mode.strip() for mode in args.modes.split(',') if mode.strip()]:
+            for variant in [variant.strip() for variant in args.variants.split(',') if variant.strip()]:
+                first = [f'/api/clients/{client_id}/balance/' for client_id in rng.sample(client_ids, args.concurrency)]
+                paths = [f'/api/clients/{rng.choice(client_ids)}/balance/' for _ in range(args.requests)]
+                env = {
+                    **dynamo.environment(), **VARIANTS[variant],
+                    'GUNICORN_WORKER_MODE': mode, 'GUNICORN_THREADS': str(args.threads if mode == 'gthread' else 1),
+                    'READ_CACHE_ENABLED': 'False', 'SHARED_CACHE_LOCATION': tempfile.mkdtemp(prefix='funds-cache-'),
+                    'METRICS_ENABLED': 'False',
+                }
+                server = AppServer('conf', workers=args.workers, env=env)
+                start = time.perf_counter()
+                server.start(timeout=60)
+                boot_ms = (time.perf_counter() - start) * 1000
+                try:
+                    first_latencies, first_failures, _, _ = http_load(server.base_url, first, args.concurrency)
+                    latencies, failures, elapsed, _ = http_load(server.base_url, paths, args.concurrency)
+                finally:
+                    server.stop()
+                results.append({
+                    'mode': mode, 'variant': variant, 'boot_ms': boot_ms,
+                    'first_max_ms': max(first_latencies) * 1000,
+                    'first_failures': first_failures,
+                    **summarize(latencies, elapsed, failures),
+                })
+
+    print(f"{'mode':<9}{'variant':<8}{'boot ms':>9}{'first ms':>10}{'req/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'fail':>6}")
+    for row in results:
+        print(f"{row['mode']:<9}{row['variant']:<8}{row['boot_ms']:>9.0f}{row['first_max_ms']:>10.1f}"
+              f"{row['throughput']:>9.1f}{row['p50_ms']:>9.2f}{row['p99_ms']:>9.2f}"
+              f"{row['failures'] + row['first_failures']:>6}")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'args': vars(args), 'results': results}, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+"""Throughput benchmark: Twilio client per message vs the shared sender and the rate-limited dispatcher.
+
+Usage: python scripts/bench_sms.py [--messages 300] [--recipients 50] [--rate 0] [--latency-ms 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=300)
+    parser.add_argument('--recipients', type=int, default=50, help='distinct phone numbers')
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--rate', type=float, default=0.0, help='messages/second budget (0 = unlimited)')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='simulated Twilio API latency')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'funds_management.settings')
+    import django
+    django.setup()
+
+    from django.test.utils import override_settings
+    from twilio.rest import Client as TwilioClient
+    from funds import sms
+    from funds.notifications import NotificationService
+    from local_servers import FakeTwilioServer
+
+    messages = [(f'+57300{i % args.recipients:07d}', f'Mensaje {i}') for i in range(args.messages)]
+    rows = []
+    with FakeTwilioServer(latency=args.latency_ms / 1000) as server:
+        overrides = server.settings_overrides()
+        overrides.update(SMS_DISPATCH_WORKERS=args.workers, SMS_RATE_PER_SECOND=args.rate)
+
+        def measure(name, run):
+            with override_settings(**overrides):
+                sms.reset_sms_clients()
+                before_messages, before_connections = server.messages, server.connections
+                start = time.perf_counter()
+                ok, total = run()
+                elapsed = time.perf_counter() - start
+                rows.append({
+                    'mode': name, 'requests': server.messages - before_messages, 'ok': ok, 'failed': total - ok,
+                    'connections': server.connections - before_connections,
+                    'seconds': elapsed, 'per_second': len(messages) / elapsed,
+                })
+
+        def client_per_message():
+            ok = 0
+            for to_phone, body in messages:
+                client = TwilioClient(
+                    overrides['TWILIO_ACCOUNT_SID'], overrides['TWILIO_AUTH_TOKEN'],
+                    http_client=sms.build_http_client(base_url=server.base_url),
+                )
+                client.messages.create(from_=overrides['TWILIO_FROM_NUMBER'], body=body, to=to_phone)
+                ok += 1
+            return ok, len(messages)
+
+        def shared_sender():
+            results = [NotificationService.send_sms(to_phone, body) for to_phone, body in messages]
+            return sum(1 for status, _ in results if status), len(results)
+
+        def dispatcher(coalesce):
+            def run():
+                with override_settings(SMS_COALESCE_RECIPIENTS=coalesce):
+                    sms.reset_sms_clients()
+                    results = NotificationService.send_bulk_sms(messages)
+                return sum(1 for _, status, _ in results if status), len(results)
+            return run
+
+        measure('client per message', client_per_message)
+        measure('shared sender', shared_sender)
+        measure('dispatcher', dispatcher(False))
+        measure('dispatcher + coalescing', dispatcher(True))
+        sms.reset_sms_clients()
+
+    print(f"{'mode':<26}{'requests':>10}{'ok':>6}{'failed':>8}{'conns':>7}{'seconds':>10}{'msg/s':>10}")
+    for row in rows:
+        print(f"{row['mode']:<26}{row['requests']:>10}{row['ok']:>6}{row['failed']:>8}{row['connections']:>7}"
+              f"{row['seconds']:>10.2f}{row['per_second']:>10.1f}")
+    return 0 if all(row['failed'] == 0 for row in rows) else 3
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,82 @@
+"""Throughput benchmark: per-message SMTP sessions vs the pooled SMTP sessions.
+
+Usage: python scripts/bench_smtp.py [--messages 500] [--threads 4] [--tls] [--latency-ms 0]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def run_mode(name, send, count, threads):
+    start = time.perf_counter()
+    if threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(send, range(count)))
+    else:
+        results = [send(i) for i in range(count)]
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for status, _ in results if status)
+    return {'mode': name, 'sent': ok, 'failed': count - ok, 'seconds': elapsed, 'per_second': count / elapsed}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--tls', action='store_true', help='negotiate STARTTLS with a self-signed cert')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='simulated server latency per DATA')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'funds_management.settings')
+    import django
+    django.setup()
+
+    from django.test.utils import override_settings
+    from funds.notifications import NotificationService
+    from funds.smtp_pool import get_smtp_pool, reset_smtp_pool
+    from local_servers import LocalSMTPServer
+
+    rows = []
+    with LocalSMTPServer(tls=args.tls, latency=args.latency_ms / 1000) as server:
+        overrides = server.settings_overrides()
+
+        def single(i):
+            return NotificationService.send_email(f'user{i}@example.com', 'Benchmark', f'Mensaje {i}')
+
+        for name, pooled in (('per-message session', False), ('pooled sessions', True)):
+            with override_settings(EMAIL_POOL_ENABLED=pooled, EMAIL_POOL_SIZE=args.threads, **overrides):
+                reset_smtp_pool()
+                before = server.handshakes
+                row = run_mode(name, single, args.messages, args.threads)
+                row['handshakes'] = server.handshakes - before
+                rows.append(row)
+
+        with override_settings(EMAIL_POOL_ENABLED=True, EMAIL_POOL_SIZE=args.threads, **overrides):
+            reset_smtp_pool()
+            before = server.handshakes
+            batch = [(f'user{i}@example.com', 'Benchmark', f'Mensaje {i}') for i in range(args.messages)]
+            start = time.perf_counter()
+            results = NotificationService.send_bulk_email(batch)
+            elapsed = time.perf_counter() - start
+            ok = sum(1 for status, _ in results if status)
+            rows.append({
+                'mode': 'bulk (single session)', 'sent': ok, 'failed': len(batch) - ok,
+                'seconds': elapsed, 'per_second': len(batch) / elapsed,
+                'handshakes': server.handshakes - before,
+            })
+            get_smtp_pool().close_all()
+
+    print(f"{'mode':<24}{'sent':>8}{'failed':>8}{'handshakes':>12}{'seconds':>10}{'msg/s':>10}")
+    for row in rows:
+        print(f"{row['mode']:<24}{row['sent']:>8}{row['failed']:>8}{row['handshakes']:>12}"
+              f"{row['seconds']:>10.2f}{row['per_second']:>10.1f}")
+    return 0 if all(row['failed'] == 0 for row in rows) else 3
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
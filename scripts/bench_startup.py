@@ -0,0 +1,135 @@
+"""Startup time and per-request middleware overhead: default settings vs API_PROFILE=True.
+
+Each measurement runs in a fresh interpreter so imports are not shared between profiles:
+
+  startup     wall time of `django.setup()` + building the WSGI application + loading the URLconf
+  request     time per GET /api/health/ through the full WSGI handler (middleware + URL resolution)
+  view        time per call of the bare view, the difference is the framework/middleware overhead
+
+Usage: python scripts/bench_startup.py [--runs 5] [--requests 5000] [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from bench_utils import ROOT
+
+PROFILES = {'default': 'False', 'api': 'True'}
+
+
+def child_startup() -> dict:
+    start = time.perf_counter()
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'funds_management.settings')
+    from django.core.wsgi import get_wsgi_application
+    from django.urls import get_resolver
+
+    get_wsgi_application()
+    get_resolver().url_patterns
+    return {'startup_ms': (time.perf_counter() - start) * 1000, 'modules': len(sys.modules)}
+
+
+def child_requests(count: int) -> dict:
+    import io
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'funds_management.settings')
+    from django.conf import settings
+    from django.core.wsgi import get_wsgi_application
+    from django.test import RequestFactory
+    from funds.views import health_check
+
+    application = get_wsgi_application()
+
+    def start_response(status, headers, exc_info=None):
+        if not status.startswith('200'):
+            raise RuntimeError(status)
+
+    def environ():
+        return {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': '/api/health/', 'QUERY_STRING': '', 'SCRIPT_NAME': '',
+            'SERVER_NAME': 'localhost', 'SERVER_PORT': '8000', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'localhost', 'HTTP_ACCEPT': 'application/json',
+            'wsgi.input': io.BytesIO(b''), 'wsgi.url_scheme': 'http', 'wsgi.errors': sys.stderr,
+            'wsgi.multithread': False, 'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+
+    for _ in range(200):
+        b''.join(application(environ(), start_response))
+    start = time.perf_counter()
+    for _ in range(count):
+        b''.join(application(environ(), start_response))
+    request_us = (time.perf_counter() - start) / count * 1e6
+
+    factory = RequestFactory()
+    requests = [factory.get('/api/health/') for _ in range(count)]
+    start = time.perf_counter()
+    for request in requests:
+        health_check(request).render()
+    view_us = (time.perf_counter() - start) / count * 1e6
+
+    return {
+        'request_us': request_us,
+        'view_us': view_us,
+        'overhead_us': request_us - view_us,
+        'middleware': len(settings.MIDDLEWARE),
+        'apps': len(settings.INSTALLED_APPS),
+    }
+
+
+def run_child(profile: str, mode: str, requests: int) -> dict:
+    env = {**os.environ, 'API_PROFILE': PROFILES[profile], 'DEBUG': 'False', 'NOTIFICATIONS_ENABLED': 'False'}
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', mode, '--requests', str(requests)],
+        cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result['process_ms'] = (time.perf_counter() - start) * 1000
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per profile for startup')
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    parser.add_argument('--child', choices=('startup', 'requests'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, ROOT)
+        result = child_startup() if args.child == 'startup' else child_requests(args.requests)
+        print(json.dumps(result))
+        return 0
+
+    results = []
+    for profile in PROFILES:
+        startups = [run_child(profile, 'startup', 0) for _ in range(args.runs)]
+        requests = run_child(profile, 'requests', args.requests)
+        requests.pop('process_ms')
+        results.append({
+            'profile': profile,
+            'startup_ms': statistics.median(run['startup_ms'] for run in startups),
+            'process_ms': statistics.median(run['process_ms'] for run in startups),
+            'modules': startups[0]['modules'],
+            **requests,
+        })
+
+    print(f"{'profile':<9}{'apps':>5}{'mw':>4}{'modules':>9}{'setup ms':>10}{'process ms':>12}"
+          f"{'req us':>9}{'view us':>9}{'overhead us':>13}")
+    for row in results:
+        print(f"{row['profile']:<9}{row['apps']:>5}{row['middleware']:>4}{row['modules']:>9}"
+              f"{row['startup_ms']:>10.1f}{row['process_ms']:>12.1f}{row['request_us']:>9.1f}"
+              f"{row['view_us']:>9.1f}{row['overhead_us']:>13.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'args': vars(args), 'results': results}, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+"""Bulk rendering benchmark: inline f-strings + MIMEText vs the precompiled notification templates.
+
+Usage: python scripts/bench_templates.py [--messages 10000]
+"""
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--messages', type=int, default=10000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'funds_management.settings')
+    import django
+    django.setup()
+
+    from email.mime.text import MIMEText
+    from email.utils import formataddr
+    from funds import notification_templates as templates
+
+    from_header = formataddr(('Funds App', 'funds@example.com'))
+    contexts = [
+        {'fund_name': 'FDO-ACCIONES', 'fund_id': '4', 'amount': Decimal('250000'), 'new_balance': Decimal(i)}
+        for i in range(args.messages)
+    ]
+
+    def legacy():
+        for context in contexts:
+            message = (
+                f"Te suscribiste al fondo {context['fund_name']} (ID {context['fund_id']}) por {context['amount']}. "
+                f"Saldo disponible: {context['new_balance']}."
+            )
+            msg = MIMEText(message, 'plain', 'utf-8')
+            msg['Subject'] = 'Suscripción realizada'
+            msg['From'] = from_header
+            msg['To'] = 'client@example.com'
+            msg.as_string()
+
+    def compiled_plain():
+        for context in contexts:
+            rendered = templates.render('subscription', context, channel='email')
+            templates.encode_email(from_header, 'client@example.com', rendered.subject, rendered.text)
+
+    def compiled_html():
+        for context in contexts:
+            rendered = templates.render('subscription', context)
+            templates.encode_email(from_header, 'client@example.com', rendered.subject, rendered.text, rendered.html)
+
+    def batch_sms():
+        templates.render_many('subscription', contexts, channel='sms')
+
+    def digest():
+        for start in range(0, len(contexts), 10):
+            rendered = templates.render_many('subscription', contexts[start:start + 10], channel='email')
+            item = templates.render_digest(rendered)
+            templates.encode_email(from_header, 'client@example.com', item.subject, item.text, item.html)
+
+    rows = []
+    for name, run in (
+        ('f-string + MIMEText (plain)', legacy),
+        ('templates (plain)', compiled_plain),
+        ('templates (plain + html)', compiled_html),
+        ('templates batch (sms only)', batch_sms),
+        ('templates digest x10', digest),
+    ):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        rows.append((name, elapsed, args.messages / elapsed))
+
+    print(f"{'mode':<32}{'seconds':>10}{'msg/s':>12}")
+    for name, elapsed, rate in rows:
+        print(f'{name:<32}{elapsed:>10.3f}{rate:>12.0f}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
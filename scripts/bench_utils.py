@@ -0,0 +1,123 @@
+"""Helpers shared by the benchmark and load-test scripts."""
+import math
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django(settings_module: str = 'funds_management.settings') -> None:
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+    django.setup()
+
+
+def percentile(sorted_values, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(q / 100 * len(sorted_values)), 1)
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies, elapsed: float, failures: int = 0) -> dict:
+    """Throughput, failure rate and latency percentiles (ms) for one run."""
+    values = sorted(latencies)
+    total = len(values)
+    return {
+        'count': total,
+        'failures': failures,
+        'failure_rate': failures / total if total else 0.0,
+        'seconds': elapsed,
+        'throughput': total / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(values, 50) * 1000,
+        'p95_ms': percentile(values, 95) * 1000,
+        'p99_ms': percentile(values, 99) * 1000,
+        'max_ms': (values[-1] * 1000) if values else 0.0,
+    }
+
+
+def http_load(base_url: str, paths, concurrency: int = 8, headers: dict = None):
+    """Send every request once over `concurrency` keep-alive connections.
+
+    Each entry of `paths` is either a path (GET) or a ``(method, path, body)`` tuple; a dict/list body is
+    sent as JSON. Returns (latencies, failures, elapsed, bytes_received). Non-2xx/304 answers count as failures.
+    """
+    import http.client
+    import json
+    import threading
+    import time
+    from urllib.parse import urlsplit
+
+    target = urlsplit(base_url)
+    queue = list(reversed(paths))
+    lock = threading.Lock()
+    latencies, totals = [], {'failures': 0, 'bytes': 0}
+
+    def worker():
+        connection = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+        while True:
+            with lock:
+                if not queue:
+                    break
+                entry = queue.pop()
+            method, path, body = ('GET', entry, None) if isinstance(entry, str) else entry
+            request_headers = dict(headers or {})
+            if isinstance(body, (dict, list)):
+                body = json.dumps(body).encode()
+                request_headers['Content-Type'] = 'application/json'
+            start = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=request_headers)
+                response = connection.getresponse()
+                body = response.read()
+                ok = 200 <= response.status < 300 or response.status == 304
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                connection = http.client.HTTPConnection(target.hostname, target.port, timeout=30)
+                body, ok = b'', False
+            latency = time.perf_counter() - start
+            with lock:
+                latencies.append(latency)
+                totals['bytes'] += len(body)
+                if not ok:
+                    totals['failures'] += 1
+        connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, totals['failures'], time.perf_counter() - start, totals['bytes']
+
+
+def seed_dataset(clients: int, subscriptions: int = 3, transactions: int = 5) -> list:
+    """Create the table, the default funds and `clients` clients with their balance, subscriptions and
+    transactions (written directly, no notifications). Returns the client ids."""
+    import uuid
+    from decimal import Decimal
+    from funds.dynamo_client import DynamoDBClient
+    from funds.models import Client, ClientBalance, ClientFundSubscription, Transaction
+    from funds.services import FundService
+
+    dynamo = DynamoDBClient()
+    dynamo.create_table_if_not_exists()
+    FundService.initialize_default_funds()
+    fund_ids = ['1', '2', '3', '4', '5']
+    client_ids = [f'CL{i:06d}' for i in range(clients)]
+    with dynamo.table.batch_writer() as batch:
+        for i, client_id in enumerate(client_ids):
+            batch.put_item(Item=Client(client_id, 'Nombre', 'Apellidos', 'Bogotá',
+                                       email=f'{client_id.lower()}@example.com').to_dynamo_item())
+            batch.put_item(Item=ClientBalance(client_id, Decimal('500000')).to_dynamo_item())
+            for j in range(min(subscriptions, len(fund_ids))):
+                fund_id = fund_ids[(i + j) % len(fund_ids)]
+                batch.put_item(Item=ClientFundSubscription(client_id, fund_id, Decimal('75000')).to_dynamo_item())
+            for j in range(transactions):
+                batch.put_item(Item=Transaction(str(uuid.uuid4()), client_id, fund_ids[j % len(fund_ids)],
+                                                Decimal('75000') + j, 'subscription').to_dynamo_item())
+    return client_ids
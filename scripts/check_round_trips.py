@@ -0,0 +1,80 @@
+"""Fail when an endpoint makes more DynamoDB round trips than its budget, re-reads a key or loops single reads.
+
+Runs every request below through the Django test client against an in-process moto DynamoDB with the
+read cache disabled (so every request hits storage) and ROUND_TRIP_MODE=raise, so the budgets declared with
+@round_trip_budget in funds/services.py are enforced too. Meant for CI: exit code 1 on any violation.
+
+Usage: python scripts/check_round_trips.py [--verbose]
+"""
+import argparse
+import json
+import os
+import sys
+
+from bench_utils import setup_django
+
+# (method, path, body, budget): budget of DynamoDB calls for the whole request
+ENDPOINTS = [
+    ('GET', '/api/health/', None, 0),
+    ('GET', '/api/health/deep/', None, 1),
+    ('GET', '/api/funds/', None, 1),
+    ('GET', '/api/funds/1/', None, 1),
+    ('GET', '/api/clients/?limit=10', None, 10),  # filtered Scan: up to max_rounds pages to fill a page
+    ('GET', '/api/clients/CL000001/', None, 1),
+    ('GET', '/api/clients/CL000001/balance/', None, 3),
+    ('GET', '/api/clients/CL000001/subscriptions/', None, 1),
+    ('GET', '/api/clients/CL000001/transactions/?limit=10', None, 1),
+    ('GET', '/api/transactions/export/', None, 4),  # one Scan page per segment (EXPORT_SCAN_SEGMENTS)
+    ('POST', '/api/clients/batch/', {'client_ids': ['CL000001', 'CL000002', 'CL000003', 'CL000004']}, 6),
+    ('POST', '/api/clients/create/', {'client_id': 'RT000001', 'nombre': 'N', 'apellidos': 'A', 'ciudad': 'C'}, 4),
+    ('POST', '/api/deposit/', {'client_id': 'CL000001', 'amount': '1000'}, 4),
+    ('POST', '/api/subscribe/', {'client_id': 'CL000001', 'fund_id': '4'}, 7),
+    ('POST', '/api/cancel/', {'client_id': 'CL000001', 'fund_id': '4'}, 7),
+]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--verbose', action='store_true', help='print every call')
+    args = parser.parse_args()
+
+    os.environ.update({
+        'AWS_ACCESS_KEY_ID': 'check', 'AWS_SECRET_ACCESS_KEY': 'check', 'AWS_REGION': 'us-east-1',
+        'DYNAMODB_ENDPOINT_URL': '', 'NOTIFICATIONS_ENABLED': 'False', 'READ_CACHE_ENABLED': 'False',
+        'ROUND_TRIP_MODE': 'raise', 'CONDITIONAL_GET_CACHE': 'default', 'EXPORT_TOKEN': 'check',
+    })
+    setup_django()
+    from moto import mock_aws
+    from django.test import Client
+    from funds.roundtrips import track_round_trips
+    from bench_utils import seed_dataset
+
+    failures = 0
+    with mock_aws():
+        seed_dataset(5, subscriptions=2, transactions=3)
+        http = Client(HTTP_X_EXPORT_TOKEN='check')
+        print(f"{'request':<52}{'calls':>6}{'budget':>7}  result")
+        for method, path, body, budget in ENDPOINTS:
+            with track_round_trips(f'{method} {path}') as tracker:
+                if method == 'GET':
+                    response = http.get(path)
+                else:
+                    response = http.post(path, json.dumps(body), content_type='application/json')
+                if response.streaming:
+                    b''.join(response.streaming_content)
+            problems = tracker.issues()
+            if response.status_code >= 500:
+                problems.append(response.content.decode(errors='replace')[:300])
+            if tracker.count > budget:
+                problems.append(f'{tracker.count} calls > budget {budget}')
+            failures += bool(problems)
+            print(f"{method + ' ' + path:<52}{tracker.count:>6}{budget:>7}  {'; '.join(problems) or 'ok'}")
+            if args.verbose:
+                for operation, key, parallel in tracker.calls:
+                    print(f"    {operation} {key}{' (read pool)' if parallel else ''}")
+    print(f'\n{failures} endpoint(s) over budget' if failures else '\nall endpoints within budget')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
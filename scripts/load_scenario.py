@@ -0,0 +1,330 @@
+"""Scenario-driven load generator: weighted operation mix, skewed client keys and concurrency ramps.
+
+A scenario is a JSON file (see scripts/scenarios/) with:
+
+  dataset       clients / subscriptions / transactions seeded into the local DynamoDB stand-in
+  operations    weights for balance, deposit, subscribe and cancel
+  clients       key distribution for client ids: {"distribution": "zipf", "s": 1.1} or "uniform"
+  funds         key distribution for fund ids (same format)
+  ramp          list of {"concurrency": N, "seconds": S} stages, run back to back
+
+Closed-loop workers drive either the HTTP API (gunicorn/uvicorn child process, --target http) or the
+service layer in-process (--target service). Each stage reports throughput, error and rejection rates
+(4xx business answers such as "already subscribed") and latency percentiles per operation, so the
+stages form a latency/throughput curve; the saturation point is the first stage where doubling the
+concurrency adds less than --saturation-gain throughput.
+
+Same-client contention in SubscriptionService/ClientService is reported separately:
+
+  overlapping   write operations that started while another write for the same client was in flight
+  lost updates  clients whose final balance differs from 500000 plus the amounts of every successful
+                deposit/subscription/cancellation the generator saw (read-modify-write races)
+
+Usage: python scripts/load_scenario.py scripts/scenarios/mixed.json [--target http|service]
+       [--server wsgi|asgi] [--dynamo-latency-ms 2] [--scale 1.0] [--json results.json]
+"""
+import argparse
+import bisect
+import contextlib
+import itertools
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from bench_utils import seed_dataset, setup_django, summarize
+
+FUND_IDS = ['1', '2', '3', '4', '5']
+INITIAL_BALANCE = Decimal('500000')
+WRITE_OPERATIONS = ('deposit', 'subscribe', 'cancel')
+
+
+class KeyDistribution:
+    """Pick keys uniformly or following a Zipf law over their rank (first key = hottest)."""
+
+    def __init__(self, keys, spec):
+        self.keys = list(keys)
+        spec = spec or {}
+        if spec.get('distribution', 'uniform') == 'zipf':
+            s = float(spec.get('s', 1.1))
+            weights = [1 / (rank ** s) for rank in range(1, len(self.keys) + 1)]
+        else:
+            weights = [1.0] * len(self.keys)
+        self.cumulative = list(itertools.accumulate(weights))
+
+    def pick(self, rng):
+        return self.keys[bisect.bisect(self.cumulative, rng.random() * self.cumulative[-1])]
+
+    def top_share(self, fraction=0.01):
+        count = max(1, int(len(self.keys) * fraction))
+        return self.cumulative[count - 1] / self.cumulative[-1]
+
+
+class Outcome:
+    OK, REJECTED, ERROR = 'ok', 'rejected', 'error'
+
+
+class HttpTarget:
+    """Each worker thread keeps its own keep-alive connection."""
+
+    def __init__(self, base_url):
+        from urllib.parse import urlsplit
+        self.target = urlsplit(base_url)
+        self._local = threading.local()
+
+    def _connection(self):
+        import http.client
+        if getattr(self._local, 'connection', None) is None:
+            self._local.connection = http.client.HTTPConnection(self.target.hostname, self.target.port, timeout=30)
+        return self._local.connection
+
+    def _call(self, method, path, body=None):
+        import http.client
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        try:
+            connection = self._connection()
+            connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = connection.getresponse()
+            payload = response.read()
+        except (OSError, http.client.HTTPException):
+            self._local.connection = None
+            return Outcome.ERROR, None
+        if response.status >= 500:
+            return Outcome.ERROR, None
+        data = json.loads(payload) if payload else {}
+        if response.status >= 400:
+            return Outcome.REJECTED, None
+        amount = (data.get('transaction') or {}).get('amount')
+        return Outcome.OK, Decimal(str(amount)) if amount is not None else None
+
+    def balance(self, client_id, fund_id, amount):
+        return self._call('GET', f'/api/clients/{client_id}/balance/')
+
+    def deposit(self, client_id, fund_id, amount):
+        return self._call('POST', '/api/deposit/', {'client_id': client_id, 'amount': str(amount)})
+
+    def subscribe(self, client_id, fund_id, amount):
+        return self._call('POST', '/api/subscribe/', {'client_id': client_id, 'fund_id': fund_id})
+
+    def cancel(self, client_id, fund_id, amount):
+        return self._call('POST', '/api/cancel/', {'client_id': client_id, 'fund_id': fund_id})
+
+
+class ServiceTarget:
+    """Call the service layer in-process (no HTTP, no serialization)."""
+
+    @staticmethod
+    def _result(call):
+        try:
+            result = call()
+        except Exception:
+            return Outcome.ERROR, None
+        if not result.get('success'):
+            return Outcome.REJECTED, None
+        transaction = result.get('transaction')
+        return Outcome.OK, transaction.amount if transaction is not None else None
+
+    def balance(self, client_id, fund_id, amount):
+        from funds.services import ClientService
+        return self._result(lambda: ClientService.get_balance_summary(client_id))
+
+    def deposit(self, client_id, fund_id, amount):
+        from funds.services import ClientService
+        return self._result(lambda: ClientService.deposit(client_id, amount))
+
+    def subscribe(self, client_id, fund_id, amount):
+        from funds.services import SubscriptionService
+        return self._result(lambda: SubscriptionService.subscribe_to_fund(client_id, fund_id))
+
+    def cancel(self, client_id, fund_id, amount):
+        from funds.services import SubscriptionService
+        return self._result(lambda: SubscriptionService.cancel_subscription(client_id, fund_id))
+
+
+class Recorder:
+    """Latencies and outcomes per operation, in-flight writes per client and expected balance deltas."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(lambda: defaultdict(int))
+        self.inflight = defaultdict(int)
+        self.overlapping = defaultdict(int)
+        self.writes = defaultdict(int)
+
+    def begin(self, operation, client_id):
+        if operation not in WRITE_OPERATIONS:
+            return
+        with self.lock:
+            self.writes[operation] += 1
+            if self.inflight[client_id]:
+                self.overlapping[operation] += 1
+            self.inflight[client_id] += 1
+
+    def end(self, operation, client_id, latency, outcome):
+        with self.lock:
+            if operation in WRITE_OPERATIONS:
+                self.inflight[client_id] -= 1
+            self.latencies[operation].append(latency)
+            self.outcomes[operation][outcome] += 1
+
+
+def run_stage(target, stage, weights, clients, funds, amount, recorder, deltas, seed):
+    operations, cumulative = zip(*weights.items())
+    cumulative = list(itertools.accumulate(cumulative))
+    deadline = time.monotonic() + stage['seconds']
+    signs = {'deposit': 1, 'subscribe': -1, 'cancel': 1}
+
+    def worker(index):
+        rng = random.Random(seed * 1000 + index)
+        while time.monotonic() < deadline:
+            operation = operations[bisect.bisect(cumulative, rng.random() * cumulative[-1])]
+            client_id, fund_id = clients.pick(rng), funds.pick(rng)
+            recorder.begin(operation, client_id)
+            start = time.perf_counter()
+            outcome, moved = getattr(target, operation)(client_id, fund_id, amount)
+            recorder.end(operation, client_id, time.perf_counter() - start, outcome)
+            if outcome == Outcome.OK and operation in signs and moved is not None:
+                with recorder.lock:
+                    deltas[client_id] += signs[operation] * moved
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(stage['concurrency'])]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def stage_report(stage, recorder, elapsed):
+    per_operation = {}
+    all_latencies, totals = [], defaultdict(int)
+    for operation, latencies in recorder.latencies.items():
+        outcomes = recorder.outcomes[operation]
+        count = len(latencies)
+        per_operation[operation] = {
+            **summarize(latencies, elapsed, outcomes[Outcome.ERROR]),
+            'rejected': outcomes[Outcome.REJECTED],
+            'rejection_rate': outcomes[Outcome.REJECTED] / count if count else 0.0,
+            'overlapping': recorder.overlapping.get(operation, 0),
+        }
+        all_latencies.extend(latencies)
+        for outcome, value in outcomes.items():
+            totals[outcome] += value
+    writes = sum(recorder.writes.values())
+    overlapping = sum(recorder.overlapping.values())
+    return {
+        'concurrency': stage['concurrency'],
+        **summarize(all_latencies, elapsed, totals[Outcome.ERROR]),
+        'rejected': totals[Outcome.REJECTED],
+        'writes': writes,
+        'overlapping_writes': overlapping,
+        'overlap_rate': overlapping / writes if writes else 0.0,
+        'operations': per_operation,
+    }
+
+
+def saturation_point(stages, min_gain):
+    """Concurrency of the first stage after which more workers add less than `min_gain` throughput."""
+    for previous, current in zip(stages, stages[1:]):
+        if previous['throughput'] and current['throughput'] < previous['throughput'] * (1 + min_gain):
+            return previous['concurrency']
+    return None
+
+
+def check_balances(deltas):
+    from funds.models import ClientBalance
+
+    lost = []
+    for client_id, delta in sorted(deltas.items()):
+        balance = ClientBalance.get_by_client_id(client_id)
+        expected = INITIAL_BALANCE + delta
+        actual = balance.balance if balance else None
+        if actual != expected:
+            lost.append({'client_id': client_id, 'expected': str(expected), 'actual': str(actual)})
+    return lost
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('scenario', help='scenario JSON file')
+    parser.add_argument('--target', choices=('http', 'service'), default='http')
+    parser.add_argument('--server', choices=('wsgi', 'asgi'), default='wsgi')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=16, help='gthread threads per WSGI worker')
+    parser.add_argument('--dynamo-latency-ms', type=float, default=2.0)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply every stage duration')
+    parser.add_argument('--saturation-gain', type=float, default=0.05)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    args = parser.parse_args()
+
+    with open(args.scenario) as handle:
+        scenario = json.load(handle)
+    dataset = scenario.get('dataset', {})
+    weights = {operation: weight for operation, weight in scenario['operations'].items() if weight}
+    unknown = set(weights) - {'balance', *WRITE_OPERATIONS}
+    if unknown:
+        parser.error(f'unknown operations in scenario: {", ".join(sorted(unknown))}')
+    amount = Decimal(str(scenario.get('deposit_amount', '1000')))
+    ramp = [{**stage, 'seconds': stage['seconds'] * args.scale} for stage in scenario['ramp']]
+
+    from local_servers import AppServer, LocalDynamoDB
+
+    stages, deltas = [], defaultdict(Decimal)
+    with LocalDynamoDB(latency=args.dynamo_latency_ms / 1000) as dynamo, contextlib.ExitStack() as stack:
+        cache_dir = stack.enter_context(tempfile.TemporaryDirectory(prefix='funds-load-cache-'))
+        env = {**dynamo.environment(), 'SHARED_CACHE_LOCATION': cache_dir, 'ASYNC_VIEWS': str(args.server == 'asgi')}
+        os.environ.update(env)
+        setup_django()
+        client_ids = seed_dataset(dataset.get('clients', 500), subscriptions=dataset.get('subscriptions', 2),
+                                  transactions=dataset.get('transactions', 0))
+        clients = KeyDistribution(client_ids, scenario.get('clients'))
+        funds = KeyDistribution(FUND_IDS, scenario.get('funds'))
+
+        if args.target == 'http':
+            server = stack.enter_context(AppServer(args.server, workers=args.workers, threads=args.threads, env=env))
+            target = HttpTarget(server.base_url)
+        else:
+            target = ServiceTarget()
+
+        for index, stage in enumerate(ramp):
+            recorder = Recorder()
+            elapsed = run_stage(target, stage, weights, clients, funds, amount, recorder, deltas, args.seed + index)
+            stages.append(stage_report(stage, recorder, elapsed))
+        lost_updates = check_balances(deltas)
+
+    print(f"scenario {scenario.get('name', args.scenario)} ({args.target}); top 1% of clients get "
+          f"{clients.top_share():.0%} of the traffic")
+    print(f"{'conc':>5}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'err %':>7}{'rej %':>7}{'overlap %':>11}")
+    for row in stages:
+        rejection = row['rejected'] / row['count'] * 100 if row['count'] else 0.0
+        print(f"{row['concurrency']:>5}{row['throughput']:>9.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+              f"{row['p99_ms']:>9.2f}{row['failure_rate'] * 100:>7.2f}{rejection:>7.2f}{row['overlap_rate'] * 100:>11.2f}")
+    print(f"\n{'operation':<11}" + ''.join(f"{'c=' + str(row['concurrency']) + ' p95':>12}" for row in stages))
+    for operation in weights:
+        print(f"{operation:<11}" + ''.join(
+            f"{row['operations'].get(operation, {}).get('p95_ms', 0.0):>12.2f}" for row in stages))
+    saturation = saturation_point(stages, args.saturation_gain)
+    print(f"\nsaturation at concurrency: {saturation if saturation is not None else 'not reached'}")
+    print(f"clients with lost balance updates: {len(lost_updates)} of {len(deltas)} written")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({
+                'scenario': scenario,
+                'args': vars(args),
+                'stages': stages,
+                'saturation_concurrency': saturation,
+                'lost_updates': lost_updates,
+            }, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
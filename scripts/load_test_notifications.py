@@ -0,0 +1,189 @@
+"""Offline load test for the notification pipeline (local SMTP + fake Twilio stand-ins).
+
+Drives N notifications (email + SMS each) through NotificationService in several modes and
+reports throughput, latency percentiles and failure rates:
+
+  sync       one SMTP session and one Twilio request per notification, sequential (legacy path)
+  pooled     pooled SMTP sessions + shared Twilio client, --threads concurrent callers
+  bulk       send_bulk_email + send_bulk_sms (single SMTP session, rate-limited SMS dispatcher)
+  coalesced  notifications merged per client through the digest coalescer, then flushed
+
+Usage: python scripts/load_test_notifications.py [--notifications 2000] [--clients 200]
+       [--modes sync,pooled,bulk,coalesced] [--fail-every 0] [--json results.json]
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from bench_utils import setup_django, summarize
+
+
+def build_workload(count, clients):
+    from funds import notification_templates as templates
+
+    workload = []
+    for i in range(count):
+        client = i % clients
+        rendered = templates.render('deposit', {'amount': Decimal('1000'), 'new_balance': Decimal(1000 * (i + 1))})
+        workload.append((f'CL{client:05d}', f'client{client}@example.com', f'+57300{client:07d}', rendered))
+    return workload
+
+
+def deliver_one(item):
+    from funds.notifications import NotificationService
+
+    _, email, phone, rendered = item
+    start = time.perf_counter()
+    email_ok, _ = NotificationService.deliver('email', email, rendered)
+    sms_ok, _ = NotificationService.deliver('sms', phone, rendered)
+    return time.perf_counter() - start, (not email_ok) + (not sms_ok)
+
+
+def run_sync(workload, args):
+    latencies, failures = [], 0
+    start = time.perf_counter()
+    for item in workload:
+        latency, failed = deliver_one(item)
+        latencies.append(latency)
+        failures += failed
+    return latencies, failures, time.perf_counter() - start, {}
+
+
+def run_pooled(workload, args):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = list(executor.map(deliver_one, workload))
+    elapsed = time.perf_counter() - start
+    return [latency for latency, _ in results], sum(failed for _, failed in results), elapsed, {}
+
+
+def run_bulk(workload, args):
+    from funds.notifications import NotificationService
+
+    latencies, failures = [], 0
+    start = time.perf_counter()
+    for offset in range(0, len(workload), args.batch_size):
+        batch = workload[offset:offset + args.batch_size]
+        batch_start = time.perf_counter()
+        email_results = NotificationService.send_bulk_email(
+            [(email, rendered.subject, rendered.text, rendered.html) for _, email, _, rendered in batch]
+        )
+        sms_results = NotificationService.send_bulk_sms([(phone, rendered.sms) for _, _, phone, rendered in batch])
+        # Cada notificación del lote termina cuando termina el lote completo
+        latencies.extend([time.perf_counter() - batch_start] * len(batch))
+        failures += sum(1 for ok, _ in email_results if not ok) + sum(1 for _, ok, _ in sms_results if not ok)
+    return latencies, failures, time.perf_counter() - start, {'batch_size': args.batch_size}
+
+
+def run_coalesced(workload, args):
+    from funds.coalescing import NotificationCoalescer, parse_windows
+    from funds.notifications import NotificationService
+
+    results = []
+    windows = parse_windows([f'email={args.window}', f'sms={args.window}'])
+
+    def deliver(channel, recipient, rendered):
+        result = NotificationService.deliver(channel, recipient, rendered)
+        results.append(result)
+        return result
+
+    coalescer = NotificationCoalescer(deliver, windows)
+    latencies = []
+    start = time.perf_counter()
+    for client_id, email, phone, rendered in workload:
+        submit_start = time.perf_counter()
+        coalescer.submit('email', client_id, email, rendered)
+        coalescer.submit('sms', client_id, phone, rendered)
+        latencies.append(time.perf_counter() - submit_start)
+    coalescer.flush()
+    elapsed = time.perf_counter() - start
+    metrics = coalescer.metrics()
+    extra = {
+        'sends': sum(channel.get('sent', 0) for channel in metrics.values()),
+        'saved': sum(channel.get('saved', 0) for channel in metrics.values()),
+    }
+    return latencies, sum(1 for ok, _ in results if not ok), elapsed, extra
+
+
+MODES = {
+    'sync': (run_sync, {'EMAIL_POOL_ENABLED': False}),
+    'pooled': (run_pooled, {'EMAIL_POOL_ENABLED': True}),
+    'bulk': (run_bulk, {'EMAIL_POOL_ENABLED': True}),
+    'coalesced': (run_coalesced, {'EMAIL_POOL_ENABLED': True}),
+}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--notifications', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--modes', default='sync,pooled,bulk,coalesced')
+    parser.add_argument('--threads', type=int, default=8, help='concurrent callers in pooled mode')
+    parser.add_argument('--batch-size', type=int, default=500, help='notifications per bulk call')
+    parser.add_argument('--window', type=float, default=60.0, help='coalescing window (seconds)')
+    parser.add_argument('--sms-rate', type=float, default=0.0, help='SMS/second budget (0 = unlimited)')
+    parser.add_argument('--smtp-latency-ms', type=float, default=0.0)
+    parser.add_argument('--sms-latency-ms', type=float, default=5.0)
+    parser.add_argument('--tls', action='store_true')
+    parser.add_argument('--fail-every', type=int, default=0, help='make every Nth SMTP/Twilio call fail')
+    parser.add_argument('--json', help='write machine-readable results to this file')
+    parser.add_argument('--verbose', action='store_true', help='keep per-failure tracebacks in the output')
+    args = parser.parse_args()
+
+    setup_django()
+    if not args.verbose:
+        logging.getLogger('funds').setLevel(logging.CRITICAL)
+    from django.test.utils import override_settings
+    from funds import sms, smtp_pool
+    from local_servers import FakeTwilioServer, LocalSMTPServer
+
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f'unknown modes: {", ".join(sorted(unknown))}')
+
+    workload = build_workload(args.notifications, args.clients)
+    results = []
+    with LocalSMTPServer(tls=args.tls, latency=args.smtp_latency_ms / 1000, fail_every=args.fail_every) as smtp, \
+            FakeTwilioServer(latency=args.sms_latency_ms / 1000, fail_every=args.fail_every) as twilio:
+        overrides = {**smtp.settings_overrides(), **twilio.settings_overrides()}
+        overrides.update(
+            EMAIL_POOL_SIZE=args.threads,
+            SMS_DISPATCH_WORKERS=args.threads,
+            SMS_RATE_PER_SECOND=args.sms_rate,
+            SMS_COALESCE_RECIPIENTS=False,
+        )
+        for mode in modes:
+            runner, mode_settings = MODES[mode]
+            with override_settings(**overrides, **mode_settings):
+                smtp_pool.reset_smtp_pool()
+                sms.reset_sms_clients()
+                smtp_before, sms_before = smtp.messages, twilio.messages
+                latencies, failures, elapsed, extra = runner(workload, args)
+                smtp_pool.reset_smtp_pool()
+                sms.reset_sms_clients()
+            row = {'mode': mode, **summarize(latencies, elapsed, failures), **extra}
+            row['count'] = len(workload)
+            row['throughput'] = len(workload) / elapsed
+            row['failure_rate'] = failures / (2 * len(workload))
+            row['smtp_messages'] = smtp.messages - smtp_before
+            row['sms_requests'] = twilio.messages - sms_before
+            results.append(row)
+
+    print(f"{'mode':<11}{'notif/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'fail %':>8}{'smtp':>7}{'sms':>7}")
+    for row in results:
+        print(f"{row['mode']:<11}{row['throughput']:>10.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+              f"{row['p99_ms']:>9.2f}{row['failure_rate'] * 100:>8.2f}{row['smtp_messages']:>7}{row['sms_requests']:>7}")
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'args': vars(args), 'results': results}, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
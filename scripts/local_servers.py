@@ -0,0 +1,351 @@
+"""Local stand-ins for the external services used by the API and the notification pipeline.
+
+Only meant for benchmarks and load tests: nothing here talks to the real
+SMTP relay, Twilio or AWS. Requires the dev dependencies (``pip install -r requirements-dev.txt``).
+"""
+import os
+import socket
+import ssl
+import subprocess
+import tempfile
+import logging
+import threading
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def self_signed_context() -> ssl.SSLContext:
+    """Build a throwaway TLS context so STARTTLS can be exercised locally."""
+    workdir = tempfile.mkdtemp(prefix='funds-smtp-')
+    cert = os.path.join(workdir, 'cert.pem')
+    key = os.path.join(workdir, 'key.pem')
+    subprocess.run(
+        ['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '1',
+         '-subj', '/CN=localhost', '-keyout', key, '-out', cert],
+        check=True, capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+class LocalSMTPServer:
+    """aiosmtpd server that accepts any AUTH and counts messages and EHLO handshakes."""
+
+    def __init__(self, tls: bool = False, latency: float = 0.0, fail_every: int = 0):
+        self.tls = tls
+        self.latency = latency
+        self.fail_every = fail_every
+        self.port = free_port()
+        self.messages = 0
+        self.handshakes = 0
+        self._lock = threading.Lock()
+        self._controller = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        import asyncio
+        from aiosmtpd.controller import Controller
+        from aiosmtpd.smtp import AuthResult
+
+        # aiosmtpd logs a deprecation notice for every AUTH it accepts
+        logging.getLogger('mail.log').setLevel(logging.ERROR)
+        server = self
+
+        class Handler:
+            async def handle_EHLO(self, smtp, session, envelope, hostname, responses):
+                session.host_name = hostname
+                with server._lock:
+                    server.handshakes += 1
+                return responses
+
+            async def handle_DATA(self, smtp, session, envelope):
+                if server.latency:
+                    await asyncio.sleep(server.latency)
+                with server._lock:
+                    server.messages += 1
+                    count = server.messages
+                if server.fail_every and count % server.fail_every == 0:
+                    return '554 Simulated delivery failure'
+                return '250 Message accepted for delivery'
+
+        def authenticator(smtp, session, envelope, mechanism, auth_data):
+            return AuthResult(success=True)
+
+        self._controller = Controller(
+            Handler(),
+            hostname='127.0.0.1',
+            port=self.port,
+            authenticator=authenticator,
+            auth_require_tls=False,
+            tls_context=self_signed_context() if self.tls else None,
+            require_starttls=False,
+        )
+        self._controller.start()
+
+    def stop(self):
+        if self._controller is not None:
+            self._controller.stop()
+            self._controller = None
+
+    def settings_overrides(self) -> dict:
+        return {
+            'EMAIL_HOST': '127.0.0.1',
+            'EMAIL_PORT': self.port,
+            'EMAIL_HOST_USER': 'bench@example.com',
+            'EMAIL_HOST_PASSWORD': 'bench',
+            'DEFAULT_FROM_EMAIL': 'bench@example.com',
+            'EMAIL_USE_TLS': self.tls,
+            'NOTIFICATIONS_ENABLED': True,
+        }
+
+
+class FakeTwilioServer:
+    """Minimal HTTP/1.1 stand-in for the Twilio Messages API (keep-alive aware)."""
+
+    def __init__(self, latency: float = 0.0, fail_every: int = 0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.port = free_port()
+        self.messages = 0
+        self.connections = 0
+        self.recipients = {}
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        import json
+        import time
+        import uuid
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # headers and body are written separately; avoid Nagle/delayed-ACK stalls on keep-alive
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with server._lock:
+                    server.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                form = parse_qs(self.rfile.read(length).decode())
+                if server.latency:
+                    time.sleep(server.latency)
+                with server._lock:
+                    server.messages += 1
+                    count = server.messages
+                    to_phone = form.get('To', [''])[0]
+                    server.recipients[to_phone] = server.recipients.get(to_phone, 0) + 1
+                if server.fail_every and count % server.fail_every == 0:
+                    status, payload = 500, {'code': 20500, 'message': 'Simulated failure', 'status': 500}
+                else:
+                    status, payload = 201, {
+                        'sid': 'SM' + uuid.uuid4().hex,
+                        'to': to_phone,
+                        'from': form.get('From', [''])[0],
+                        'body': form.get('Body', [''])[0],
+                        'status': 'queued',
+                    }
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def settings_overrides(self) -> dict:
+        return {
+            'TWILIO_ACCOUNT_SID': 'AC' + '0' * 32,
+            'TWILIO_AUTH_TOKEN': 'bench',
+            'TWILIO_FROM_NUMBER': '+15005550006',
+            'TWILIO_API_BASE_URL': self.base_url,
+            'NOTIFICATIONS_ENABLED': True,
+        }
+
+
+def _serve_dynamodb(port: int, latency: float) -> None:
+    import time
+    from moto.moto_server.werkzeug_app import DomainDispatcherApplication, create_backend_app
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    app = DomainDispatcherApplication(create_backend_app)
+
+    def delayed(environ, start_response):
+        time.sleep(latency)
+        return app(environ, start_response)
+
+    make_server('127.0.0.1', port, delayed if latency else app, threaded=True).serve_forever()
+
+
+class LocalDynamoDB:
+    """moto's DynamoDB in a child process, optionally adding a fixed per-request network latency."""
+
+    table_name = 'funds_bench'
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.port = free_port()
+        self._process = None
+
+    @property
+    def endpoint_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self):
+        import multiprocessing
+        import time
+
+        self._process = multiprocessing.Process(target=_serve_dynamodb, args=(self.port, self.latency), daemon=True)
+        self._process.start()
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=0.2).close()
+                return
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError('local DynamoDB did not start')
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.join()
+            self._process = None
+
+    def environment(self) -> dict:
+        """Environment variables for app servers started as child processes."""
+        return {
+            'AWS_ACCESS_KEY_ID': 'bench',
+            'AWS_SECRET_ACCESS_KEY': 'bench',
+            'AWS_REGION': 'us-east-1',
+            'DYNAMODB_ENDPOINT_URL': self.endpoint_url,
+            'DYNAMODB_TABLE_NAME': self.table_name,
+            'NOTIFICATIONS_ENABLED': 'False',
+        }
+
+    def settings_overrides(self) -> dict:
+        return {
+            'AWS_ACCESS_KEY_ID': 'bench',
+            'AWS_SECRET_ACCESS_KEY': 'bench',
+            'AWS_REGION': 'us-east-1',
+            'DYNAMODB_ENDPOINT_URL': self.endpoint_url,
+            'DYNAMODB_TABLE_NAME': self.table_name,
+            'NOTIFICATIONS_ENABLED': False,
+        }
+
+
+class AppServer:
+    """Run the project under gunicorn (WSGI), uvicorn (ASGI) or gunicorn with gunicorn.conf.py (``conf``; worker
+    mode, preload and warm-up come from the GUNICORN_* variables in `env`) in a child process."""
+
+    def __init__(self, kind: str = 'wsgi', workers: int = 1, threads: int = 8, env: dict = None, args=()):
+        self.kind = kind
+        self.workers = workers
+        self.threads = threads
+        self.env = env or {}
+        self.args = list(args)
+        self.port = free_port()
+        self._process = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.port}'
+
+    def command(self) -> list:
+        import sys
+
+        if self.kind == 'asgi':
+            return [sys.executable, '-m', 'uvicorn', 'funds_management.asgi:application',
+                    '--host', '127.0.0.1', '--port', str(self.port), '--workers', str(self.workers),
+                    '--no-access-log', '--log-level', 'warning', *self.args]
+        if self.kind == 'conf':
+            return [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', '--bind', f'127.0.0.1:{self.port}',
+                    '--workers', str(self.workers), '--log-level', 'warning', *self.args]
+        return [sys.executable, '-m', 'gunicorn', 'funds_management.wsgi:application',
+                '--bind', f'127.0.0.1:{self.port}', '--workers', str(self.workers),
+                '--threads', str(self.threads), '--worker-class', 'gthread', '--log-level', 'warning', *self.args]
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def start(self, timeout: float = 30.0):
+        import time
+        import urllib.request
+
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = {**os.environ, 'DEBUG': 'False', **self.env}
+        self._process = subprocess.Popen(self.command(), cwd=root, env=env)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError(f'{self.kind} server exited with code {self._process.returncode}')
+            try:
+                urllib.request.urlopen(self.base_url + '/api/health/', timeout=1).read()
+                return
+            except OSError:
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f'{self.kind} server did not become ready')
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None